@@ -0,0 +1,83 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# End-to-end time of the CLI commands against the fake RAD REST server
+# (tests/fake_server.py), each command runs in a new process like in a shell
+#
+#   python -m benchmarks.bench_cli --zones 5000 --datasets 100000 --latency 0.002
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from tests.fake_server import FakeRADServer, Fleet
+
+COMMANDS = [
+    ['zone', 'list'],
+    ['zone', 'get-properties', 'zone1'],
+    ['zfs', 'list'],
+    ['zpool', 'list'],
+    ['kstat', 'get', 'kstat:/system/cpu/0/sys'],
+    ['zone-manager', 'create', 'benchmark'],
+    ['zone-manager', 'delete', 'benchmark']
+]
+
+
+def rad(server, home, arguments, extra=()):
+    command = [sys.executable, '-m', 'rad.rest.client.cli.main', '-Z', 'http',
+               '-H', '127.0.0.1', '-P', str(server.port)] + list(extra) + arguments
+    environment = dict(os.environ, HOME=home)
+    start = time.perf_counter()
+    process = subprocess.run(command, env=environment, capture_output=True)
+    elapsed = time.perf_counter() - start
+    if process.returncode != 0:
+        sys.stderr.write(process.stderr.decode())
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the CLI commands')
+    parser.add_argument('--zones', type=int, default=500)
+    parser.add_argument('--datasets', type=int, default=2000)
+    parser.add_argument('--pools', type=int, default=4)
+    parser.add_argument('--kstat-size', type=int, default=10000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--jobs', type=int, default=8,
+                        help='-J of zfs list and zpool list')
+    options = parser.parse_args()
+
+    fleet = Fleet(zones=options.zones, datasets=options.datasets, pools=options.pools,
+                  kstats=1, kstat_size=options.kstat_size)
+    with FakeRADServer(fleet, latency=options.latency) as server, \
+            tempfile.TemporaryDirectory() as home:
+        print('%d zones, %d datasets, %d pools, %d kstat entries, %.1f ms latency' % (
+            options.zones, options.datasets, options.pools, options.kstat_size,
+            options.latency * 1000))
+        rad(server, home, ['login', '-p', 'root', 'root'])
+        for arguments in COMMANDS:
+            if arguments[0] in ('zfs', 'zpool'):
+                arguments = arguments + ['-J', str(options.jobs)]
+            # creating and deleting the same zone again would fail
+            repeat = 1 if arguments[0] == 'zone-manager' else options.repeat
+            best = min(rad(server, home, arguments) for _ in range(repeat))
+            print('%-40s %10.1f ms' % (' '.join(arguments), best * 1000))
+        print('%-40s %10d' % ('requests served', server.request_count()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Encoding and decoding time of large RAD payloads with the json module
+# and with orjson, when it is installed
+#
+#   python -m benchmarks.bench_codec
+
+import json
+
+from benchmarks.common import best_time, report
+from rad.rest.client.util import codec
+
+
+def zones_payload(count=5000):
+    return {'status': 'success', 'payload': [{
+        'href': 'api/com.oracle.solaris.rad.zonemgr/1.0/Zone/zone%d' % i,
+        'Zone': {
+            'auxstate': [],
+            'brand': 'solaris',
+            'id': i,
+            'uuid': '6f0fe3b2-1f3c-4d6e-9d2a-%012d' % i,
+            'name': 'zone%d' % i,
+            'state': 'running'
+        }
+    } for i in range(count)]}
+
+
+def datasets_payload(count=20000):
+    return [{'status': 'success', 'payload': [
+        {'name': 'name', 'value': 'rpool/export/home/user%d' % i},
+        {'name': 'used', 'value': str(i * 4096)},
+        {'name': 'available', 'value': '8010000000'},
+        {'name': 'referenced', 'value': str(i * 1024)},
+        {'name': 'mountpoint', 'value': '/export/home/user%d' % i}
+    ]} for i in range(count)]
+
+
+def kstat_payload(count=50000):
+    return {'status': 'success', 'payload': {
+        'stat%d' % i: {'name': 'stat%d' % i, 'type': 'UINT64', 'flags': 0,
+                       'integer': i * 1000}
+        for i in range(count)}}
+
+
+def main():
+    print('codec backend: %s' % codec.BACKEND)
+    for name, payload in [('zones', zones_payload()),
+                          ('datasets', datasets_payload()),
+                          ('kstat', kstat_payload())]:
+        data = json.dumps(payload).encode('utf-8')
+        print('%s payload: %d bytes' % (name, len(data)))
+        stdlib_loads = best_time(lambda: json.loads(data), number=5)
+        report('%s json.loads' % name, stdlib_loads)
+        report('%s codec.loads' % name, best_time(lambda: codec.loads(data), number=5), stdlib_loads)
+        stdlib_dumps = best_time(lambda: json.dumps(payload, indent=4), number=5)
+        report('%s json.dumps' % name, stdlib_dumps)
+        report('%s codec.dumps_pretty' % name,
+               best_time(lambda: codec.dumps_pretty(payload), number=5), stdlib_dumps)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Memory held by an inventory of datasets (the ZfsDataset objects of the
+# listing and their loaded ZfsResource) measured with tracemalloc
+#
+#   python -m benchmarks.bench_memory --datasets 100000
+
+import argparse
+import gc
+import tracemalloc
+
+from rad.rest.client.api.zfsmgr_1 import ZfsDataset
+from rad.rest.client.api.zfsmgr_1.zfs_resource import ZfsResource
+from rad.rest.client.util import codec
+
+
+def listing(count):
+    return codec.dumps([{
+        'href': 'api/com.oracle.solaris.rad.zfsmgr/1.0/ZfsDataset/rpool%%2Fexport%%2Ffs%d' % i,
+        'ZfsDataset': {}
+    } for i in range(count)])
+
+
+def props(count):
+    return codec.dumps([[
+        {'name': 'name', 'value': 'rpool/export/fs%d' % i},
+        {'name': 'used', 'value': str(i * 4096)},
+        {'name': 'available', 'value': '8010000000'},
+        {'name': 'referenced', 'value': str(i * 1024)},
+        {'name': 'mountpoint', 'value': '/export/fs%d' % i}
+    ] for i in range(count)])
+
+
+def inventory(listing, props, keep_json):
+    # decode like the client does, one response at a time, and keep the objects
+    # with their properties decoded, like the table output does
+    datasets = [ZfsDataset(href=item['href'], json=item['ZfsDataset'])
+                for item in codec.loads(listing)]
+    resources = []
+    for json in codec.loads(props):
+        resource = ZfsResource()
+        resource.load(json, keep_json)
+        for property in resource.properties:
+            property.value
+        resources.append(resource)
+    return datasets, resources
+
+
+def measure(count, keep_json):
+    encoded_listing, encoded_props = listing(count), props(count)
+    gc.collect()
+    tracemalloc.start()
+    result = inventory(encoded_listing, encoded_props, keep_json)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory of a dataset inventory')
+    parser.add_argument('--datasets', type=int, default=100000)
+    options = parser.parse_args()
+    for keep_json in (True, False):
+        current, peak = measure(options.datasets, keep_json)
+        print('%d datasets, keep json %-5s  held %8.1f MB  peak %8.1f MB  %6d bytes/dataset' % (
+            options.datasets, keep_json, current / 2 ** 20, peak / 2 ** 20,
+            current / options.datasets))
+
+
+if __name__ == '__main__':
+    main()
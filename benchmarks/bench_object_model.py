@@ -0,0 +1,200 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Hot paths of the object model: loading resources and properties, building
+# hrefs, assembling the zone resource tree and printing tables. Run them
+# through benchmarks/run.py to compare against a baseline
+#
+#   python -m benchmarks.run
+
+import contextlib
+import os
+
+from rad.rest.client.api.properties import ArrayProperty, BooleanProperty, ByteProperty, \
+    FloatProperty, IntegerProperty, PathProperty, Property, SizeProperty
+from rad.rest.client.api.rad_response import RADResponse, RawResponse
+from rad.rest.client.api.zfsmgr_1.zfs_resource import ZfsResource
+from rad.rest.client.api.zfsmgr_1.zpool_resource import ZpoolResource
+from rad.rest.client.api.zonemgr_1 import Zone
+from rad.rest.client.api.zonemgr_1.zone_resources import GlobalResource, ZoneResourceFactory
+from rad.rest.client.util import codec
+from rad.rest.client.util.print import print_parsable, print_table
+from rad.rest.client.util.result_set import ResultSet
+from tests.fake_server import Fleet
+
+ZONE_HREF = 'api/com.oracle.solaris.rad.zonemgr/1.0/Zone/zone1'
+
+
+class FakeConnection(object):
+    # Answers the RAD methods of a zone from the fake server fleet, without
+    # any I/O
+    url = 'http://localhost:6788'
+
+    def __init__(self, fleet, name):
+        self.trees = {}
+        self.tree_ttl = 60
+        self.responses = {
+            None: codec.dumps({'status': 'success',
+                               'payload': fleet.zone_resources(name)}),
+            'anet': codec.dumps({'status': 'success',
+                                 'payload': fleet.zone_resources(name, 'anet')})
+        }
+
+    def send(self, method, url, json=None, **kwargs):
+        scope = (json.get('scope') or {}).get('type')
+        return RADResponse(RawResponse(200, self.responses[scope]))
+
+    def invalidate(self, collections):
+        pass
+
+
+def dataset_rows(count):
+    rows = []
+    for i in range(count):
+        resource = ZfsResource()
+        resource.load([
+            {'name': 'name', 'value': 'rpool/export/home/user%d' % i},
+            {'name': 'used', 'value': str(i * 4096)},
+            {'name': 'available', 'value': '8010000000'},
+            {'name': 'referenced', 'value': str(i * 1024)},
+            {'name': 'mountpoint', 'value': '/export/home/user%d' % i}
+        ])
+        rows.append({property.name: property for property in resource.properties})
+    return rows
+
+
+def dataset_resources(count):
+    resources = []
+    for i in range(count):
+        resource = ZfsResource()
+        resource.load([
+            {'name': 'name', 'value': 'rpool/export/home/user%d' % i},
+            {'name': 'used', 'value': str((i * 7919) % count * 4096)},
+            {'name': 'available', 'value': '8010000000'},
+            {'name': 'referenced', 'value': str(i * 1024)},
+            {'name': 'mountpoint', 'value': '/export/home/user%d' % i}
+        ])
+        resources.append(('localhost', resource))
+    return resources
+
+
+def pool_json(i):
+    json = [{'name': property.name, 'value': 'on' if isinstance(property, BooleanProperty)
+             else str(i * 1024)} for property in ZpoolResource.PROPERTIES]
+    json[0]['value'] = 'pool%d' % i
+    return json
+
+
+def load_listing(resource_class, jsons):
+    def run():
+        for json in jsons:
+            resource_class().load(json)
+    return run
+
+
+def load_listing_json(resource_class, jsons):
+    def run():
+        for json in jsons:
+            resource = resource_class()
+            resource.load(json)
+            resource.to_json()
+    return run
+
+
+def printing(function, rows):
+    def run():
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            function(rows)
+    return run
+
+
+def cases(rows=10000):
+    # (name, function, calls per measure)
+    fleet = Fleet(zones=2, anets=4)
+    global_json = fleet.zone_resources('zone1')[0]
+    anet_json = [json for json in fleet.zone_resources('zone1') if json['type'] == 'anet'][0]
+    zfs_json = [
+        {'name': 'name', 'value': 'rpool/export/home'},
+        {'name': 'used', 'value': '123456789'},
+        {'name': 'available', 'value': '8010000000'},
+        {'name': 'referenced', 'value': '4096'},
+        {'name': 'mountpoint', 'value': '/export/home'}
+    ]
+    zone = Zone(href=ZONE_HREF, _conn=FakeConnection(fleet, 'zone1'))
+    zone_properties = zone.get_properties()
+    table = dataset_rows(rows)
+    zfs_jsons = [[dict(json, value=json['value'] + str(i)) for json in zfs_json]
+                 for i in range(rows)]
+    zpool_jsons = [pool_json(i) for i in range(rows)]
+    resources = dataset_resources(rows)
+    columns = ['name', 'used', 'available', 'referenced', 'mountpoint']
+    result_set = ResultSet.from_resources(ZfsResource, resources, columns)
+    property_rows = [{property.name: property for property in resource.properties}
+                     for hostname, resource in resources]
+
+    def href_parse():
+        zone.href = ZONE_HREF
+
+    def resource_load_zfs():
+        ZfsResource().load(zfs_json)
+
+    def resource_load_global():
+        GlobalResource().load(global_json)
+
+    properties = [
+        ('property_decode', Property('name'), 'value'),
+        ('property_decode_boolean', BooleanProperty('autoboot'), 'true'),
+        ('property_decode_path', PathProperty('zonepath'), '/system/zones/zone1'),
+        ('property_decode_integer', IntegerProperty('id'), '12'),
+        ('property_decode_float', FloatProperty('ratio'), '1.25'),
+        ('property_decode_size', SizeProperty('create-size'), '1073741824'),
+        ('property_decode_byte', ByteProperty('used'), '1073741824'),
+    ]
+    array = ArrayProperty('link-protection')
+    array_json = {'name': 'link-protection', 'listvalue': ['mac-nospoof', 'ip-nospoof']}
+
+    benchmarks = [
+        ('resource_load_zfs', resource_load_zfs, 10000),
+        ('resource_load_global', resource_load_global, 2000),
+        ('resource_get_property_first', lambda: ZpoolResource.get_property('name'), 10000),
+        ('resource_get_property_last', lambda: ZpoolResource.get_property('version'), 10000),
+        ('resource_get', lambda: zone_properties.get('ip-type'), 100000),
+    ]
+    benchmarks += [(name, lambda p=p, v=v: p.decode(v), 100000) for name, p, v in properties]
+    benchmarks += [
+        ('property_load_array', lambda: array.load(array_json), 100000),
+        ('href_build', lambda: zone.href, 100000),
+        ('href_parse', href_parse, 100000),
+        ('request_url', lambda: zone.request_url('/_rad_method/getResources'), 100000),
+        ('zone_factory_from_json', lambda: ZoneResourceFactory.from_json(anet_json), 5000),
+        ('zone_factory_get_type_last', lambda: ZoneResourceFactory.get_type('keysource'), 100000),
+        ('zone_get_properties', lambda: zone.get_properties(refresh=True), 200),
+        ('zone_get_properties_cached', zone.get_properties, 100000),
+        ('zfs_load_listing_%d' % rows, load_listing(ZfsResource, zfs_jsons), 1),
+        ('zpool_load_listing_%d' % rows, load_listing(ZpoolResource, zpool_jsons), 1),
+        ('zpool_load_to_json_%d' % rows, load_listing_json(ZpoolResource, zpool_jsons), 1),
+        ('print_table_%d' % rows, printing(print_table, table), 1),
+        ('print_parsable_%d' % rows, printing(print_parsable, table), 1),
+        ('sort_property_rows_%d' % rows,
+         lambda: sorted(property_rows, key=lambda row: (row['used'], row['name'])), 1),
+        ('result_set_build_%d' % rows,
+         lambda: ResultSet.from_resources(ZfsResource, resources, columns), 1),
+        ('result_set_sort_%d' % rows, lambda: result_set.sort_indexes(['used', 'name']), 1),
+        ('result_set_top_%d' % rows,
+         lambda: result_set.sort_indexes(['used'], reverse=True, top=10), 1),
+        ('result_set_group_sum_%d' % rows, lambda: result_set.group_sum('host'), 1),
+        ('result_set_print_table_%d' % rows,
+         printing(print_table, result_set.select(columns)), 1),
+    ]
+    return benchmarks
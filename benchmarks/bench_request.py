@@ -0,0 +1,78 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Client overhead of a RAD request without the network: the session sends
+# through an HTTP stub answering a canned response, so the time is what the
+# client spends building urls, retrying, tracing and decoding
+#
+#   python -m benchmarks.bench_request --calls 100000
+
+import argparse
+import time
+
+from rad.rest.client.api.authentication_1 import Session
+from rad.rest.client.api.rad_response import RawResponse
+from rad.rest.client.api.zonemgr_1 import Zone
+from rad.rest.client.util import codec
+
+ZONE_HREF = 'api/com.oracle.solaris.rad.zonemgr/1.0/Zone/zone1'
+
+
+class NullHTTP(object):
+    # Stands for requests.Session
+    def __init__(self, content):
+        self.content = content
+
+    def request(self, method, url, stream=False, **kwargs):
+        return RawResponse(200, self.content)
+
+
+def null_session():
+    session = Session(hostname='localhost', protocol='http', port=6788)
+    session.session = NullHTTP(codec.dumps({'status': 'success', 'payload': []}))
+    return session
+
+
+def cases():
+    session = null_session()
+    zone = Zone(href=ZONE_HREF, _conn=session)
+    return [
+        ('href', lambda: zone.href),
+        ('request_url', zone.request_url),
+        ('request_url_method', lambda: zone.request_url('/_rad_method/getResources')),
+        ('session_send', lambda: session.send('GET', 'http://localhost:6788/' + ZONE_HREF)),
+        ('request', lambda: zone.request('GET')),
+        ('rad_method', lambda: zone.rad_method('getResources', {'filter': None})),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Client overhead of a request')
+    parser.add_argument('--calls', type=int, default=100000)
+    parser.add_argument('-k', '--filter',
+                        help='Only run the cases whose name contains FILTER')
+    options = parser.parse_args()
+    for name, function in cases():
+        if options.filter is not None and options.filter not in name:
+            continue
+        start = time.perf_counter()
+        for _ in range(options.calls):
+            function()
+        elapsed = time.perf_counter() - start
+        print('%-24s %d calls %8.3f s %8.2f us/call' % (
+            name, options.calls, elapsed, elapsed / options.calls * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Compares loading the compact json session cache against the former
+# format, which pickled the whole requests.Session
+#
+#   python -m benchmarks.bench_session_cache
+
+import pickle
+import tempfile
+from pathlib import Path
+
+import requests
+
+from benchmarks.common import best_time, report
+from rad.rest.client.api.authentication_1 import Session
+
+
+def pickle_save(filename, session):
+    with filename.open('wb') as f:
+        pickle.dump('1.0.0', f)
+        pickle.dump(session.session, f)
+        pickle.dump(session.rad_reference_id, f)
+
+
+def pickle_load(filename):
+    with filename.open('rb') as f:
+        pickle.load(f)
+        session = pickle.load(f)
+        pickle.load(f)
+        return session
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        session = Session(hostname='solaris')
+        session.session_filename = Path(directory) / 'https_solaris_6788.json'
+        session.session = requests.Session()
+        session.session.verify = '/tmp/solaris.crt'
+        session.session.cookies.set('_rad_instance', '1234', domain='solaris')
+        session.session.cookies.set('_rad_token', 'a' * 64, domain='solaris')
+        session.rad_reference_id = 1234
+        session.save_session()
+
+        pickle_filename = Path(directory) / 'https_solaris_6788.dat'
+        pickle_save(pickle_filename, session)
+
+        pickle_time = best_time(lambda: pickle_load(pickle_filename))
+        json_time = best_time(lambda: session.load_session())
+        report('load pickled requests.Session', pickle_time)
+        report('load json session cache', json_time, pickle_time)
+        report('save json session cache', best_time(session.save_session, number=200))
+        print('pickle cache size %d bytes, json cache size %d bytes' % (
+            pickle_filename.stat().st_size, session.session_filename.stat().st_size))
+
+
+if __name__ == '__main__':
+    main()
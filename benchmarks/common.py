@@ -0,0 +1,28 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import timeit
+
+
+def best_time(function, number=1000, repeat=5):
+    # Best time per call in seconds, the minimum is the least noisy estimate
+    timer = timeit.Timer(function)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def report(name, seconds, baseline=None):
+    line = '%-40s %12.2f us' % (name, seconds * 1e6)
+    if baseline is not None:
+        line += '  (%.1fx)' % (baseline / seconds)
+    print(line)
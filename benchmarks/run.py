@@ -0,0 +1,116 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Runs the object model microbenchmarks and compares them with a baseline,
+# failing when a benchmark got slower than the threshold
+#
+#   python -m benchmarks.run --save benchmarks/baseline.json [-k zone_get]
+#   python -m benchmarks.run --compare benchmarks/baseline.json --threshold 0.25
+#
+# Times are stored relative to a fixed pure python loop (calibration) so a
+# baseline taken on one machine is roughly comparable on another
+
+import argparse
+import json
+import os
+import platform
+import sys
+
+from benchmarks.common import best_time
+from benchmarks.bench_object_model import cases
+
+BASELINE = 'benchmarks/baseline.json'
+
+
+def calibration():
+    def loop():
+        total = 0
+        for i in range(1000):
+            total += i * i
+        return total
+    return best_time(loop, number=1000, repeat=5)
+
+
+def run(filter=None, rows=10000, repeat=5):
+    results = {}
+    for name, function, number in cases(rows):
+        if filter is not None and filter not in name:
+            continue
+        # calibrate next to every benchmark, the speed of shared machines drifts
+        unit = calibration()
+        seconds = best_time(function, number=number, repeat=repeat)
+        results[name] = seconds / unit
+        print('%-36s %12.2f us %10.4f' % (name, seconds * 1e6, seconds / unit))
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = 0
+    print()
+    print('%-36s %10s %10s %8s' % ('BENCHMARK', 'BASELINE', 'CURRENT', 'CHANGE'))
+    for name, value in results.items():
+        if name not in baseline:
+            continue
+        change = value / baseline[name] - 1
+        marker = ''
+        if change > threshold:
+            marker = '  REGRESSION'
+            regressions += 1
+        print('%-36s %10.4f %10.4f %+7.0f%%%s' % (name, baseline[name], value,
+                                                  change * 100, marker))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the object model microbenchmarks')
+    parser.add_argument('-k', '--filter',
+                        help='Only run the benchmarks whose name contains FILTER')
+    parser.add_argument('--rows', type=int, default=10000,
+                        help='Rows of the print benchmarks')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save', metavar='FILE', nargs='?', const=BASELINE,
+                        help='Save the results as the baseline')
+    parser.add_argument('--compare', metavar='FILE', nargs='?', const=BASELINE,
+                        help='Compare the results with a baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Slowdown over the baseline considered a regression')
+    options = parser.parse_args()
+
+    print('python %s, calibration unit in the last column' % platform.python_version())
+    results = run(options.filter, options.rows, options.repeat)
+
+    if options.save is not None:
+        # only the benchmarks that were run are replaced in the baseline
+        saved = {}
+        if os.path.exists(options.save):
+            with open(options.save, 'r') as f:
+                saved = json.load(f)['results']
+        saved.update(results)
+        with open(options.save, 'w') as f:
+            json.dump({'python': platform.python_version(), 'results': saved},
+                      f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    if options.compare is not None:
+        with open(options.compare, 'r') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, options.threshold)
+        if regressions:
+            print('%d benchmarks are more than %d%% slower than the baseline' %
+                  (regressions, options.threshold * 100))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
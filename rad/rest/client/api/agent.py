@@ -0,0 +1,206 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+import socket
+import socketserver
+import struct
+import threading
+from pathlib import Path
+
+from rad.rest.client import RADError
+from rad.rest.client.api.authentication_1 import Session
+from rad.rest.client.api.rad_response import RawResponse
+from rad.rest.client.util import codec
+
+LOG = logging.getLogger(__name__)
+AGENT_SOCKET = '~/.cache/rad/agent.sock'
+HEADER = struct.Struct('!I')
+
+
+def agent_socket_path(path=None):
+    if path is None:
+        path = os.environ.get('RAD_AGENT_SOCKET', AGENT_SOCKET)
+    return Path(path).expanduser()
+
+
+def send_message(sock, message):
+    data = codec.dumps(message)
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def receive_exactly(sock, size):
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def receive_message(sock):
+    header = receive_exactly(sock, HEADER.size)
+    if header is None:
+        return None
+    data = receive_exactly(sock, HEADER.unpack(header)[0])
+    if data is None:
+        return None
+    return codec.loads(data)
+
+
+class AgentClient:
+    # Forwards the requests of a Session to the agent, every thread keeps its
+    # own connection to the agent socket
+    def __init__(self, path=None):
+        self.path = agent_socket_path(path)
+        self.local = threading.local()
+
+    def available(self):
+        try:
+            self.connection()
+        except OSError as e:
+            LOG.debug('RAD agent at %s is not available: %s' % (self.path, str(e)))
+            return False
+        return True
+
+    def connection(self):
+        sock = getattr(self.local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(str(self.path))
+            except OSError:
+                sock.close()
+                raise
+            self.local.sock = sock
+        return sock
+
+    def close(self):
+        sock = getattr(self.local, 'sock', None)
+        if sock is not None:
+            sock.close()
+            self.local.sock = None
+
+    def request(self, session, method, url, **kwargs):
+        message = {
+            'protocol': session.protocol,
+            'hostname': session.hostname,
+            'port': session.port,
+            'method': method,
+            'url': url,
+            'kwargs': kwargs
+        }
+        try:
+            sock = self.connection()
+            send_message(sock, message)
+            reply = receive_message(sock)
+        except OSError as e:
+            self.close()
+            raise RADError('RAD agent request failed: %s' % str(e))
+        if reply is None:
+            self.close()
+            raise RADError('RAD agent closed the connection')
+        if reply.get('error') is not None:
+            raise RADError('RAD agent request failed: %s' % reply['error'])
+        return RawResponse(reply['status_code'], reply['content'].encode('utf-8'))
+
+
+class AgentHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                message = receive_message(self.request)
+            except (OSError, ValueError) as e:
+                LOG.debug('Dropping agent client: %s' % str(e))
+                return
+            if message is None:
+                return
+            try:
+                reply = self.server.forward(message)
+            except Exception as e:
+                LOG.warning('Request to %s failed: %s' % (message.get('url'), str(e)))
+                reply = {'error': str(e)}
+            send_message(self.request, reply)
+
+
+class AgentServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    # Keeps one logged in Session per host, with its pool of keep-alive
+    # connections, and forwards the requests of the CLI clients through it
+    daemon_threads = True
+
+    def __init__(self, path=None, pool_size=10):
+        self.path = agent_socket_path(path)
+        self.pool_size = pool_size
+        self.sessions = {}
+        self.sessions_lock = threading.Lock()
+        if self.path.exists():
+            if AgentClient(self.path).available():
+                raise RADError('RAD agent already running on %s' % self.path)
+            self.path.unlink()
+        parent = self.path.parent
+        if not parent.is_dir():
+            # only a directory of its own is made private
+            parent.mkdir(parents=True)
+            parent.chmod(0o700)
+        # the socket is created private, it is never open to others
+        umask = os.umask(0o177)
+        try:
+            super().__init__(str(self.path), AgentHandler)
+        finally:
+            os.umask(umask)
+        self.path.chmod(0o600)
+
+    def server_close(self):
+        super().server_close()
+        if self.path.exists():
+            self.path.unlink()
+
+    def get_session(self, protocol, hostname, port):
+        key = (protocol, hostname, port)
+        filename = Session.cache_filename(protocol, hostname, port)
+        try:
+            mtime = filename.stat().st_mtime
+        except OSError:
+            mtime = None
+        with self.sessions_lock:
+            session, loaded_mtime = self.sessions.get(key, (None, None))
+            # A new login rewrites the cache file, pick it up
+            if session is None or loaded_mtime != mtime:
+                LOG.debug('Loading session to %s:%s' % (hostname, port))
+                session = Session(protocol=protocol, hostname=hostname, port=port)
+                # the clients retry themselves
+                session.retries = 0
+                username = os.environ.get('RAD_USERNAME')
+                password = os.environ.get('RAD_PASSWORD')
+                if username is not None and password is not None:
+                    session.credentials = (username, password)
+                session.load_session()
+                session.resize_pool(self.pool_size)
+                self.sessions[key] = (session, mtime)
+            return session
+
+    def forward(self, message):
+        session = self.get_session(
+            message['protocol'], message['hostname'], message['port'])
+        kwargs = message.get('kwargs', {})
+        # a (connect, read) timeout arrives as a list
+        if isinstance(kwargs.get('timeout'), list):
+            kwargs['timeout'] = tuple(kwargs['timeout'])
+        # validated, and logged in again if needed, like any other request
+        response = session.send(message['method'], message['url'], **kwargs)
+        return {'status_code': response.status_code,
+                'content': response.rsp.content.decode('utf-8')}
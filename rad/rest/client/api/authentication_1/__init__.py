@@ -16,3 +16,4 @@ RAD_NAMESPACE = 'com.oracle.solaris.rad.authentication'
 RAD_API_VERSION = '1.0'
 
 from .session import Session
+from .async_session import AsyncSession
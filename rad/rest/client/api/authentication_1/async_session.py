@@ -0,0 +1,77 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from rad.rest.client.api.authentication_1.session import Session
+
+LOG = logging.getLogger(__name__)
+
+
+class AsyncSession(Session):
+    # Blocking HTTP calls are handed to a thread pool so that many RAD calls
+    # can overlap on one event loop; max_workers bounds the calls in flight
+    # and the connection pool is sized to match.
+    def __init__(self, *args, max_workers=32, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_workers = max_workers
+        self.executor = None
+
+    async def __aenter__(self):
+        await self.run(self.load_session)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, tb):
+        self.close()
+        if exc_type is not None:
+            return False
+        return True
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    def load_session(self, force=False):
+        super().load_session(force)
+        self.resize_pool(self.max_workers)
+
+    async def run(self, function, *args, **kwargs):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                               thread_name_prefix='rad')
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(function, *args, **kwargs))
+
+    async def async_send(self, method, url, **kwargs):
+        return await self.run(self.send, method, url, **kwargs)
+
+    async def async_login(self, username, password, ssl_cert_verify=False, ssl_cert_path=None):
+        await self.run(self.login, username, password,
+                       ssl_cert_verify=ssl_cert_verify, ssl_cert_path=ssl_cert_path)
+
+    async def async_list_objects(self, rad_object, detailed=True):
+        rad_object._conn = self
+        response = await rad_object.async_request('GET', self.detail_path(detailed))
+        return self.objects_from_response(rad_object, response)
+
+    async def async_get_object(self, rad_object, pattern=None, detailed=True):
+        rad_object._conn = self
+        self.select_instance(rad_object, pattern)
+        response = await rad_object.async_request('GET', self.detail_path(detailed))
+        return self.object_from_response(rad_object, response)
@@ -13,27 +13,35 @@
 # limitations under the License.
 
 import logging
-import datetime
-import pickle
+import threading
+import time
 import requests
 from pathlib import Path
 from urllib.parse import urlparse
 
 from rad.rest.client import RADError, RADException, NotFoundError
-from rad.rest.client.api.rad_interface import RADInterface
-from rad.rest.client.api.rad_response import RADResponse
+from rad.rest.client.api.rad_interface import RADInterface, identity
+from rad.rest.client.api.resilience import RETRY_STATUS_CODES, backoff_delay, circuit_breaker
+from rad.rest.client.api.rad_response import RADResponse, RADResponseStream, RawResponse
 from rad.rest.client.api.authentication_1 import RAD_NAMESPACE, RAD_API_VERSION
+from rad.rest.client.util import codec
+from rad.rest.client.api.authentication_1.session_cache import read_session_cache, write_session_cache
 
 LOG = logging.getLogger(__name__)
-CACHE_FILE_VERSION='1.0.0'
-
-def modification_date(filename):
-    t = filename.stat().st_mtime
-    return datetime.datetime.fromtimestamp(t)
+CACHE_DIRECTORY = '~/.cache/rad'
+# Seconds to connect, and to wait for the server between two reads, so
+# that an unreachable host fails instead of hanging on the TCP timeout
+DEFAULT_TIMEOUT = (10.0, 60.0)
 
 
 class Session(RADInterface):
     RAD_COLLECTION = 'Session'
+    RAD_CACHEABLE = False
+
+    # The url is built once, it is the base of every request url
+    protocol = identity('_protocol', ('_base_url',))
+    hostname = identity('_hostname', ('_base_url',))
+    port = identity('_port', ('_base_url',))
 
     def __init__(self, protocol='https', hostname=None, port=6788, url=None):
         super().__init__(RAD_NAMESPACE, Session.RAD_COLLECTION, RAD_API_VERSION)
@@ -43,23 +51,68 @@ class Session(RADInterface):
             self.port = port
         elif url is not None:
             parsed_url = urlparse(url)
-            self.hostname = parsed_url.netloc
+            self.hostname = parsed_url.hostname
             self.protocol = parsed_url.scheme
-            self.port = parsed_url.port
+            self.port = parsed_url.port or port
         else:
             raise RADException('hostname or url is needed')
+        self._conn = self
         self.session = None
         self._closed = None
         self.max_session_time = 0
-        filename = '~/.cache/rad/{}_{}_{}.dat'.format(
+        self.timeout = DEFAULT_TIMEOUT
+        # time.monotonic() by which every request must be done, if any
+        self.deadline = None
+        self.credentials = None
+        self.agent = None
+        self.cache = None
+        # collection -> {href: (expiry, object assembled from several
+        # requests)}, see Zone.get_properties. Kept for tree_ttl seconds, 0
+        # does not keep them, and cleared like the response cache
+        self.trees = {}
+        self.tree_ttl = 0
+        self.tracer = None
+        # Idempotent requests are retried on connection errors and 502-504
+        self.retries = 2
+        self.backoff = 0.2
+        self.breaker = circuit_breaker(self.url)
+        # RateLimiter of the requests to the host, if any
+        self.limiter = None
+        self.stats = {'validations_skipped': 0, 'validations': 0, 'relogins': 0}
+        self._validated = True
+        self._validation_lock = threading.Lock()
+        # Changed when a relogin starts and ends, a request that failed
+        # across a relogin is sent again. _renewing is the thread logging in
+        self._logins = 0
+        self._renewing = None
+        self.pool_size = None
+        self.session_filename = Session.cache_filename(
             self.protocol, self.hostname, self.port)
-        self.session_filename = Path(filename).expanduser()
+
+    @staticmethod
+    def cache_filename(protocol, hostname, port):
+        filename = '{}_{}_{}.json'.format(protocol, hostname, port)
+        return Path(CACHE_DIRECTORY).expanduser() / filename
+
+    @staticmethod
+    def cached_hostnames(protocol='https', port=6788):
+        prefix = '{}_'.format(protocol)
+        suffix = '_{}.json'.format(port)
+        directory = Path(CACHE_DIRECTORY).expanduser()
+        if not directory.is_dir():
+            return []
+        return sorted(path.name[len(prefix):-len(suffix)]
+                      for path in directory.glob(prefix + '*' + suffix))
 
     def __enter__(self):
         self.load_session()
         return self
 
     def __exit__(self, exc_type, exc_value, tb):
+        LOG.debug('Session to %s saved %d validation requests (%s)' %
+                  (self.hostname, self.validations_saved, self.stats))
+        if self.tracer is not None:
+            self.tracer.add_stats(dict(self.stats, validations_saved=self.validations_saved))
         if exc_type is not None:
             #traceback.print_exception(exc_type, exc_value, tb)
             return False
@@ -67,64 +120,242 @@ class Session(RADInterface):
 
     @property
     def url(self):
-        url = '%(protocol)s://%(hostname)s:%(port)s' % {
-            'protocol': self.protocol,
-            'hostname': self.hostname,
-            'port': self.port,
-        }
-        return url
+        if self._base_url is None:
+            self._base_url = '%(protocol)s://%(hostname)s:%(port)s' % {
+                'protocol': self.protocol,
+                'hostname': self.hostname,
+                'port': self.port,
+            }
+        return self._base_url
+
+    @property
+    def validations_saved(self):
+        return self.stats['validations_skipped'] - self.stats['validations']
 
     def load_session(self, force=False):
-        was_read_from_cache = False
         LOG.debug('Loading or generating session...')
-        if self.session_filename.is_file() and not force:
-            time = modification_date(self.session_filename)
-            last_modification = (datetime.datetime.now() - time).seconds
-            if self.max_session_time == 0 or last_modification < self.max_session_time:
-                with self.session_filename.open("rb") as f:
-                    version = pickle.load(f)
-                    if version == CACHE_FILE_VERSION:
-                        self.session = pickle.load(f)
-                        self.rad_reference_id = pickle.load(f)
-                        was_read_from_cache = True
-                        LOG.debug("Loaded session from cache version %s (last access %ds ago) "
-                                % (version, last_modification))
-                        self._closed = None if self.is_logged_in() else True
-                    else:
-                        LOG.debug("Cache file version %s is not valid, should be %s"
-                                % (version, CACHE_FILE_VERSION))
-        if not was_read_from_cache:
+        if self.session is None:
             self.session = requests.Session()
-            self.rad_reference_id = None
+        else:
+            # other threads may be sending requests through its pool
+            self.session.cookies.clear()
+        self.rad_reference_id = None
+        cache = None if force else read_session_cache(self.session_filename)
+        if cache is not None and cache.get('expires') is not None and \
+                cache['expires'] < time.time():
+            LOG.debug('Cached session expired')
+            cache = None
+        if cache is None:
             self._closed = True
+            self._validated = True
             LOG.debug('Created new session')
+            return
+
+        self.session.verify = cache.get('verify', True)
+        for cookie in cache.get('cookies', []):
+            self.session.cookies.set_cookie(
+                requests.cookies.create_cookie(**cookie))
+        self.rad_reference_id = cache.get('reference_id')
+        LOG.debug('Loaded session from cache (saved %ds ago)' %
+                  (time.time() - cache.get('saved', 0)))
+        # Trust the cached session, the first request
+        # validates it (see validate)
+        self._closed = None
+        self._validated = False
+        self.stats['validations_skipped'] += 1
 
     def is_logged_in(self):
         response = self.request("GET")
         if response.status != 'success':
-            LOG.debug('Request to get session %d state failed' % self.rad_reference_id)
+            LOG.debug('Request to get session %s state failed' % self.rad_reference_id)
             return False
         return True        
 
     def save_session(self):
-        parent = self.session_filename.parent
-        if not parent.is_dir():
-            parent.mkdir(parents=True)
-        parent.chmod(0o700)
-        with self.session_filename.open("wb") as f:
-            pickle.dump(CACHE_FILE_VERSION, f)
-            pickle.dump(self.session, f)
-            pickle.dump(self.rad_reference_id, f)
-            LOG.debug("Saved session to cache")
-        self.session_filename.chmod(0o600)
-
-    def request(self, method, path=None, **kwargs):
-        if path is None:
-            url = '{}/{}'.format(self.url, self.href)
-        else:
-            url = '{}/{}{}'.format(self.url, self.href, path)
-        res = self.session.request(method, url, **kwargs)
-        return RADResponse(res)
+        now = time.time()
+        cookies = [{
+            'name': cookie.name,
+            'value': cookie.value,
+            'domain': cookie.domain,
+            'path': cookie.path,
+            'secure': cookie.secure,
+            'expires': cookie.expires
+        } for cookie in self.session.cookies]
+        write_session_cache(self.session_filename, {
+            'reference_id': self.rad_reference_id,
+            'verify': self.session.verify,
+            'cookies': cookies,
+            'saved': now,
+            'expires': now + self.max_session_time if self.max_session_time else None
+        })
+        LOG.debug("Saved session to cache")
+
+    def resize_pool(self, maxsize):
+        if self.pool_size == maxsize:
+            return
+        self.pool_size = maxsize
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=maxsize, pool_maxsize=maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def send(self, method, url, collection=None, stream=False, idempotent=None, direct=False,
+             **kwargs):
+        cacheable = self.cache is not None and collection is not None and method == 'GET'
+        if cacheable:
+            cached = self.cache.get(collection, url)
+            if cached is not None:
+                if self.tracer is not None:
+                    self.tracer.record(method, url, cached[0], len(cached[1]), cached=True)
+                if stream:
+                    return RADResponseStream(RawResponse(*cached))
+                return RADResponse(RawResponse(*cached))
+            # a streamed response can not be cached, prefer caching
+            if self.cache.ttl(collection) > 0:
+                stream = False
+        timeout = kwargs.pop('timeout', self.timeout)
+        if idempotent is None:
+            idempotent = method in ('GET', 'HEAD')
+        validated = self._validated
+        logins = self._logins
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            request_timeout = self.deadline_timeout(timeout)
+            self.breaker.check()
+            if self.limiter is not None:
+                self.limiter.acquire()
+            sent = time.perf_counter()
+            try:
+                res = self.transport(method, url, stream, timeout=request_timeout, direct=direct,
+                                     **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, RADError) as e:
+                self.breaker.failure()
+                if not idempotent or attempt >= self.retries:
+                    if self.tracer is not None:
+                        self.tracer.record(method, url, error=e, retries=attempt,
+                                           elapsed=time.perf_counter() - start)
+                    raise
+                LOG.debug('%s %s failed (%s), retrying' % (method, url, str(e)))
+            except BaseException:
+                # anything else is a failure too, a half open circuit must
+                # not wait forever for the outcome of its probe
+                self.breaker.failure()
+                raise
+            else:
+                if res.status_code not in RETRY_STATUS_CODES:
+                    self.breaker.success()
+                    break
+                self.breaker.failure()
+                if not idempotent or attempt >= self.retries:
+                    break
+                LOG.debug('%s %s returned %d, retrying' % (method, url, res.status_code))
+            time.sleep(backoff_delay(attempt, self.backoff))
+            attempt += 1
+        received = time.perf_counter()
+        if stream and res.status_code == 200:
+            self._validated = True
+            # the body is decoded by the caller while it is downloaded
+            self.trace(method, url, res, start, sent, received, received,
+                       int(res.headers.get('Content-Length', 0)), attempt)
+            return RADResponseStream(res)
+        response = RADResponse(res)
+        self.trace(method, url, res, start, sent, received, time.perf_counter(),
+                   len(res.content), attempt)
+        if not validated or self._logins != logins or self._renewing is not None:
+            # a request sent again after a relogin keeps all of its arguments,
+            # and is cached by that send
+            resent = self.validate(response, logins, method, url, collection=collection,
+                                   stream=stream, idempotent=idempotent, direct=direct,
+                                   timeout=timeout, **kwargs)
+            if resent is not response:
+                return resent
+        if cacheable and response.status == 'success':
+            self.cache.put(collection, url, response.status_code, response.rsp.content)
+        return response
+
+    def deadline_timeout(self, timeout):
+        # Past the deadline requests fail right away, before it they are cut
+        # short so that none of them outlives it
+        if self.deadline is None:
+            return timeout
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise RADError('Timed out')
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(min(value, remaining) for value in timeout)
+        return min(timeout, remaining)
+
+    def transport(self, method, url, stream, direct=False, **kwargs):
+        if self.agent is not None and not direct:
+            return self.agent.request(self, method, url, **kwargs)
+        if kwargs.get('json') is not None:
+            kwargs['data'] = codec.dumps(kwargs.pop('json'))
+            kwargs['headers'] = dict(kwargs.get('headers') or {},
+                                     **{'Content-Type': 'application/json'})
+        return self.session.request(method, url, stream=stream, **kwargs)
+
+    def trace(self, method, url, res, start, sent, received, decoded, size, retries):
+        if self.tracer is None:
+            return
+        # requests measures the time until the response headers are parsed,
+        # which includes connecting; agent responses only have the total
+        elapsed = getattr(res, 'elapsed', None)
+        server = received - sent if elapsed is None else elapsed.total_seconds()
+        self.tracer.record(method, url, res.status_code, size, retries,
+                           elapsed=decoded - start,
+                           server=server,
+                           transfer=max(received - sent - server, 0.0),
+                           decode=decoded - received)
+
+    def invalidate(self, collections):
+        for collection in collections:
+            self.trees.pop(collection, None)
+        if self.cache is not None:
+            self.cache.invalidate(collections)
+
+    def validate(self, response, logins, method, url, **kwargs):
+        if response.status_code != 401 and response.status == 'success':
+            self._validated = True
+            return response
+        if self._renewing == threading.get_ident():
+            # a request of the relogin itself
+            return response
+        with self._validation_lock:
+            if self._logins == logins:
+                if self._validated:
+                    return response
+                self._validated = True
+                self.stats['validations'] += 1
+                if self.is_logged_in():
+                    return response
+                self._closed = True
+                if self.credentials is None:
+                    LOG.warning('Session to %s is no longer valid, please login again' %
+                                self.hostname)
+                    return response
+                self.relogin()
+            elif response.status_code == 401:
+                LOG.debug('Session to %s was renewed while the request failed' %
+                          self.hostname)
+            else:
+                return response
+        return self.send(method, url, **kwargs)
+
+    def relogin(self):
+        username, password = self.credentials
+        LOG.debug('Session to %s expired, login again as %s' %
+                  (self.hostname, username))
+        self.stats['relogins'] += 1
+        self._logins += 1
+        self._renewing = threading.get_ident()
+        try:
+            self.login(username, password, ssl_cert_verify=self.session.verify)
+        finally:
+            self._renewing = None
+            self._logins += 1
 
     def login(self, username, password, ssl_cert_verify=False, ssl_cert_path=None):
         self.load_session(force=True)
@@ -141,11 +372,14 @@ class Session(RADInterface):
             "preserve": True,
             "timeout": -1
         }
-        response = self.request("POST", json=config_json)
+        # sent directly, the cookie has to end up in self.session to be saved
+        response = self.request("POST", json=config_json, direct=True)
         if response.status != 'success':
             LOG.debug('Login to %s as %s failed' %
                       (self.hostname, username))
             raise RADError(message='Login Failed')
+        self.credentials = (username, password)
+        self._closed = None
         self.href = response.payload.get('href')
         self.save_session()
         LOG.debug('Login to %s as %s succeded with namespace with href %s' %
@@ -155,44 +389,57 @@ class Session(RADInterface):
         # if rad_object.rad_instance_id is not None:
         #    raise RADException('Can not list instances from an instance')
         rad_object._conn = self
-        if detailed:
-            path = '?_rad_detail'
-        else:
-            path = None
-        response = rad_object.request('GET', path)
+        response = rad_object.request('GET', self.detail_path(detailed))
+        return self.objects_from_response(rad_object, response)
+
+    def iter_objects(self, rad_object, detailed=True):
+        # Like list_objects, but builds the objects while the listing is
+        # downloaded
+        rad_object._conn = self
+        response = rad_object.request('GET', self.detail_path(detailed), stream=True)
+        for item in response.items():
+            yield self.new_object(rad_object, item)
         if response.status != 'success':
             raise RADError(message='Request Failed')
-        output = []
-        for item in response.payload:
-            collection_class = rad_object.__class__
-            collection = collection_class.RAD_COLLECTION
-            new_rad_object = collection_class(_conn=self, href=item.get(
-                'href'), json=item.get(collection))
-            output.append(new_rad_object)
-        return output
 
     def get_object(self, rad_object, pattern=None, detailed=True):
         # if rad_object.rad_instance_id is None:
         #    raise RADException('Can not get instance from a collection')
         rad_object._conn = self
+        self.select_instance(rad_object, pattern)
+        response = rad_object.request('GET', self.detail_path(detailed))
+        return self.object_from_response(rad_object, response)
+
+    def detail_path(self, detailed):
         if detailed:
-            path = '?_rad_detail'
-        else:
-            path = None
+            return '?_rad_detail'
+        return None
+
+    def select_instance(self, rad_object, pattern):
         if pattern is not None:
             if pattern.get('name') is not None:
                 rad_object.rad_instance_id = pattern.get('name')
             elif pattern.get('uri') is not None:
                 rad_object.rad_instance_id = pattern.get('uri')
-        response = rad_object.request('GET', path)
+
+    def objects_from_response(self, rad_object, response):
+        if response.status != 'success':
+            raise RADError(message='Request Failed')
+        output = []
+        for item in response.payload:
+            output.append(self.new_object(rad_object, item))
+        return output
+
+    def object_from_response(self, rad_object, response):
         if response.status != 'success':
             if response.status == 'object not found':
                 raise NotFoundError(response.status)
             LOG.error(response.status)
             raise RADError(message='Request Failed')
-        item = response.payload
+        return self.new_object(rad_object, response.payload)
+
+    def new_object(self, rad_object, item):
         collection_class = rad_object.__class__
         collection = collection_class.RAD_COLLECTION
-        new_rad_object = collection_class(_conn=self, href=item.get(
+        return collection_class(_conn=self, href=item.get(
             'href'), json=item.get(collection))
-        return new_rad_object
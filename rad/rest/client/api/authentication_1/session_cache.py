@@ -0,0 +1,70 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import fcntl
+import json
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+
+LOG = logging.getLogger(__name__)
+CACHE_FILE_VERSION = '2.0.0'
+
+
+@contextmanager
+def locked(filename):
+    # Writers serialize on a sibling lock file. Readers do not need it, the
+    # cache file is only ever replaced atomically
+    lock_filename = filename.with_name(filename.name + '.lock')
+    fd = os.open(str(lock_filename), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def read_session_cache(filename):
+    try:
+        with open(str(filename), 'r') as f:
+            cache = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        LOG.debug('Could not read session cache %s: %s' % (filename, str(e)))
+        return None
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_FILE_VERSION:
+        LOG.debug('Cache file version %s is not valid, should be %s' %
+                  (cache.get('version') if isinstance(cache, dict) else None,
+                   CACHE_FILE_VERSION))
+        return None
+    return cache
+
+
+def write_session_cache(filename, cache):
+    parent = filename.parent
+    parent.mkdir(parents=True, exist_ok=True)
+    parent.chmod(0o700)
+    cache = dict(cache, version=CACHE_FILE_VERSION)
+    with locked(filename):
+        fd, tmp_filename = tempfile.mkstemp(dir=str(parent), prefix='.' + filename.name)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(cache, f)
+            os.chmod(tmp_filename, 0o600)
+            os.replace(tmp_filename, str(filename))
+        except BaseException:
+            os.unlink(tmp_filename)
+            raise
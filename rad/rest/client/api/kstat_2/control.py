@@ -22,7 +22,9 @@ LOG = logging.getLogger(__name__)
 
 
 class Control(RADInterface):
+    __slots__ = ()
     RAD_COLLECTION = 'Control'
+    RAD_INVALIDATES = ('Kstat',)
 
     def __init__(self, *args, **kwargs):
         super().__init__(RAD_NAMESPACE, Control.RAD_COLLECTION,
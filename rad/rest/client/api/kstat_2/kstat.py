@@ -16,6 +16,8 @@ from rad.rest.client.api.rad_interface import RADInterface
 from rad.rest.client.api.kstat_2 import RAD_API_VERSION, RAD_NAMESPACE
 
 class Nv():
+    __slots__ = ('name', 'type', 'flags', 'string', 'strings', 'integer', 'integers', 'kstat')
+
     def __init__(self, json=None):
         self.load(json)
 
@@ -40,16 +42,21 @@ class Nv():
             self.kstat = json.get('kstat')
  
 class Kstat(RADInterface):
+    __slots__ = ()
     RAD_COLLECTION = 'Kstat'
+    RAD_READONLY_METHODS = ('getMap', 'getFlags', 'getMapMetadata', 'getNvMetadata')
 
     def __init__(self, *args, **kwargs):
         super().__init__(RAD_NAMESPACE, Kstat.RAD_COLLECTION, RAD_API_VERSION,*args, **kwargs)
 
     def getMap(self):
-        payload = self.rad_method('getMap', {})
+        # The map can be large, decode it while it is downloaded
+        response = self.request('PUT', '/_rad_method/getMap', json={}, stream=True,
+                                idempotent=self.is_idempotent('getMap'))
         map = {}
-        for key, value in payload.items():
+        for key, value in response.pairs():
             map[key] = Nv(value)
+        self.method_payload('getMap', response)
         return map
 
 
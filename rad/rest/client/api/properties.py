@@ -17,27 +17,74 @@ from rad.rest.client.exceptions import RADError
 from rad.rest.client import RADException
 
 
+# Value of a loaded property that was not decoded yet
+UNDECODED = object()
+
+
 @total_ordering
 class Property:
+    __slots__ = ('name', '_value', 'raw', 'json')
     RIGHT_ALIGNED = False
 
     def __init__(self, name):
         self.name = name
-        self.value = None
+        self._value = None
+        self.raw = None
         self.json = None
 
-    def load(self, json):
-        self.json = json
-        value = json.get('value')
-        if self.name != self.json.get('name'):
+    @property
+    def value(self):
+        # Decoded on first access, most callers only read a few properties
+        if self._value is UNDECODED:
+            self._value = self.decode_raw(self.raw)
+            self.raw = None
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
+    def load(self, json, keep_json=True):
+        # Without keep_json only the value is kept, for inventories of many
+        # objects
+        value = self.raw_value(json)
+        if self.name != json.get('name'):
             raise RADException('Could not load property %s=%s' % (
-                self.json.get('name'), value))
+                json.get('name'), value))
+        if keep_json:
+            self.json = json
+        self.raw = value
+        self._value = UNDECODED
+
+    def raw_value(self, json):
+        return json.get('value')
 
-        self.value = self.decode(value)
+    def decode_raw(self, raw):
+        return self.decode(raw)
 
     def decode(self, value):
         return value
 
+    def passthrough(self):
+        # Decoding does not change the values of this class
+        return self.__class__.decode is Property.decode
+
+    def json_value(self):
+        # The value for json output, the raw one when decoding does not
+        # change it
+        if self.passthrough():
+            return self.raw if self._value is UNDECODED else self._value
+        return self.value
+
+    def clone(self):
+        # Everything but the name is shared by the class
+        property = object.__new__(self.__class__)
+        property.name = self.name
+        property._value = None
+        property.raw = None
+        property.json = None
+        return property
+
     def __str__(self):
         return str(self.value)
     
@@ -52,21 +99,21 @@ class Property:
         
 
 class ArrayProperty(Property):
-    def load(self, json):
-        self.json = json
-        listvalue = json.get('listvalue')
-        if self.name != self.json.get('name'):
-            raise RADException('Could not load property %s=%s' % (
-                self.json.get('name'), listvalue))
+    __slots__ = ()
 
-        self.value = [self.decode(value) for value in listvalue]
+    def raw_value(self, json):
+        return json.get('listvalue')
+
+    def decode_raw(self, raw):
+        return [self.decode(value) for value in raw]
 
 
 class BooleanProperty(Property):
-    def __init__(self, name, trueValue='true', falseValue='false', *args, **kwargs):
-        super().__init__(name, *args, **kwargs)
-        self.trueValue = trueValue
-        self.falseValue = falseValue
+    __slots__ = ()
+    # Properties with other values have a subclass of their own, like
+    # OnOffProperty
+    trueValue = 'true'
+    falseValue = 'false'
 
     def decode(self, value):
         if value == self.trueValue:
@@ -81,8 +128,14 @@ class BooleanProperty(Property):
         return self.trueValue if self.value else self.falseValue
 
 
+class OnOffProperty(BooleanProperty):
+    __slots__ = ()
+    trueValue = 'on'
+    falseValue = 'off'
+
 
 class PathProperty(Property):
+    __slots__ = ()
 
     def decode(self, value):
         if value == '-':
@@ -96,6 +149,7 @@ class PathProperty(Property):
 
 
 class IntegerProperty(Property):
+    __slots__ = ()
     RIGHT_ALIGNED = True
 
     def decode(self, value):
@@ -107,6 +161,7 @@ class IntegerProperty(Property):
         return definition
 
 class FloatProperty(Property):
+    __slots__ = ()
     RIGHT_ALIGNED = True
 
     def decode(self, value):
@@ -114,6 +169,7 @@ class FloatProperty(Property):
 
 
 class SizeProperty(IntegerProperty):
+    __slots__ = ()
     POWER_LABELS = {0: '', 1: 'K', 2: 'M', 3: 'G', 4: 'T', 5: 'P', 6: 'E'}
 
     def decode(self, value):
@@ -137,6 +193,7 @@ class SizeProperty(IntegerProperty):
 
 
 class ByteProperty(SizeProperty):
+    __slots__ = ()
     UNIT_LABEL = {'B'}
 
     def __str__(self):
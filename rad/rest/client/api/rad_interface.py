@@ -13,22 +13,70 @@
 # limitations under the License.
 
 import logging
+import operator
+import sys
 import urllib
 
 from rad.rest.client import RADError, RADException, NotFoundError, ObjectError
-from rad.rest.client.api.rad_response import RADResponse
 
 LOG = logging.getLogger(__name__)
 
 
+# 'api/<namespace>/<version>/<collection>' of every collection, interned and
+# shared by all the objects
+HREF_PREFIXES = {}
+
+
+def href_prefix(namespace, version, collection):
+    key = (namespace, version, collection)
+    prefix = HREF_PREFIXES.get(key)
+    if prefix is None:
+        prefix = sys.intern('api/%s/%s/%s' % key)
+        HREF_PREFIXES[key] = prefix
+    return prefix
+
+
+def identity(slot, caches=('_href', '_url_base')):
+    # An attribute stored in slot, setting it drops the values cached from it
+    def set(self, value):
+        setattr(self, slot, value)
+        for cache in caches:
+            setattr(self, cache, None)
+    return property(operator.attrgetter(slot), set)
+
+
 class RADInterface(object):
+    __slots__ = ('_rad_namespace', '_rad_collection', '_rad_api_version', '_conn',
+                 '_rad_instance_id', '_rad_reference_id', 'json',
+                 '_href', '_url_base', '_url')
+    # GET responses may be served by the session response cache
+    RAD_CACHEABLE = True
+    # Methods that do not change anything on the server, any other method
+    # invalidates the cached responses of the collection
+    RAD_READONLY_METHODS = ()
+    # Other collections changed by the methods of this one
+    RAD_INVALIDATES = ()
+    # Methods that change the server but can safely be sent again, they are
+    # retried like the read-only ones
+    RAD_IDEMPOTENT_METHODS = ()
+
+    # The href and the request url are built once, changing any of these
+    # builds them again
+    rad_namespace = identity('_rad_namespace')
+    rad_collection = identity('_rad_collection')
+    rad_api_version = identity('_rad_api_version')
+    rad_instance_id = identity('_rad_instance_id')
+    rad_reference_id = identity('_rad_reference_id')
+
     def __init__(self, rad_namespace, rad_collection, rad_api_version=None, href=None, _conn=None, json=None):
-        self.rad_namespace = rad_namespace
-        self.rad_collection = rad_collection
-        self.rad_api_version = rad_api_version or '1.0'
+        self._rad_namespace = rad_namespace
+        self._rad_collection = rad_collection
+        self._rad_api_version = rad_api_version or '1.0'
         self._conn = _conn
-        self.rad_instance_id = None
-        self.rad_reference_id = None
+        self._rad_instance_id = None
+        self._rad_reference_id = None
+        self._href = None
+        self._url_base = None
         if href is not None:
             self.href = href
         self.json = json
@@ -36,21 +84,20 @@ class RADInterface(object):
 
     @property
     def href(self):
-        href = 'api/%(namespace)s/%(version)s/%(collection)s' % {
-            'namespace': self.rad_namespace,
-            'version': self.rad_api_version,
-            'collection': self.rad_collection
-        }
-        if self.rad_instance_id is not None:
-            return '%(href)s/%(id)s' % {
+        if self._href is not None:
+            return self._href
+        href = href_prefix(self._rad_namespace, self._rad_api_version, self._rad_collection)
+        if self._rad_instance_id is not None:
+            href = '%(href)s/%(id)s' % {
                 'href': href,
-                'id': urllib.parse.quote(self.rad_instance_id, safe=',')
+                'id': urllib.parse.quote(self._rad_instance_id, safe=',')
             }
-        if self.rad_reference_id is not None:
-            return '%(href)s/_rad_reference/%(id)d' % {
+        elif self._rad_reference_id is not None:
+            href = '%(href)s/_rad_reference/%(id)d' % {
                 'href': href,
-                'id': self.rad_reference_id
+                'id': self._rad_reference_id
             }
+        self._href = href
         return href
 
     @href.setter
@@ -60,43 +107,77 @@ class RADInterface(object):
         parts = href.split('/')
         if parts[0] != 'api':
             raise RADException('Malformed href uri %s' % href)
-        self.rad_namespace = parts[1]
-        self.rad_api_version = parts[2]
-        self.rad_collection = parts[3]
+        self._rad_namespace = sys.intern(parts[1])
+        self._rad_api_version = sys.intern(parts[2])
+        self._rad_collection = sys.intern(parts[3])
         if len(parts) == 5 and parts[4] != '':
-            self.rad_instance_id = urllib.parse.unquote(parts[4])
+            self._rad_instance_id = urllib.parse.unquote(parts[4])
         else:
-            self.rad_instance_id = None
+            self._rad_instance_id = None
         if len(parts) == 6 and parts[4] == '_rad_reference':
-            self.rad_reference_id = int(parts[5])
+            self._rad_reference_id = int(parts[5])
         else:
-            self.rad_reference_id = None
+            self._rad_reference_id = None
+        self._href = None
+        self._url_base = None
 
     def init(self):
         pass
 
-    def request(self, method, path=None, **kwargs):
-        if path is None:
-            url = '{}/{}'.format(self._conn.url, self.href)
-        else:
-            url = '{}/{}{}'.format(self._conn.url, self.href, path)
+    def request_url(self, path=None):
         if self._conn is None:
             raise RADError('_conn is undefined')
-        res = self._conn.session.request(method, url, **kwargs)
-        return RADResponse(res)
+        # rebuilt when the connection url is another string
+        base = self._conn.url
+        if self._url_base is not base:
+            self._url = '%s/%s' % (base, self.href)
+            self._url_base = base
+        if path is None:
+            return self._url
+        return self._url + path
+
+    def request(self, method, path=None, **kwargs):
+        return self._conn.send(method, self.request_url(path),
+                               collection=self.cache_collection(), **kwargs)
+
+    async def async_request(self, method, path=None, **kwargs):
+        return await self._conn.async_send(method, self.request_url(path),
+                                           collection=self.cache_collection(), **kwargs)
+
+    def cache_collection(self):
+        if self.RAD_CACHEABLE:
+            return self.rad_collection
+        return None
+
+    def is_idempotent(self, method):
+        return method in self.RAD_READONLY_METHODS or method in self.RAD_IDEMPOTENT_METHODS
 
     def rad_method(self, method, json_body, **kwargs):
+        kwargs.setdefault('idempotent', self.is_idempotent(method))
         response = self.request(
-            'PUT', '/_rad_method/{}'.format(method), json=json_body, **kwargs)
+            'PUT', '/_rad_method/' + method, json=json_body, **kwargs)
+        return self.method_payload(method, response)
+
+    async def async_rad_method(self, method, json_body, **kwargs):
+        kwargs.setdefault('idempotent', self.is_idempotent(method))
+        response = await self.async_request(
+            'PUT', '/_rad_method/' + method, json=json_body, **kwargs)
+        return self.method_payload(method, response)
+
+    def method_payload(self, method, response):
+        if method not in self.RAD_READONLY_METHODS:
+            self._conn.invalidate((self.rad_collection,) + tuple(self.RAD_INVALIDATES))
         if response.status != 'success':
             LOG.warning('While executing method %s on %s' %
                         (method, self.href))
             LOG.warning(response.status)
-            if response.payload.get('code'):
-                LOG.warning(response.payload.get('code'))
-            if response.payload.get('stderr'):
-                LOG.warning(response.payload.get('stderr'))
+            payload = response.payload if isinstance(response.payload, dict) else {}
+            if payload.get('code'):
+                LOG.warning(payload.get('code'))
+            if payload.get('stderr'):
+                LOG.warning(payload.get('stderr'))
             if response.status == 'object not found':
                 raise NotFoundError(response.status)
-            raise ObjectError(message=response.payload.get('stderr'))
+            raise ObjectError(message=payload.get('stderr') or response.status,
+                              code=payload.get('code'))
         return response.payload
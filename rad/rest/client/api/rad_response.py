@@ -12,13 +12,158 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import codecs
+import json
+
+from rad.rest.client import RADException
+from rad.rest.client.util import codec
+
+
+class RawResponse(object):
+    # Minimal stand-in for requests.Response, for responses that did not
+    # come straight from the server (agent, response cache)
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {'Content-Length': str(len(content))}
+
+    def json(self):
+        return codec.loads(self.content)
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+
 class RADResponse(object):
     def __init__(self, rsp):
         self.rsp = rsp
         self.status_code = rsp.status_code
-        self.body = rsp.json()
+        self.status = 'unknown'
+        self.payload = None
+        try:
+            self.body = codec.loads(rsp.content)
+        except ValueError:
+            self.body = None
         if self.body:
             self.status = self.body.get('status', 'unknown')
             self.payload = self.body.get('payload')
-                
 
+    def items(self):
+        if self.status == 'success' and isinstance(self.payload, list):
+            return iter(self.payload)
+        return iter(())
+
+    def pairs(self):
+        if self.status == 'success' and isinstance(self.payload, dict):
+            return iter(self.payload.items())
+        return iter(())
+
+
+class RADResponseStream(object):
+    # Decodes a {"status": ..., "payload": ...} body while it is downloaded,
+    # items() yields the elements of an array payload and pairs() the
+    # members of an object payload one at a time, so the whole payload is
+    # never held in memory. status and any other payload are known once the
+    # iteration is over.
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, rsp):
+        self.rsp = rsp
+        self.status_code = rsp.status_code
+        self.status = 'unknown'
+        self.payload = None
+        self.decoder = json.JSONDecoder()
+        self.chunks = rsp.iter_content(chunk_size=self.CHUNK_SIZE)
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def items(self):
+        return self.parse('[')
+
+    def pairs(self):
+        return self.parse('{')
+
+    def fill(self):
+        if self.eof:
+            return False
+        if self.position > 0:
+            self.buffer = self.buffer[self.position:]
+            self.position = 0
+        for chunk in self.chunks:
+            if chunk:
+                self.buffer += self.text_decoder.decode(chunk)
+                return True
+        self.buffer += self.text_decoder.decode(b'', final=True)
+        self.eof = True
+        return False
+
+    def peek(self):
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in ' \t\r\n':
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.fill():
+                raise RADException('Unexpected end of response')
+
+    def expect(self, characters):
+        character = self.peek()
+        if character not in characters:
+            raise RADException('Malformed response, expected %s got %s' %
+                               (characters, character))
+        self.position += 1
+        return character
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                # a value ending the buffer may be cut, a number for example
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise RADException('Malformed response')
+            self.fill()
+
+    def parse(self, kind):
+        self.expect('{')
+        if self.peek() == '}':
+            self.position += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            if key == 'payload' and self.peek() == kind and self.status in ('unknown', 'success'):
+                self.position += 1
+                if kind == '[':
+                    yield from self.elements(']', self.value)
+                else:
+                    yield from self.elements('}', self.member)
+            elif key == 'status':
+                self.status = self.value()
+            elif key == 'payload':
+                self.payload = self.value()
+            else:
+                self.value()
+            if self.expect(',}') == '}':
+                return
+
+    def member(self):
+        key = self.value()
+        self.expect(':')
+        return key, self.value()
+
+    def elements(self, closing, element):
+        if self.peek() == closing:
+            self.position += 1
+            return
+        while True:
+            yield element()
+            if self.expect(',' + closing) == closing:
+                return
@@ -0,0 +1,113 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import random
+import threading
+import time
+
+from rad.rest.client import CircuitOpenError
+
+LOG = logging.getLogger(__name__)
+
+# Status codes of a server (or proxy) that is restarting
+RETRY_STATUS_CODES = (502, 503, 504)
+
+
+def backoff_delay(attempt, backoff=0.2, max_backoff=5.0):
+    # Exponential backoff with full jitter, so that the requests of a fleet
+    # job do not hit a restarted server all at once
+    return random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+
+
+class CircuitBreaker(object):
+    # Opens after threshold consecutive failures, then fails fast until
+    # reset_timeout has passed and lets one request through to probe the host
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, name, threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self.opened = 0
+        self._lock = threading.Lock()
+
+    def check(self):
+        with self._lock:
+            if self.state == CircuitBreaker.CLOSED:
+                return
+            if self.state == CircuitBreaker.OPEN and \
+                    time.monotonic() - self.opened >= self.reset_timeout:
+                LOG.debug('Probing %s again' % self.name)
+                self.state = CircuitBreaker.HALF_OPEN
+                return
+        raise CircuitOpenError('%s failed %d times in a row, not sending more requests' %
+                               (self.name, self.failures))
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.state = CircuitBreaker.CLOSED
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == CircuitBreaker.HALF_OPEN or \
+                    (self.threshold > 0 and self.failures >= self.threshold):
+                if self.state != CircuitBreaker.OPEN:
+                    LOG.warning('%s keeps failing, opening its circuit for %ds' %
+                                (self.name, self.reset_timeout))
+                self.state = CircuitBreaker.OPEN
+                self.opened = time.monotonic()
+
+
+class RateLimiter(object):
+    # Token bucket, at most rate requests per second after a first burst of
+    # burst requests. acquire() waits for a token
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = burst or max(1, int(rate))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit_breaker(name):
+    # One breaker per host, shared by every session of the process
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name)
+            _breakers[name] = breaker
+        return breaker
@@ -14,7 +14,6 @@
 
 from json.encoder import JSONEncoder
 import logging
-import copy
 
 from rad.rest.client import RADException
 from rad.rest.client.api.properties import Property
@@ -23,13 +22,34 @@ LOG = logging.getLogger(__name__)
 
 
 class Resource:
+    __slots__ = ('type', 'json', 'resources', '_properties', 'property_map', '_pending',
+                 'keep_json')
+    TYPE = None
     PROPERTIES = []
+    # name -> prototype of PROPERTIES, built once per class
+    PROPERTY_INDEX = {}
+    # TYPE -> class, every subclass defining a TYPE is added when it is
+    # defined. A later class with the same TYPE replaces the previous one
+    REGISTRY = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.PROPERTY_INDEX = {property.name: property for property in cls.PROPERTIES}
+        if cls.__dict__.get('TYPE') is not None:
+            Resource.REGISTRY[cls.TYPE] = cls
+
+    @staticmethod
+    def get_class(resource_type):
+        resource_class = Resource.REGISTRY.get(resource_type)
+        if resource_class is None:
+            raise RADException('No such a resource with type %s' % resource_type)
+        return resource_class
 
     @classmethod
     def get_property(cls, property_name):
-        for property in cls.PROPERTIES:
-            if property.name == property_name:
-                return copy.deepcopy(property)
+        prototype = cls.PROPERTY_INDEX.get(property_name)
+        if prototype is not None:
+            return prototype.clone()
         LOG.warning('No such a property %s defined in resource %s' %
                     (property_name, cls.TYPE))
         return Property(property_name)
@@ -42,36 +62,88 @@ class Resource:
         self.type = type
         self.json = None
         self.resources = None
-        self.properties = None
+        self._properties = None
+        self.property_map = {}
+        self._pending = None
+        self.keep_json = True
 
-    def load(self, json):
+    def load(self, json, keep_json=True):
+        # Inventories of many objects do not need the raw json of the
+        # resource and its properties once decoded
         if self.type != json.get('type'):
             raise RADException('Could not load resource %s' %
                                 json.get('type'))
         self.resources = []
-        self.properties = []
-        self.json = json
-        for property_json in json.get('properties'):
-            if property_json.get('value') or property_json.get('listvalue'):
-                property = self.load_property(property_json)
-                self.properties.append(property)
+        self.keep_json = keep_json
+        if keep_json:
+            self.json = json
+        self.defer([property_json for property_json in json.get('properties')
+                    if property_json.get('value') or property_json.get('listvalue')])
+
+    def defer(self, property_jsons):
+        # Keep the json of the properties, they are built when accessed
+        self._properties = None
+        self.property_map = {}
+        self._pending = {property_json.get('name'): property_json
+                         for property_json in property_jsons}
+
+    @property
+    def properties(self):
+        if self._pending is not None:
+            self._properties = [self.get(name) for name in self._pending]
+            self._pending = None
+        return self._properties
+
+    @properties.setter
+    def properties(self, properties):
+        self._pending = None
+        self._properties = properties
+        self.property_map = {property.name: property for property in properties or []}
+
+    def add_property(self, property):
+        self.properties.append(property)
+        self.property_map[property.name] = property
 
     def load_property(self, property_json):
         property_name = property_json.get('name')
         property = self.__class__.get_property(property_name)
-        property.load(property_json)
+        property.load(property_json, self.keep_json)
         return property
 
     def get(self, property_name):
-        properties = [
-            property for property in self.properties if property.name == property_name]
-        return properties[0] if len(properties) == 1 else None
+        property = self.property_map.get(property_name)
+        if property is None and self._pending is not None:
+            property_json = self._pending.get(property_name)
+            if property_json is not None:
+                property = self.load_property(property_json)
+                # the name of the prototype is shared, the one of the json is not
+                self.property_map[property.name] = property
+        return property
+
+    def json_values(self):
+        # (name, value) pairs for json output. Properties that were not built
+        # are decoded by their prototype, or passed through when decoding
+        # would not change them
+        if self._pending is None:
+            return [(property.name, property.json_value()) for property in self._properties]
+        values = []
+        for name, property_json in self._pending.items():
+            prototype = self.PROPERTY_INDEX.get(name)
+            if name in self.property_map or prototype is None:
+                values.append((name, self.get(name).json_value()))
+                continue
+            raw = prototype.raw_value(property_json)
+            if prototype.passthrough():
+                values.append((name, raw))
+            else:
+                values.append((name, prototype.decode_raw(raw)))
+        return values
 
     def to_json(self):
         json = {}
-        for property in self.properties:
-            if property.value:
-                json[property.name] = property.value
+        for name, value in self.json_values():
+            if value:
+                json[name] = value
         for resource in self.resources:
             if resource.get('tmp-id') is not None:
                 json.setdefault(resource.type, []).append(resource.to_json())
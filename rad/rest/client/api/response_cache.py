@@ -0,0 +1,117 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from rad.rest.client.util import codec
+
+LOG = logging.getLogger(__name__)
+RESPONSE_CACHE_DIRECTORY = '~/.cache/rad/responses'
+
+
+class ResponseCache:
+    # Read-through cache of successful GET responses, with a time to live per
+    # RAD collection. Entries live in memory and, if a directory is given, on
+    # disk so that they are shared by short lived processes. Mutating RAD
+    # methods invalidate the collections they affect.
+    def __init__(self, ttls=None, default_ttl=0, directory=None):
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.directory = Path(directory).expanduser() if directory is not None else None
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def ttl(self, collection):
+        return self.ttls.get(collection, self.default_ttl)
+
+    def filename(self, collection, url):
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return self.directory / ('%s-%s.json' % (collection, digest))
+
+    def get(self, collection, url):
+        if self.ttl(collection) <= 0:
+            return None
+        with self.lock:
+            entry = self.entries.get(url)
+        if entry is None and self.directory is not None:
+            entry = self.read(collection, url)
+        if entry is None:
+            return None
+        collection, expires, status_code, content = entry
+        if expires < time.time():
+            with self.lock:
+                self.entries.pop(url, None)
+            return None
+        with self.lock:
+            self.entries[url] = entry
+        LOG.debug('Cache hit for %s' % url)
+        return status_code, content
+
+    def put(self, collection, url, status_code, content):
+        ttl = self.ttl(collection)
+        if ttl <= 0:
+            return
+        entry = (collection, time.time() + ttl, status_code, content)
+        with self.lock:
+            self.entries[url] = entry
+        if self.directory is not None:
+            self.write(url, entry)
+
+    def invalidate(self, collections):
+        for collection in collections:
+            LOG.debug('Invalidating cached %s responses' % collection)
+            with self.lock:
+                self.entries = {url: entry for url, entry in self.entries.items()
+                                if entry[0] != collection}
+            if self.directory is not None and self.directory.is_dir():
+                for filename in self.directory.glob('%s-*.json' % collection):
+                    try:
+                        filename.unlink()
+                    except FileNotFoundError:
+                        pass
+
+    def read(self, collection, url):
+        try:
+            with open(str(self.filename(collection, url)), 'rb') as f:
+                data = codec.loads(f.read())
+            return collection, data['expires'], data['status_code'], data['content'].encode('utf-8')
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            LOG.debug('Could not read cached response for %s: %s' % (url, str(e)))
+            return None
+
+    def write(self, url, entry):
+        collection, expires, status_code, content = entry
+        if not self.directory.is_dir():
+            self.directory.mkdir(parents=True, mode=0o700)
+        fd, tmp_filename = tempfile.mkstemp(dir=str(self.directory), prefix='.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(codec.dumps({
+                    'url': url,
+                    'expires': expires,
+                    'status_code': status_code,
+                    'content': content.decode('utf-8')
+                }))
+            os.replace(tmp_filename, str(self.filename(collection, url)))
+        except BaseException:
+            os.unlink(tmp_filename)
+            raise
@@ -18,7 +18,9 @@ from rad.rest.client.api.zfsmgr_1 import RAD_NAMESPACE
 
 
 class ZfsDataset(RADInterface):
+    __slots__ = ()
     RAD_COLLECTION = 'ZfsDataset'
+    RAD_READONLY_METHODS = ('get_filesystems', 'get_props')
 
     def __init__(self, *args, **kwargs):
         super().__init__(RAD_NAMESPACE, ZfsDataset.RAD_COLLECTION, *args, **kwargs)
@@ -40,8 +42,8 @@ class ZfsDataset(RADInterface):
         json_body = {"props": props}
         return self.rad_method('get_props', json_body)
 
-    def get_properties(self, property_names=None):
+    def get_properties(self, property_names=None, keep_json=True):
         property_instances = self.get_props(property_names)
         resource = ZfsResource()
-        resource.load(property_instances)
+        resource.load(property_instances, keep_json)
         return resource
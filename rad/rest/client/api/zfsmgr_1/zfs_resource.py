@@ -17,6 +17,7 @@ from rad.rest.client.api.properties import ByteProperty, PathProperty
 
 
 class ZfsResource(Resource):
+    __slots__ = ()
     PROPERTIES = [
         PathProperty('name'),
         ByteProperty('used'),
@@ -28,12 +29,9 @@ class ZfsResource(Resource):
     def __init__(self, *args, **kwargs):
         super().__init__(None, *args, **kwargs)
 
-    def load(self, json):
+    def load(self, json, keep_json=True):
         self.resources = []
-        self.properties = []
-        self.json = json
-        for property_json in json:
-            property_name = property_json.get('name')
-            property = self.__class__.get_property(property_name)
-            property.load(property_json)
-            self.properties.append(property)
+        self.keep_json = keep_json
+        if keep_json:
+            self.json = json
+        self.defer(json)
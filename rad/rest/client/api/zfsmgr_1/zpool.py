@@ -18,7 +18,9 @@ from rad.rest.client.api.zfsmgr_1.zpool_resource import ZpoolResource
 
 
 class Zpool(RADInterface):
+    __slots__ = ()
     RAD_COLLECTION = 'Zpool'
+    RAD_READONLY_METHODS = ('get_props',)
 
     def __init__(self, *args, **kwargs):
         super().__init__(RAD_NAMESPACE, Zpool.RAD_COLLECTION, *args, **kwargs)
@@ -32,8 +34,8 @@ class Zpool(RADInterface):
         json_body = {"props": props}
         return self.rad_method('get_props', json_body)
 
-    def get_properties(self, property_names=None):
+    def get_properties(self, property_names=None, keep_json=True):
         property_instances = self.get_props(property_names)
         resource = ZpoolResource()
-        resource.load(property_instances)
+        resource.load(property_instances, keep_json)
         return resource
@@ -13,32 +13,33 @@
 # limitations under the License.
 
 from rad.rest.client.api.zfsmgr_1.zfs_resource import ZfsResource
-from rad.rest.client.api.properties import BooleanProperty, ByteProperty, PathProperty, Property
+from rad.rest.client.api.properties import ByteProperty, OnOffProperty, PathProperty, Property
 
 
 class ZpoolResource(ZfsResource):
+    __slots__ = ()
     PROPERTIES = [
         Property('name'),
 
         ByteProperty('allocated'),
         PathProperty('altroot'),
-        BooleanProperty('autoexpand', trueValue='on', falseValue='off'),
-        BooleanProperty('autoreplace', trueValue='on', falseValue='off'),
+        OnOffProperty('autoexpand'),
+        OnOffProperty('autoreplace'),
         PathProperty('bootfs'),
         PathProperty('cachefile'),
         ByteProperty('capacity'),
-        BooleanProperty('clustered', trueValue='on', falseValue='off'),
+        OnOffProperty('clustered'),
         Property('dedupditto'),
         Property('dedupratio'),
-        BooleanProperty('delegation', trueValue='on', falseValue='off'),
+        OnOffProperty('delegation'),
         Property('failmode'),
         ByteProperty('free'),
         Property('guid'),
         Property('health'),
         Property('lastscrub'),
-        BooleanProperty('listshares', trueValue='on', falseValue='off'),
-        BooleanProperty('listsnapshots', trueValue='on', falseValue='off'),
-        BooleanProperty('readonly', trueValue='on', falseValue='off'),
+        OnOffProperty('listshares'),
+        OnOffProperty('listsnapshots'),
+        OnOffProperty('readonly'),
         Property('scrubinterval'),
         ByteProperty('size'),
         Property('version')
@@ -12,13 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
+from rad.rest.client.util import background
 from rad.rest.client.api.zonemgr_1 import RAD_NAMESPACE
 from rad.rest.client.api.rad_interface import RADInterface
 from rad.rest.client.api.zonemgr_1.zone_resources import AnetResource, ZoneResourceFactory
 
 
 class Zone(RADInterface):
+    __slots__ = ('id', 'name', 'brand', 'uuid', 'auxstate', 'state')
     RAD_COLLECTION = 'Zone'
+    RAD_READONLY_METHODS = ('getResources', 'getResourceProperties')
 
     def __init__(self, *args, **kwargs):
         super().__init__(RAD_NAMESPACE, Zone.RAD_COLLECTION, *args, **kwargs)
@@ -56,13 +61,31 @@ class Zone(RADInterface):
             json_body['scope'] = {"type": scope.type}
         return self.rad_method('getResources', json_body)
 
-    def get_properties(self):
-        payload = self.getResources(scope=AnetResource())
+    def get_properties(self, refresh=False):
+        # With a tree_ttl the tree is kept by the session until it expires or
+        # a method that may change the configuration of the zones is called,
+        # callers must not modify it. Changes made by others are only seen
+        # once it expires
+        ttl = self._conn.tree_ttl
+        trees = self._conn.trees.setdefault(Zone.RAD_COLLECTION, {})
+        if ttl > 0 and not refresh:
+            cached = trees.get(self.href)
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1]
+        global_resource = self.build_properties()
+        if ttl > 0:
+            # trees is not the cache anymore if it was invalidated meanwhile
+            trees[self.href] = (time.monotonic() + ttl, global_resource)
+        return global_resource
+
+    def build_properties(self):
+        # both requests are sent at the same time
+        scoped = background(self.getResources, scope=AnetResource())
+        resource_instances = self.getResources()
         subresources = {}
-        for resource_instance in payload:
+        for resource_instance in scoped.result():
             subresources.setdefault(resource_instance['parent'], []).append(
                 ZoneResourceFactory.from_json(resource_instance))
-        resource_instances = self.getResources()
         global_resource = None
         resources = []
         for resource_instance in resource_instances:
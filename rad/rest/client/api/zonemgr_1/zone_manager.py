@@ -21,7 +21,9 @@ LOG = logging.getLogger(__name__)
 
 
 class ZoneManager(RADInterface):
+    __slots__ = ('evacuationState',)
     RAD_COLLECTION = 'ZoneManager'
+    RAD_INVALIDATES = ('Zone',)
 
     def __init__(self, *args, **kwargs):
         super().__init__(RAD_NAMESPACE, ZoneManager.RAD_COLLECTION, *args, **kwargs)
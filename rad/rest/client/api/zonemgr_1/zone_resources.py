@@ -16,12 +16,13 @@ import logging
 
 from rad.rest.client import RADException
 from rad.rest.client.api.resource import Resource
-from rad.rest.client.api.properties import ArrayProperty, BooleanProperty, ByteProperty, IntegerProperty, PathProperty, Property, SizeProperty
+from rad.rest.client.api.properties import ArrayProperty, BooleanProperty, ByteProperty, IntegerProperty, OnOffProperty, PathProperty, Property, SizeProperty
 
 LOG = logging.getLogger(__name__)
 
 
 class VlanResource(Resource):
+    __slots__ = ()
     TYPE = 'vlan'
     PROPERTIES = [
         IntegerProperty('tmp-id'),
@@ -35,6 +36,7 @@ class VlanResource(Resource):
 
 
 class MacResource(Resource):
+    __slots__ = ()
     TYPE = 'mac'
     PROPERTIES = [
         IntegerProperty('tmp-id')
@@ -46,6 +48,7 @@ class MacResource(Resource):
 
 
 class AnetResource(Resource):
+    __slots__ = ()
     TYPE = 'anet'
     PROPERTIES = [
         IntegerProperty('id'),
@@ -57,7 +60,7 @@ class AnetResource(Resource):
         Property('defrouter'),
         Property('allowed-dhcp-cids'),
         ArrayProperty('link-protection'),
-        BooleanProperty('iov', trueValue='on', falseValue='off'),
+        OnOffProperty('iov'),
         Property('lro'),
         Property('ring-group'),
         Property('mac-address'),
@@ -73,6 +76,7 @@ class AnetResource(Resource):
 
 
 class DeviceResource(Resource):
+    __slots__ = ()
     TYPE = 'device'
     PROPERTIES = [
         IntegerProperty('id'),
@@ -90,6 +94,7 @@ class DeviceResource(Resource):
 
 
 class CappedMemoryResource(Resource):
+    __slots__ = ()
     TYPE = 'capped-memory'
     PROPERTIES = [
         ByteProperty('physical'),
@@ -102,6 +107,7 @@ class CappedMemoryResource(Resource):
 
 
 class NcpusProperty(Property):
+    __slots__ = ()
     def decode(self, value):
         try:
             return int(value)
@@ -110,6 +116,7 @@ class NcpusProperty(Property):
 
 
 class VirtualCpuResource(Resource):
+    __slots__ = ()
     TYPE = 'virtual-cpu'
     PROPERTIES = [
         NcpusProperty('ncpus')
@@ -121,6 +128,7 @@ class VirtualCpuResource(Resource):
 
 
 class CappedCpuResource(Resource):
+    __slots__ = ()
     TYPE = 'capped-cpu'
     PROPERTIES = [
         NcpusProperty('ncpus')
@@ -132,6 +140,7 @@ class CappedCpuResource(Resource):
 
 
 class DedicatedCpuResource(Resource):
+    __slots__ = ()
     TYPE = 'dedicated-cpu'
     PROPERTIES = [
         NcpusProperty('ncpus')
@@ -144,6 +153,7 @@ class DedicatedCpuResource(Resource):
 
 
 class SuspendResource(Resource):
+    __slots__ = ()
     TYPE = 'suspend'
     PROPERTIES = [
         PathProperty('path')
@@ -155,6 +165,7 @@ class SuspendResource(Resource):
 
 
 class KeysourceResource(Resource):
+    __slots__ = ()
     TYPE = 'keysource'
     PROPERTIES = [
         Property('raw')
@@ -165,7 +176,85 @@ class KeysourceResource(Resource):
         super().__init__(KeysourceResource.TYPE, *args, **kwargs)
 
 
+class FsResource(Resource):
+    __slots__ = ()
+    TYPE = 'fs'
+    PROPERTIES = [
+        IntegerProperty('tmp-id'),
+        PathProperty('dir'),
+        Property('special'),
+        Property('raw'),
+        Property('type'),
+        ArrayProperty('options')
+    ]
+    RESOURCE_TYPES = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(FsResource.TYPE, *args, **kwargs)
+
+
+class DatasetResource(Resource):
+    __slots__ = ()
+    TYPE = 'dataset'
+    PROPERTIES = [
+        IntegerProperty('tmp-id'),
+        Property('name'),
+        Property('alias')
+    ]
+    RESOURCE_TYPES = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(DatasetResource.TYPE, *args, **kwargs)
+
+
+class NetResource(Resource):
+    __slots__ = ()
+    TYPE = 'net'
+    PROPERTIES = [
+        IntegerProperty('tmp-id'),
+        Property('address'),
+        Property('allowed-address'),
+        BooleanProperty('configure-allowed-address'),
+        Property('physical'),
+        Property('defrouter')
+    ]
+    RESOURCE_TYPES = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(NetResource.TYPE, *args, **kwargs)
+
+
+class RctlResource(Resource):
+    __slots__ = ()
+    TYPE = 'rctl'
+    PROPERTIES = [
+        IntegerProperty('tmp-id'),
+        Property('name'),
+        ArrayProperty('value')
+    ]
+    RESOURCE_TYPES = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(RctlResource.TYPE, *args, **kwargs)
+
+
+class AttrResource(Resource):
+    __slots__ = ()
+    TYPE = 'attr'
+    PROPERTIES = [
+        IntegerProperty('tmp-id'),
+        Property('name'),
+        Property('type'),
+        Property('value')
+    ]
+    RESOURCE_TYPES = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(AttrResource.TYPE, *args, **kwargs)
+
+
 class GlobalResource(Resource):
+    __slots__ = ()
     TYPE = 'global'
     PROPERTIES = [
         Property('zonename'),
@@ -193,13 +282,17 @@ class GlobalResource(Resource):
         CappedCpuResource(),
         DedicatedCpuResource(),
         SuspendResource(),
-        KeysourceResource()
+        KeysourceResource(),
+        FsResource(),
+        DatasetResource(),
+        NetResource(),
+        RctlResource(),
+        AttrResource()
     ]
 
     def __new__(cls, type=None, filter=None):
         if type is not None:
-            concrete_class = ZoneResourceFactory.get_type(type)
-            return concrete_class()
+            return Resource.get_class(type)()
         return super(GlobalResource, cls).__new__(cls)
 
     def __init__(self, *args, **kwargs):
@@ -209,19 +302,14 @@ class GlobalResource(Resource):
 class ZoneResourceFactory:
     @staticmethod
     def get_type(resource_type):
-        resources = [GlobalResource, AnetResource, DeviceResource, VlanResource, MacResource,
-                     CappedMemoryResource, VirtualCpuResource, CappedCpuResource, DedicatedCpuResource, SuspendResource, KeysourceResource]
-        for resource in resources:
-            if resource.TYPE == resource_type:
-                return resource
-        raise RADException('No such a resource with type %s' % resource_type)
+        # the resource classes register their TYPE when they are defined
+        return Resource.get_class(resource_type)
 
     @staticmethod
     def from_json(json):
         resource_type = json.get('type')
         if resource_type is None:
             raise RADException('Argument does not have a type %s' % json)
-        type = ZoneResourceFactory.get_type(resource_type)
-        resource = type()
+        resource = Resource.get_class(resource_type)()
         resource.load(json)
         return resource
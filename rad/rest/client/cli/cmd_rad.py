@@ -14,15 +14,10 @@
 
 
 import argparse
+import importlib
 import logging
 
 from rad.rest.client import __version__, RADException
-from rad.rest.client.cli.cmd_rad_login import CmdLogin
-from rad.rest.client.cli.zone import CmdZone
-from rad.rest.client.cli.zone_manager import CmdZoneManager
-from rad.rest.client.cli.zpool import CmdZpool
-from rad.rest.client.cli.zfs import CmdZfs
-from rad.rest.client.cli.kstat import CmdKstat
 
 LOG = logging.getLogger(__name__)
 
@@ -41,15 +36,139 @@ def set_log_level(log_level):
         logging.basicConfig(level=levels[log_level])
 
 
+def cache_ttl(value):
+    collection, _, seconds = value.rpartition('=')
+    try:
+        seconds = float(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid cache ttl %s' % value)
+    return collection or None, seconds
+
+
+def positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid int value %s' % value)
+    if number < 1:
+        raise argparse.ArgumentTypeError('%s is not a positive number' % value)
+    return number
+
+
 class CustomFormatter(argparse.ArgumentDefaultsHelpFormatter,
                       argparse.RawDescriptionHelpFormatter):
     pass
 
 
+class LazyCommand:
+    # Registry entry for a command, its module (and through it requests,
+    # yaml and the API modules) is only imported when the command is run
+    def __init__(self, name, aliases, module, class_name, help):
+        self.name = name
+        self.aliases = aliases
+        self.module = module
+        self.class_name = class_name
+        self.help = help
+
+    def load(self):
+        return getattr(importlib.import_module(self.module), self.class_name)
+
+    def init_placeholder(self, subparsers):
+        subparsers.add_parser(self.name,
+                              aliases=self.aliases,
+                              add_help=False,
+                              help=self.help)
+
+
 class CmdRAD:
-    commands = [CmdLogin, CmdZone, CmdZoneManager, CmdZfs, CmdZpool, CmdKstat]
+    commands = [
+        LazyCommand('login', [], 'rad.rest.client.cli.cmd_rad_login', 'CmdLogin',
+                    'Login to RAD REST server'),
+        LazyCommand('agent', [], 'rad.rest.client.cli.cmd_rad_agent', 'CmdAgent',
+                    'Run a connection agent'),
+        LazyCommand('zone', [], 'rad.rest.client.cli.zone', 'CmdZone',
+                    'Manage zones'),
+        LazyCommand('zone-manager', [], 'rad.rest.client.cli.zone_manager', 'CmdZoneManager',
+                    'Configure zones'),
+        LazyCommand('zfs', [], 'rad.rest.client.cli.zfs', 'CmdZfs',
+                    'Manage ZFS datasets'),
+        LazyCommand('zpool', [], 'rad.rest.client.cli.zpool', 'CmdZpool',
+                    'Manage ZFS pools'),
+        LazyCommand('kstat', [], 'rad.rest.client.cli.kstat', 'CmdKstat',
+                    'Manage kstat statistics')
+    ]
 
     def __init__(self):
+        # First pass with placeholders to find out the command, then parse
+        # again with the parser of that command only
+        options, _ = self.create_parser().parse_known_args()
+        lazy_command = self.get_command(options)
+        command = lazy_command.load()
+        parser = self.create_parser(lazy_command, command)
+        options = parser.parse_args()
+
+        set_log_level(options.log_level)
+
+        from rad.rest.client.cli.fleet import get_hostnames
+        try:
+            options.hostnames = get_hostnames(options)
+        except (OSError, IOError) as e:
+            parser.error(str(e))
+        if len(options.hostnames) == 0 and getattr(command, 'requires_host', True):
+            parser.error('at least one hostname is required (-H or -F)')
+
+        # without --cache-ttl nothing is cached, but mutating methods still
+        # drop the listings cached by other commands
+        from rad.rest.client.api.response_cache import ResponseCache, RESPONSE_CACHE_DIRECTORY
+        ttls = dict(options.cache_ttl or [])
+        default_ttl = ttls.pop(None, 0)
+        options.response_cache = ResponseCache(
+            ttls, default_ttl, options.cache_dir or RESPONSE_CACHE_DIRECTORY)
+
+        options.agent_client = None
+        if options.agent:
+            from rad.rest.client.api.agent import AgentClient
+            agent_client = AgentClient()
+            if agent_client.available():
+                options.agent_client = agent_client
+            else:
+                LOG.warning('RAD agent is not running, connecting directly')
+
+        options.tracer = None
+        if options.trace or options.metrics_out is not None:
+            from rad.rest.client.util.tracing import Tracer
+            name = options.command
+            if getattr(options, 'subcommand', None) is not None:
+                name += ' ' + options.subcommand
+            options.tracer = Tracer(name)
+
+        if options.debug:
+            import debugpy
+            debugpy.listen(('0.0.0.0', 5678))
+            LOG.info("Waiting for IDE to attach...")
+            debugpy.wait_for_client()
+
+        try:
+            command(options)
+        except RADException as e:
+            LOG.error(e.message)
+            print(e.message)
+            exit(-1)
+        finally:
+            self.report(options)
+
+    def report(self, options):
+        if options.tracer is None:
+            return
+        if options.trace:
+            options.tracer.print_summary()
+        if options.metrics_out is not None:
+            try:
+                options.tracer.write(options.metrics_out, options.metrics_format)
+            except (OSError, IOError) as e:
+                LOG.error('Could not write metrics to %s: %s' % (options.metrics_out, str(e)))
+
+    def create_parser(self, selected=None, command=None):
         parser = argparse.ArgumentParser(
             formatter_class=CustomFormatter,
             description='A Solaris RAD Client')
@@ -79,37 +198,65 @@ class CmdRAD:
                             default='https',
                             help='Protocol for RAD REST server')
         parser.add_argument('-H', '--hostname',
-                            required=True,
-                            help='Hostname or ip address for RAD REST server')
+                            action='append',
+                            help='Hostname or ip address for RAD REST server, '
+                            'can be repeated, comma separated or a glob matching cached sessions')
+        parser.add_argument('-F', '--hosts-file',
+                            help='File with one RAD REST server hostname per line')
+        parser.add_argument('--parallel',
+                            type=positive_int,
+                            default=16,
+                            help='Maximum number of hosts to run the command on concurrently')
+        parser.add_argument('--host-timeout',
+                            type=float,
+                            help='Timeout in seconds for the command on each host, and for each of its '
+                            'requests (default: 10s to connect, 60s between reads)')
+        parser.add_argument('--retries',
+                            type=int,
+                            default=2,
+                            help='Times to retry read-only requests failing with connection errors or 502-504')
+        parser.add_argument('--retry-backoff',
+                            type=float,
+                            default=0.2,
+                            help='Base delay in seconds of the jittered exponential backoff between retries')
         parser.add_argument('-P', '--port',
                             type=int,
                             default=6788,
                             help='Port for RAD REST server')
+        parser.add_argument('--cache-ttl',
+                            type=cache_ttl,
+                            action='append',
+                            metavar='[COLLECTION=]SECONDS',
+                            help='Cache the listings of the collection (or of all of them) for SECONDS, can be repeated')
+        parser.add_argument('--cache-dir',
+                            help='Directory for the cached listings (default: ~/.cache/rad/responses)')
+        parser.add_argument('-A', '--agent',
+                            action='store_true',
+                            help='Send the requests through the RAD agent (see the agent command)')
+        parser.add_argument('--trace',
+                            action='store_true',
+                            help='Print a summary of the RAD requests to stderr')
+        parser.add_argument('--metrics-out',
+                            metavar='FILE',
+                            help='Write the request metrics to FILE ("-" for stdout)')
+        parser.add_argument('--metrics-format',
+                            choices=['json', 'prometheus'],
+                            default='json',
+                            help='Format of the request metrics')
 
         subparsers = parser.add_subparsers(
             dest='command',
             metavar='COMMAND',
             required=True)
 
-        for command in CmdRAD.commands:
-            command.init_parser(subparsers)
-
-        options = parser.parse_args()
-
-        set_log_level(options.log_level)
+        for lazy_command in CmdRAD.commands:
+            if lazy_command is selected:
+                command.init_parser(subparsers)
+            else:
+                lazy_command.init_placeholder(subparsers)
+        return parser
 
-        if options.debug:
-            import debugpy
-            debugpy.listen(('0.0.0.0', 5678))
-            LOG.info("Waiting for IDE to attach...")
-            debugpy.wait_for_client()
-
-        try:
-            for command in self.commands:
-                if options.command == command.name or options.command in command.aliases:
-                    command(options)
-                    break
-        except RADException as e:
-            LOG.error(e.message)
-            print(e.message)
-            exit(-1)
+    def get_command(self, options):
+        for command in self.commands:
+            if options.command == command.name or options.command in command.aliases:
+                return command
@@ -0,0 +1,53 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import argparse
+import logging
+from rad.rest.client.api.agent import AgentServer
+
+LOG = logging.getLogger(__name__)
+
+
+class CmdAgent:
+    name = 'agent'
+    aliases = []
+    requires_host = False
+
+    @staticmethod
+    def init_parser(subparsers):
+        parent_parser = argparse.ArgumentParser(add_help=False)
+        parser = subparsers.add_parser(CmdAgent.name,
+                                       aliases=CmdAgent.aliases,
+                                       parents=[parent_parser],
+                                       formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                                       description='Run an agent that keeps sessions and connections to RAD REST servers open, '
+                                       'commands run with --agent forward their requests through it',
+                                       help='Run a connection agent')
+        parser.add_argument('-s', '--socket',
+                            help='Path of the agent unix socket (default: $RAD_AGENT_SOCKET or ~/.cache/rad/agent.sock)')
+        parser.add_argument('-p', '--pool-size',
+                            type=int,
+                            default=10,
+                            help='Number of connections to keep open per host')
+
+    def __init__(self, options):
+        server = AgentServer(options.socket, options.pool_size)
+        LOG.info('RAD agent listening on %s' % server.path)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
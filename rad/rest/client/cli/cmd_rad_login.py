@@ -16,7 +16,9 @@
 import argparse
 import getpass
 import logging
-from rad.rest.client.api.authentication_1 import Session
+import sys
+from rad.rest.client.cli.fleet import run_on_hosts
+from rad.rest.client.util import report_failures
 
 LOG = logging.getLogger(__name__)
 
@@ -66,6 +68,9 @@ class CmdLogin:
                 verify = True
             else:
                 verify = False
-        with Session(protocol=options.protocol, hostname=options.hostname, port=options.port) as session:
+        def login(session):
             session.login(options.username, str(options.password),
                           ssl_cert_verify=verify, ssl_cert_path=options.ssl_cert_path)
+        failures = report_failures(run_on_hosts(options, login), lambda hostname: hostname)
+        if failures > 0:
+            sys.exit(1)
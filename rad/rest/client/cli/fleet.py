@@ -0,0 +1,157 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import fnmatch
+import logging
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from rad.rest.client import RADError
+from rad.rest.client.api.authentication_1 import Session
+from rad.rest.client.util.parallel import error_message
+
+LOG = logging.getLogger(__name__)
+
+
+def get_hostnames(options):
+    patterns = []
+    for value in options.hostname or []:
+        patterns.extend(name.strip() for name in value.split(','))
+    if options.hosts_file is not None:
+        with open(options.hosts_file, 'r') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    patterns.append(line)
+
+    hostnames = []
+    for pattern in patterns:
+        if pattern == '':
+            continue
+        if any(char in pattern for char in '*?['):
+            cached = Session.cached_hostnames(options.protocol, options.port)
+            matches = fnmatch.filter(cached, pattern)
+            if len(matches) == 0:
+                LOG.warning('No cached session matches %s' % pattern)
+        else:
+            matches = [pattern]
+        for hostname in matches:
+            if hostname not in hostnames:
+                hostnames.append(hostname)
+    return hostnames
+
+
+def is_fleet(options):
+    return len(options.hostnames) > 1
+
+
+def open_session(options, hostname):
+    session = Session(protocol=options.protocol,
+                      hostname=hostname, port=options.port)
+    # the threads of timed out hosts are left behind, their requests stop
+    # at the deadline so that they do not keep the command running
+    if options.host_timeout is not None:
+        session.timeout = options.host_timeout
+        session.deadline = time.monotonic() + options.host_timeout
+    session.agent = options.agent_client
+    session.cache = options.response_cache
+    session.tracer = options.tracer
+    session.retries = options.retries
+    session.backoff = options.retry_backoff
+    username = os.environ.get('RAD_USERNAME')
+    password = os.environ.get('RAD_PASSWORD')
+    if username is not None and password is not None:
+        session.credentials = (username, password)
+    return session
+
+
+def run_on_host(options, hostname, function):
+    with open_session(options, hostname) as session:
+        return function(session)
+
+
+def run_on_hosts(options, function):
+    # Returns (hostname, result, error) for every host in the order they
+    # were given. With a single host errors are raised as usual.
+    if not is_fleet(options):
+        hostname = options.hostnames[0]
+        return [(hostname, run_on_host(options, hostname, function), None)]
+
+    executor = ThreadPoolExecutor(max_workers=options.parallel)
+    started = {}
+
+    def job(hostname):
+        started[hostname] = time.monotonic()
+        return run_on_host(options, hostname, function)
+
+    futures = OrderedDict((hostname, executor.submit(job, hostname))
+                          for hostname in options.hostnames)
+    timed_out = set()
+    pending = set(futures.values())
+    while pending:
+        done, pending = wait(pending, timeout=0.1,
+                             return_when=FIRST_COMPLETED)
+        if options.host_timeout is None:
+            continue
+        now = time.monotonic()
+        for hostname, future in futures.items():
+            start = started.get(hostname)
+            if future in pending and start is not None and \
+                    now - start > options.host_timeout:
+                timed_out.add(hostname)
+                pending.discard(future)
+    executor.shutdown(wait=False)
+
+    results = []
+    for hostname, future in futures.items():
+        if hostname in timed_out:
+            error = RADError('Timed out after %ss' % options.host_timeout)
+            results.append((hostname, None, error))
+            continue
+        try:
+            results.append((hostname, future.result(), None))
+        except Exception as e:
+            LOG.debug('Command failed on %s' % hostname, exc_info=True)
+            results.append((hostname, None, e))
+    return results
+
+
+def collect(results):
+    # Flattens the per host result lists into (hostname, item) pairs,
+    # reporting failed hosts on stderr
+    items = []
+    for hostname, result, error in results:
+        if error is not None:
+            print('%s: %s' % (hostname, error_message(error)), file=sys.stderr)
+            continue
+        items.extend((hostname, item) for item in result)
+    return items
+
+
+def exit_on_failures(results):
+    # after showing what the other hosts returned, a command that failed on
+    # some host of a fleet exits with an error
+    if any(error is not None for hostname, result, error in results):
+        sys.exit(1)
+
+
+def with_host(options, hostname, row):
+    if not is_fleet(options):
+        return row
+    new_row = {'host': hostname}
+    new_row.update(row)
+    return new_row
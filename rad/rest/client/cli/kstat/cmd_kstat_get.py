@@ -15,11 +15,10 @@
 
 import argparse
 import logging
-import json
 from typing import OrderedDict
-import yaml
 
-from rad.rest.client.api.authentication_1 import Session
+from rad.rest.client.util import codec
+from rad.rest.client.cli.fleet import collect, exit_on_failures, is_fleet, run_on_hosts, with_host
 from rad.rest.client.api.kstat_2 import Kstat
 
 LOG = logging.getLogger(__name__)
@@ -48,19 +47,30 @@ class CmdKstatGet:
                             help='Kstat URI to retrieve information, ie: kstat:/system/cpu/0/sys')
 
     def __init__(self, options):
-        with Session(protocol=options.protocol, hostname=options.hostname, port=options.port) as session:
+        def get_resource(session):
             kstat_obj = session.get_object(Kstat(), {'uri': options.uri})
             map = kstat_obj.getMap()
 
             items = [(key, nv.integer or nv.string or nv.integers or nv.strings or nv.kstat or 0) for key, nv in map.items()]            
-            resource = OrderedDict(x for x in sorted(items))
+            return [OrderedDict(x for x in sorted(items))]
 
-            if options.json:
-                print(json.dumps(resource, indent=4))
-            elif options.yaml:
-                print(yaml.dump(resource))
-            else:
-                self.print(options.uri, resource)
+        results = run_on_hosts(options, get_resource)
+        resources = collect(results)
+
+        if options.json:
+            output = [with_host(options, hostname, resource) for hostname, resource in resources]
+            print(codec.dumps_pretty(output if is_fleet(options) else output[0]))
+        elif options.yaml:
+            import yaml
+            output = [with_host(options, hostname, dict(resource)) for hostname, resource in resources]
+            print(yaml.dump(output if is_fleet(options) else output[0]))
+        else:
+            for hostname, resource in resources:
+                uri = options.uri
+                if is_fleet(options):
+                    uri = '%s:%s' % (hostname, uri)
+                self.print(uri, resource)
+        exit_on_failures(results)
 
     def print(self, uri, resource):
         for key, value in resource.items():
@@ -15,9 +15,10 @@
 
 import argparse
 import logging
+import sys
 from rad.rest.client.exceptions import RADError
-from rad.rest.client.util.print import print_table
-from rad.rest.client.api.authentication_1 import Session
+from rad.rest.client.util import print_table, report_failures
+from rad.rest.client.cli.fleet import run_on_hosts
 from rad.rest.client.api.zfsmgr_1 import ZfsDataset
 
 
@@ -40,5 +41,8 @@ class CmdZfsGetFilesystems:
                             help='Name of the pool')
 
     def __init__(self, options):
-        with Session(protocol=options.protocol, hostname=options.hostname, port=options.port) as session:
+        def get_filesystems(session):
             raise RADError('NYI')
+        failures = report_failures(run_on_hosts(options, get_filesystems), lambda hostname: hostname)
+        if failures > 0:
+            sys.exit(1)
@@ -16,12 +16,13 @@ import argparse
 
 from rad.rest.client.cli.zone.cmd_zone_list import CmdZoneList
 from rad.rest.client.cli.zone.cmd_zone_get_properties import CmdZoneGetProperties
+from rad.rest.client.cli.zone.cmd_zone_watch import CmdZoneWatch
 
 
 class CmdZone:
     name = 'zone'
     aliases = []
-    commands = [CmdZoneList, CmdZoneGetProperties]
+    commands = [CmdZoneList, CmdZoneGetProperties, CmdZoneWatch]
 
     @staticmethod
     def init_parser(subparsers):
@@ -14,15 +14,65 @@
 
 
 import argparse
-import json
+import fnmatch
 import logging
-import yaml
 
-from rad.rest.client.api.authentication_1 import Session
+from rad.rest.client import NotFoundError, ObjectError, RADException
+from rad.rest.client.util import codec, parallel_map, print_table, report_failures
+from rad.rest.client.cli.cmd_rad import positive_int
+from rad.rest.client.cli.fleet import collect, exit_on_failures, is_fleet, run_on_hosts, with_host
+from rad.rest.client.api.resource import Resource
 from rad.rest.client.api.zonemgr_1 import Zone
+from rad.rest.client.api.zonemgr_1.zone_resources import (
+    CappedCpuResource, CappedMemoryResource, DedicatedCpuResource, GlobalResource,
+    KeysourceResource, SuspendResource, VirtualCpuResource)
 
 LOG = logging.getLogger(__name__)
 
+# a zone has at most one resource of these types, the values of the others
+# (anet, fs, rctl...) would be mixed up in a single column
+SINGLE_TYPES = (GlobalResource.TYPE, CappedMemoryResource.TYPE, VirtualCpuResource.TYPE,
+                CappedCpuResource.TYPE, DedicatedCpuResource.TYPE, SuspendResource.TYPE,
+                KeysourceResource.TYPE)
+
+
+def property_paths(value):
+    # 'type.property,...' -> [(type, property)], a property without type is
+    # one of the global resource
+    paths = []
+    for path in value.split(','):
+        path = path.strip()
+        if path == '':
+            continue
+        type, _, name = path.rpartition('.')
+        type = type or GlobalResource.TYPE
+        if type not in Resource.REGISTRY:
+            raise argparse.ArgumentTypeError('unknown resource type %s' % type)
+        if type not in SINGLE_TYPES:
+            raise argparse.ArgumentTypeError('%s resources can have several instances, get '
+                                             'them without -p' % type)
+        if name not in Resource.get_class(type).PROPERTY_INDEX:
+            raise argparse.ArgumentTypeError('unknown property %s of %s resources' % (name, type))
+        paths.append((type, name))
+    return paths
+
+
+def missing_resource(error):
+    # the zone has no resource of that type, its properties are left empty
+    return isinstance(error, ObjectError) and error.code == 'RESOURCE_NOT_FOUND'
+
+
+def matching_zones(session, names, patterns):
+    # The zones matching the patterns and not named, in the listing order
+    if len(patterns) == 0:
+        return []
+    zones = [zone for zone in session.list_objects(Zone())
+             if zone.name not in names and
+             any(fnmatch.fnmatchcase(zone.name, pattern) for pattern in patterns)]
+    if len(zones) == 0:
+        LOG.error('%s: No zone matches %s' % (session.hostname, ' '.join(patterns)))
+    return zones
+
 
 class CmdZoneGetProperties:
     name = 'get-properties'
@@ -43,29 +93,144 @@ class CmdZoneGetProperties:
         group.add_argument('-j', '--json',
                            action='store_true',
                            help='Show output in json format')
+        parser.add_argument('-J', '--jobs',
+                            type=positive_int,
+                            default=8,
+                            help='Number of zones to get concurrently')
+        parser.add_argument('-p', '--properties',
+                            type=property_paths,
+                            action='append',
+                            metavar='TYPE.PROPERTY[,TYPE.PROPERTY...]',
+                            help='Get only these properties, with one request per resource type and zone. '
+                            'Properties without type are of the global resource')
         parser.add_argument('zonename',
-                            help='Name of the zone')
+                            nargs='+',
+                            help='Name of the zones, or glob patterns matched against all of them')
 
     def __init__(self, options):
-        with Session(protocol=options.protocol, hostname=options.hostname, port=options.port) as session:
-            zone_instances = session.list_objects(Zone())
-
-            # get zone
-            zones = [
-                zone for zone in zone_instances if zone.name in options.zonename]
-            if len(zones) != 1:
-                LOG.error('No such a zone named %s' % options.zonename)
-                return
-            zone = zones[0]
-            properties = zone.get_properties()
+        names = []
+        patterns = []
+        for name in options.zonename:
+            if any(char in name for char in '*?['):
+                patterns.append(name)
+            elif name not in names:
+                names.append(name)
 
-            if options.json:
+        if options.properties is not None:
+            paths = [path for paths in options.properties for path in paths]
+            self.get_values(options, names, patterns, list(dict.fromkeys(paths)))
+            return
 
-                print(json.dumps(properties.to_json(), indent=4))
-            elif options.yaml:
-                print(yaml.dump(properties.to_json()))
-            else:
+        def zone_properties(session, zone):
+            # zone is a name or a listed zone
+            if isinstance(zone, str):
+                try:
+                    zone = session.get_object(Zone(), {'name': zone})
+                except NotFoundError:
+                    raise RADException('No such a zone')
+            return zone.get_properties()
+
+        def zone_name(zone):
+            return zone if isinstance(zone, str) else zone.name
+
+        def get_properties(session):
+            # zones are got by name, only patterns need the whole listing
+            zones = matching_zones(session, names, patterns)
+            session.resize_pool(options.jobs + 1)
+            results = parallel_map(lambda zone: zone_properties(session, zone),
+                                   names + zones, options.jobs)
+            report_failures(results, lambda zone: '%s: Could not get properties of zone %s' %
+                            (session.hostname, zone_name(zone)))
+            return [properties for zone, properties, error in results
+                    if error is None]
+
+        results = run_on_hosts(options, get_properties)
+        resources = collect(results)
+        # a single zone is shown as before, several ones as a list
+        single = not is_fleet(options) and len(names) == 1 and len(patterns) == 0
+
+        if options.json:
+            output = [with_host(options, hostname, properties.to_json())
+                      for hostname, properties in resources]
+            if single:
+                output = output[0] if output else None
+            if output is not None:
+                print(codec.dumps_pretty(output))
+        elif options.yaml:
+            import yaml
+            output = [with_host(options, hostname, properties.to_json())
+                      for hostname, properties in resources]
+            if single:
+                output = output[0] if output else None
+            if output is not None:
+                print(yaml.dump(output))
+        else:
+            for hostname, properties in resources:
+                if is_fleet(options):
+                    print('host: %s' % hostname)
+                if not single:
+                    print('zonename: %s' % properties.get('zonename'))
                 self.print(properties)
+        exit_on_failures(results)
+
+    def get_values(self, options, names, patterns, paths):
+        # property names of each resource type, a request gets all of them
+        types = {}
+        for type, name in paths:
+            types.setdefault(type, []).append(name)
+
+        def host_values(session):
+            # named zones are addressed by their href, without getting them
+            zones = []
+            for name in names:
+                zone = Zone(_conn=session)
+                zone.rad_instance_id = name
+                zones.append((name, zone))
+            zones += [(zone.name, zone) for zone in matching_zones(session, names, patterns)]
+
+            requests = [(name, zone, type, property_names) for name, zone in zones
+                        for type, property_names in types.items()]
+            session.resize_pool(options.jobs + 1)
+            results = parallel_map(lambda request: request[1].getResourceProperties(
+                Resource.get_class(request[2])(), request[3]), requests, options.jobs)
+            report_failures([result for result in results if not missing_resource(result[2])],
+                            lambda request: '%s: Could not get %s properties of zone %s' %
+                            (session.hostname, request[2], request[0]))
+
+            values = {}
+            for (name, zone, type, property_names), properties, error in results:
+                if missing_resource(error):
+                    properties = []
+                elif error is not None:
+                    continue
+                row = values.setdefault(name, {'zonename': name})
+                for property in properties:
+                    row['%s.%s' % (type, property.name)] = property
+            return list(values.values())
+
+        results = run_on_hosts(options, host_values)
+        rows = collect(results)
+        columns = ['%s.%s' % path for path in paths]
+
+        if options.json or options.yaml:
+            output = [with_host(options, hostname, dict(
+                [('zonename', row['zonename'])] +
+                [(column, row[column].json_value()) for column in columns if column in row]))
+                for hostname, row in rows]
+            if options.json:
+                print(codec.dumps_pretty(output))
+            else:
+                import yaml
+                print(yaml.dump(output, sort_keys=False))
+        else:
+            table = []
+            for hostname, row in rows:
+                table_row = {'zonename': row['zonename']}
+                for column in columns:
+                    table_row[column] = row.get(column, '-')
+                table.append(with_host(options, hostname, table_row))
+            print_table(table)
+        exit_on_failures(results)
 
     def print(self, global_resource):
         for property in global_resource.properties:
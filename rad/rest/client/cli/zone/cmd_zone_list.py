@@ -15,8 +15,9 @@
 
 import argparse
 import logging
-from rad.rest.client.util import print_table, order_dict_with_keys
-from rad.rest.client.api.authentication_1 import Session
+from rad.rest.client.util import print_table, ResultSet
+from rad.rest.client.cli.cmd_rad import positive_int
+from rad.rest.client.cli.fleet import collect, exit_on_failures, is_fleet, run_on_hosts
 from rad.rest.client.api.zonemgr_1 import Zone
 
 LOG = logging.getLogger(__name__)
@@ -41,26 +42,42 @@ class CmdZoneList:
                             default=['id', 'name', 'brand', 'state'],
                             help='Specify wich columns to show in the table')
         parser.add_argument('-s', '--sort-by',
-                            choices=['id', 'name', 'brand',
+                            action='append',
+                            choices=['host', 'id', 'name', 'brand',
                                      'state', 'auxstate', 'uuid'],
-                            help='Specify the sort order in the table')
+                            help='Specify the sort order in the table, repeat it to sort by more columns')
+        parser.add_argument('-r', '--reverse',
+                            action='store_true',
+                            help='Sort in descending order')
+        parser.add_argument('--top',
+                            type=positive_int,
+                            help='Show only the first rows of the sort order')
         parser.add_argument('zonename',
                             nargs='*',
                             help='Name of the zones or all if none')
 
     def __init__(self, options):
-        with Session(protocol=options.protocol, hostname=options.hostname, port=options.port) as session:
-            zone_instances = session.list_objects(Zone())
+        def get_zones(session):
+            return [zone.json for zone in session.list_objects(Zone())]
+
+        results = run_on_hosts(options, get_zones)
+        zones = [dict(zone, host=hostname) for hostname, zone in collect(results)]
+        result_set = ResultSet.from_dicts(zones, ['host', 'id', 'name', 'brand',
+                                                  'state', 'auxstate', 'uuid'],
+                                          numeric=['id'])
 
-            # get dictionaries
-            zones = [
-                zone.json for zone in zone_instances if len(options.zonename)== 0 or zone.name in options.zonename]
+        if len(options.zonename) > 0:
+            result_set = result_set.where('name', lambda name: name in options.zonename)
 
-            # sort by key
-            if options.sort_by is not None:
-                zones = sorted(zones, key=lambda i: i[options.sort_by])
+        # sort by key
+        if options.sort_by is not None:
+            result_set = result_set.sort(options.sort_by, options.reverse, options.top)
+        elif options.top is not None:
+            result_set = result_set.take(range(min(options.top, len(result_set))))
 
-            # filter columns
-            zones = [order_dict_with_keys(zone, options.columns)
-                     for zone in zones]
-            print_table(zones)
+        # filter columns
+        columns = options.columns
+        if is_fleet(options):
+            columns = ['host'] + columns
+        print_table(result_set.select(columns))
+        exit_on_failures(results)
@@ -0,0 +1,203 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import fnmatch
+import logging
+import sys
+import threading
+import time
+
+from rad.rest.client.util import codec
+from rad.rest.client.util.parallel import error_message
+from rad.rest.client.cli.fleet import exit_on_failures, run_on_hosts
+from rad.rest.client.api.zonemgr_1 import Zone, ZoneManager
+
+LOG = logging.getLogger(__name__)
+
+# Event of the zone manager sent when a zone changes state
+STATE_CHANGE_EVENT = 'stateChange'
+
+
+def snapshot(session, patterns):
+    # zone name -> (state, auxstate)
+    zones = {}
+    for zone in session.iter_objects(Zone()):
+        if len(patterns) == 0 or any(fnmatch.fnmatchcase(zone.name, pattern)
+                                     for pattern in patterns):
+            zones[zone.name] = (zone.state, zone.auxstate)
+    return zones
+
+
+def changes(previous, current):
+    # (event, zone, previous (state, auxstate), current (state, auxstate))
+    # for every zone that appeared, changed or disappeared
+    events = []
+    for name, value in current.items():
+        old_value = previous.get(name)
+        if old_value is None:
+            events.append(('added', name, None, value))
+        elif old_value != value:
+            events.append(('changed', name, old_value, value))
+    for name, old_value in previous.items():
+        if name not in current:
+            events.append(('removed', name, old_value, None))
+    return events
+
+
+def state_json(value):
+    if value is None:
+        return None
+    return {'state': value[0], 'auxstate': value[1]}
+
+
+class EventWakeup(object):
+    # Wakes the watcher when the zone manager sends a state change event.
+    # Servers without event subscriptions answer with an error and the
+    # watcher keeps polling
+    def __init__(self, session, wake, stop):
+        self.session = session
+        self.wake = wake
+        self.stop = stop
+        self.available = False
+        self.thread = None
+
+    def start(self):
+        try:
+            zone_manager = self.session.get_object(ZoneManager())
+            response = zone_manager.request(
+                'GET', '/_rad_event/%s' % STATE_CHANGE_EVENT, stream=True, timeout=None)
+        except Exception as e:
+            LOG.debug('Could not subscribe to zone events: %s' % error_message(e))
+            return False
+        if response.status_code != 200:
+            LOG.debug('Zone events are not available (%d), polling' % response.status_code)
+            return False
+        self.available = True
+        self.thread = threading.Thread(target=self.run, args=(response,), daemon=True)
+        self.thread.start()
+        return True
+
+    def run(self, response):
+        try:
+            for event in response.items():
+                if self.stop.is_set():
+                    break
+                LOG.debug('Zone event %s' % str(event))
+                self.wake.set()
+        except Exception as e:
+            LOG.debug('Zone events stopped: %s' % error_message(e))
+        self.available = False
+        self.wake.set()
+
+
+class CmdZoneWatch:
+    name = 'watch'
+    aliases = []
+
+    @staticmethod
+    def init_parser(subparsers, parent_parser):
+        parser = subparsers.add_parser(CmdZoneWatch.name,
+                                       aliases=CmdZoneWatch.aliases,
+                                       parents=[parent_parser],
+                                       formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                                       description='Print a json line for every zone that changes '
+                                       'state or auxstate, appears or disappears',
+                                       help='Watch the state of the zones')
+        parser.add_argument('-i', '--interval',
+                            type=float,
+                            default=2.0,
+                            help='Seconds between polls after a change, they get longer while '
+                            'nothing changes')
+        parser.add_argument('-m', '--max-interval',
+                            type=float,
+                            default=30.0,
+                            help='Maximum seconds between polls')
+        parser.add_argument('-c', '--count',
+                            type=int,
+                            help='Stop after this number of polls')
+        parser.add_argument('--initial',
+                            action='store_true',
+                            help='Print the zones found by the first poll as added')
+        parser.add_argument('--no-events',
+                            action='store_true',
+                            help='Do not subscribe to zone events, only poll')
+        parser.add_argument('zonename',
+                            nargs='*',
+                            help='Name or glob pattern of the zones to watch, all if none')
+
+    def __init__(self, options):
+        stop = threading.Event()
+        output_lock = threading.Lock()
+
+        def emit(hostname, event, name, previous, current):
+            line = codec.dumps({
+                'time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'host': hostname,
+                'zone': name,
+                'event': event,
+                'previous': state_json(previous),
+                'current': state_json(current)
+            }).decode('utf-8')
+            with output_lock:
+                print(line, flush=True)
+
+        def watch(session):
+            # the listing must come from the server every time
+            session.cache = None
+            hostname = session.hostname
+            wake = threading.Event()
+            events = EventWakeup(session, wake, stop)
+            if not options.no_events:
+                events.start()
+
+            zones = snapshot(session, options.zonename)
+            if options.initial:
+                for name, value in zones.items():
+                    emit(hostname, 'added', name, None, value)
+            interval = options.interval
+            polls = 0
+            while not stop.is_set() and (options.count is None or polls < options.count):
+                # with events polls only catch what they could miss
+                wake.wait(options.max_interval if events.available else interval)
+                wake.clear()
+                if stop.is_set():
+                    break
+                polls += 1
+                try:
+                    current = snapshot(session, options.zonename)
+                except Exception as e:
+                    print('%s: %s' % (hostname, error_message(e)), file=sys.stderr)
+                    interval = min(interval * 2, options.max_interval)
+                    continue
+                found = changes(zones, current)
+                for event, name, previous, value in found:
+                    emit(hostname, event, name, previous, value)
+                zones = current
+                # poll often while the zones change, less and less when they do not
+                if found:
+                    interval = options.interval
+                else:
+                    interval = min(interval * 1.5, options.max_interval)
+            return []
+
+        try:
+            results = run_on_hosts(options, watch)
+        except KeyboardInterrupt:
+            stop.set()
+            return
+        for hostname, result, error in results:
+            if error is not None:
+                print('%s: %s' % (hostname, error_message(error)), file=sys.stderr)
+        exit_on_failures(results)
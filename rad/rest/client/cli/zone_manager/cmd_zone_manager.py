@@ -17,13 +17,14 @@ import argparse
 from rad.rest.client.cli.zone_manager.cmd_zone_manager_create import CmdZoneManagerCreate
 from rad.rest.client.cli.zone_manager.cmd_zone_manager_import_config import CmdZoneManagerImportConfig
 from rad.rest.client.cli.zone_manager.cmd_zone_manager_delete import CmdZoneManagerDelete
+from rad.rest.client.cli.zone_manager.cmd_zone_manager_apply import CmdZoneManagerApply
 
 
 class CmdZoneManager:
     name = 'zone-manager'
     aliases = []
     commands = [CmdZoneManagerCreate,
-                CmdZoneManagerDelete, CmdZoneManagerImportConfig]
+                CmdZoneManagerDelete, CmdZoneManagerImportConfig, CmdZoneManagerApply]
 
     @staticmethod
     def init_parser(subparsers):
@@ -0,0 +1,208 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+
+from rad.rest.client import RADException
+from rad.rest.client.cli.cmd_rad import positive_int
+from rad.rest.client.cli.fleet import run_on_hosts
+from rad.rest.client.util import parallel_map, report_failures
+from rad.rest.client.api.resilience import RateLimiter
+from rad.rest.client.api.zonemgr_1 import ZoneManager
+
+LOG = logging.getLogger(__name__)
+
+CREATE = 'create'
+IMPORT_CONFIG = 'import-config'
+
+
+def load_manifest(filename):
+    # zones:                       defaults:
+    #   - name: web1                 template: SYSDefault
+    #     template: SYSDefault
+    #     path: /system/zones/web1
+    #     config: |                (or config-file, relative to the manifest)
+    #       set autoboot=true
+    # A zone with a config gets it imported, one with a template or a path or
+    # without config is created first
+    import yaml
+    try:
+        with open(filename, 'r') as f:
+            manifest = yaml.safe_load(f)
+    except (OSError, IOError, yaml.YAMLError) as e:
+        raise RADException('Could not read manifest %s: %s' % (filename, str(e)))
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('zones'), list):
+        raise RADException('Manifest %s has no list of zones' % filename)
+    defaults = manifest.get('defaults') or {}
+    directory = os.path.dirname(filename)
+    entries = []
+    names = set()
+    for zone in manifest['zones']:
+        entry = dict(defaults, **zone) if isinstance(zone, dict) else {}
+        name = entry.get('name')
+        if not name:
+            raise RADException('Manifest %s has a zone without name' % filename)
+        if name in names:
+            raise RADException('Zone %s is twice in manifest %s' % (name, filename))
+        names.add(name)
+        if entry.get('config-file') is not None:
+            try:
+                with open(os.path.join(directory, entry['config-file']), 'r') as f:
+                    entry['config'] = f.read()
+            except (OSError, IOError) as e:
+                raise RADException('Could not read the config of zone %s: %s' % (name, str(e)))
+        entry['steps'] = []
+        if entry.get('template') or entry.get('path') or not entry.get('config'):
+            entry['steps'].append(CREATE)
+        if entry.get('config'):
+            entry['steps'].append(IMPORT_CONFIG)
+        entries.append(entry)
+    return entries
+
+
+def checked_config(entry, steps):
+    # a zone still to be created does not exist, its configuration is checked
+    # as a single one with the create of its template
+    if CREATE not in steps:
+        return entry['config']
+    lines = ['create -t %s' % entry['template'] if entry.get('template') else 'create']
+    if entry.get('path'):
+        lines.append('set zonepath=%s' % entry['path'])
+    return '\n'.join(lines) + '\n' + entry['config']
+
+
+class Progress(object):
+    # Steps done for every host and zone, saved after each one so that an
+    # interrupted apply continues where it stopped
+    def __init__(self, filename):
+        self.filename = filename
+        self.done = {}
+        self._lock = threading.Lock()
+        if filename is not None and os.path.exists(filename):
+            try:
+                with open(filename, 'r') as f:
+                    self.done = json.load(f)
+            except (OSError, IOError, ValueError) as e:
+                raise RADException('Could not read progress file %s: %s' % (filename, str(e)))
+
+    def steps(self, hostname, name):
+        with self._lock:
+            return list(self.done.get(hostname, {}).get(name, []))
+
+    def pending(self, hostname, entry):
+        steps = self.steps(hostname, entry['name'])
+        return [step for step in entry['steps'] if step not in steps]
+
+    def add(self, hostname, name, step):
+        with self._lock:
+            self.done.setdefault(hostname, {}).setdefault(name, []).append(step)
+            if self.filename is None:
+                return
+            tmp_filename = '%s.%d.tmp' % (self.filename, os.getpid())
+            with open(tmp_filename, 'w') as f:
+                json.dump(self.done, f, indent=2)
+            os.replace(tmp_filename, self.filename)
+
+
+class CmdZoneManagerApply:
+    name = 'apply'
+    aliases = []
+
+    @staticmethod
+    def init_parser(subparsers, parent_parser):
+        parser = subparsers.add_parser(CmdZoneManagerApply.name,
+                                       aliases=CmdZoneManagerApply.aliases,
+                                       parents=[parent_parser],
+                                       formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                                       description='Create and configure the zones of a manifest, '
+                                       'after checking all of their configurations',
+                                       help='Create and configure the zones of a manifest')
+        parser.add_argument('-f', '--file',
+                            required=True,
+                            help='Manifest yaml file with the zones')
+        parser.add_argument('-J', '--jobs',
+                            type=positive_int,
+                            default=8,
+                            help='Number of zones applied concurrently')
+        parser.add_argument('--rate',
+                            type=float,
+                            default=20.0,
+                            help='Maximum requests per second to each host, 0 for no limit')
+        parser.add_argument('--progress',
+                            help='File keeping the zones already applied (default: the manifest file '
+                            'with .progress appended)')
+        parser.add_argument('--restart',
+                            action='store_true',
+                            help='Ignore the progress of previous runs')
+        parser.add_argument('-n', '--dry-run',
+                            action='store_true',
+                            help='Only check the configurations')
+
+    def __init__(self, options):
+        entries = load_manifest(options.file)
+        progress_filename = options.progress or options.file + '.progress'
+        if options.restart and not options.dry_run and os.path.exists(progress_filename):
+            os.unlink(progress_filename)
+        progress = Progress(None if options.dry_run else progress_filename)
+
+        def apply(session):
+            if options.rate > 0:
+                session.limiter = RateLimiter(options.rate)
+            session.resize_pool(options.jobs + 1)
+            hostname = session.hostname
+            zone_manager = session.get_object(ZoneManager())
+            pending = [entry for entry in entries if progress.pending(hostname, entry)]
+            if len(pending) < len(entries):
+                print('%s: %d of %d zones already applied' %
+                      (hostname, len(entries) - len(pending), len(entries)))
+
+            # every configuration is checked before changing anything
+            checks = [entry for entry in pending
+                      if IMPORT_CONFIG in progress.pending(hostname, entry)]
+            results = parallel_map(lambda entry: zone_manager.importConfig(
+                True, entry['name'], checked_config(entry, progress.pending(hostname, entry))),
+                checks, options.jobs)
+            failures = report_failures(results, lambda entry: '%s: Invalid configuration for zone %s' %
+                                       (hostname, entry['name']))
+            if failures > 0:
+                raise RADException('%d configurations are not valid, no zone was changed' % failures)
+            if options.dry_run:
+                print('%s: %d configurations are valid' % (hostname, len(checks)))
+                return
+
+            def apply_entry(entry):
+                name = entry['name']
+                for step in progress.pending(hostname, entry):
+                    if step == CREATE:
+                        zone_manager.create(name, entry.get('path'), entry.get('template'))
+                    else:
+                        zone_manager.importConfig(False, name, entry['config'])
+                    progress.add(hostname, name, step)
+
+            results = parallel_map(apply_entry, pending, options.jobs)
+            failures = report_failures(results, lambda entry: '%s: Could not apply zone %s' %
+                                       (hostname, entry['name']))
+            print('%s: %d zones applied, %d failed' %
+                  (hostname, len(pending) - failures, failures))
+            if failures > 0:
+                raise RADException('%d zones failed, run again to retry them' % failures)
+
+        failures = report_failures(run_on_hosts(options, apply), lambda hostname: hostname)
+        if failures > 0:
+            sys.exit(1)
@@ -15,7 +15,9 @@
 
 import argparse
 import logging
-from rad.rest.client.api.authentication_1 import Session
+import sys
+from rad.rest.client.cli.fleet import run_on_hosts
+from rad.rest.client.util import report_failures
 from rad.rest.client.api.zonemgr_1 import ZoneManager
 
 LOG = logging.getLogger(__name__)
@@ -43,6 +45,9 @@ class CmdZoneManagerCreate:
                             help='Specify the zone name')
 
     def __init__(self, options):
-        with Session(protocol=options.protocol, hostname=options.hostname, port=options.port) as session:
+        def create(session):
             zone_manager = session.get_object(ZoneManager())
             zone_manager.create(options.zonename, options.path, options.template)
+        failures = report_failures(run_on_hosts(options, create), lambda hostname: hostname)
+        if failures > 0:
+            sys.exit(1)
@@ -15,7 +15,9 @@
 
 import argparse
 import logging
-from rad.rest.client.api.authentication_1 import Session
+import sys
+from rad.rest.client.cli.fleet import run_on_hosts
+from rad.rest.client.util import report_failures
 from rad.rest.client.api.zonemgr_1 import ZoneManager
 
 LOG = logging.getLogger(__name__)
@@ -37,6 +39,9 @@ class CmdZoneManagerDelete:
                             help='Specify the zone name')
 
     def __init__(self, options):
-        with Session(protocol=options.protocol, hostname=options.hostname, port=options.port) as session:
+        def delete(session):
             zone_manager = session.get_object(ZoneManager())
             zone_manager.delete(options.zonename)
+        failures = report_failures(run_on_hosts(options, delete), lambda hostname: hostname)
+        if failures > 0:
+            sys.exit(1)
@@ -15,7 +15,9 @@
 
 import argparse
 import logging
-from rad.rest.client.api.authentication_1 import Session
+import sys
+from rad.rest.client.cli.fleet import run_on_hosts
+from rad.rest.client.util import report_failures
 from rad.rest.client.api.zonemgr_1 import ZoneManager
 
 LOG = logging.getLogger(__name__)
@@ -46,13 +48,18 @@ class CmdZoneManagerImportConfig:
 
     def __init__(self, options):
         try:
-            with Session(protocol=options.protocol, hostname=options.hostname, port=options.port) as session:
-                zone_manager = session.get_object(ZoneManager())
-                configuration = options.config
-                if options.file is not None:
-                    with open(options.file, "r") as f:
-                        configuration = f.read()
-                zone_manager.importConfig(options.no_execute, options.zonename, configuration)
+            configuration = options.config
+            if options.file is not None:
+                with open(options.file, "r") as f:
+                    configuration = f.read()
         except (OSError, IOError) as e:
             LOG.error(str(e))
+            return
+
+        def import_config(session):
+            zone_manager = session.get_object(ZoneManager())
+            zone_manager.importConfig(options.no_execute, options.zonename, configuration)
+        failures = report_failures(run_on_hosts(options, import_config), lambda hostname: hostname)
+        if failures > 0:
+            sys.exit(1)
 
@@ -15,11 +15,11 @@
 
 import argparse
 import logging
-import json
-import yaml
 
-from rad.rest.client.util import print_table, print_parsable
-from rad.rest.client.api.authentication_1 import Session
+from rad.rest.client.util import codec, print_table, print_parsable, parallel_map, report_failures, \
+    ResultSet
+from rad.rest.client.cli.cmd_rad import positive_int
+from rad.rest.client.cli.fleet import collect, exit_on_failures, is_fleet, run_on_hosts, with_host
 from rad.rest.client.api.zfsmgr_1 import Zpool
 from rad.rest.client.api.zfsmgr_1.zpool_resource import ZpoolResource
 
@@ -45,9 +45,19 @@ class CmdZpoolList:
                                      'capacity', 'dedupratio', 'health', 'altroot'],
                             help='Specify wich columns to show in the table')
         parser.add_argument('-s', '--sort-by',
-                            choices=ZpoolResource.get_property_names(),
-                            default='name',
-                            help='Specify the sort order in the table')
+                            action='append',
+                            choices=['host'] + ZpoolResource.get_property_names(),
+                            help='Specify the sort order in the table, repeat it to sort by more columns (default: name)')
+        parser.add_argument('-r', '--reverse',
+                            action='store_true',
+                            help='Sort in descending order')
+        parser.add_argument('--top',
+                            type=positive_int,
+                            help='Show only the first rows of the sort order')
+        parser.add_argument('-J', '--jobs',
+                            type=positive_int,
+                            default=8,
+                            help='Number of properties requests to run concurrently')
         group = parser.add_mutually_exclusive_group()
         group.add_argument('-t', '--table',
                            action='store_true',
@@ -63,30 +73,48 @@ class CmdZpoolList:
                            help='Show output in a parsable format delimited by the string')
 
     def __init__(self, options):
-        with Session(protocol=options.protocol, hostname=options.hostname, port=options.port) as session:
-            zpool_instances = session.list_objects(Zpool())
+        if options.sort_by is None:
+            options.sort_by = ['name']
+        # the sort columns are fetched even if they are not shown
+        names = list(dict.fromkeys(options.columns +
+                                   [name for name in options.sort_by if name != 'host']))
+
+        def get_resources(session):
+            zpool_instances = session.iter_objects(Zpool())
+
+            session.resize_pool(options.jobs + 1)
+            # only the decoded values are printed
+            results = parallel_map(
+                lambda instance: instance.get_properties(names, keep_json=False),
+                zpool_instances, options.jobs)
+            report_failures(results, lambda instance: '%s: Could not get properties of pool %s' %
+                            (session.hostname, instance.href))
+            return [resource for instance, resource, error in results
+                    if error is None]
 
-            zpool_resources = [instance.get_properties(
-                options.columns) for instance in zpool_instances]
+        results = run_on_hosts(options, get_resources)
+        zpool_resources = collect(results)
 
-            zpools = []
-            for zfs_resource in zpool_resources:
-                resource = {}
-                for property in zfs_resource.properties:
-                    resource[property.name] = property
-                zpools.append(resource)
+        result_set = ResultSet.from_resources(ZpoolResource, zpool_resources, names)
+        indexes = result_set.sort_indexes(options.sort_by, options.reverse, options.top)
+        zpool_resources = [zpool_resources[index] for index in indexes]
 
-            # sort by key
-            if options.sort_by is not None:
-                zpools = sorted(zpools, key=lambda i: i[options.sort_by])
+        columns = options.columns
+        if is_fleet(options):
+            columns = ['host'] + columns
+        zpools = result_set.take(indexes).select(columns)
 
-            if options.json:
-                resources = [resource.to_json() for resource in zpool_resources]
-                print(json.dumps(resources, indent=4))
-            elif options.yaml:
-                resources = [resource.to_json() for resource in zpool_resources]
-                print(yaml.dump(resources))
-            elif options.delimiter is not None:
-                print_parsable(zpools, options.delimiter)
-            elif options.table:
-                print_table(zpools)
+        if options.json:
+            resources = [with_host(options, hostname, resource.to_json())
+                         for hostname, resource in zpool_resources]
+            print(codec.dumps_pretty(resources))
+        elif options.yaml:
+            import yaml
+            resources = [with_host(options, hostname, resource.to_json())
+                         for hostname, resource in zpool_resources]
+            print(yaml.dump(resources))
+        elif options.delimiter is not None:
+            print_parsable(zpools, options.delimiter)
+        elif options.table:
+            print_table(zpools)
+        exit_on_failures(results)
@@ -30,5 +30,11 @@ class NotFoundError(RADException):
 
 
 class ObjectError(RADException):
-    def __init__(self, message="Object error"):
+    def __init__(self, message="Object error", code=None):
+        super().__init__(message)
+        self.code = code
+
+
+class CircuitOpenError(RADError):
+    def __init__(self, message="Too many failed requests, not sending more"):
         super().__init__(message)
@@ -14,4 +14,8 @@
 
 from .print import print_table, print_parsable
 
-from .extra import list_insert_sorted_by_key, filter_dict, order_dict_with_keys
\ No newline at end of file
+from .extra import list_insert_sorted_by_key, filter_dict, order_dict_with_keys
+
+from .parallel import background, parallel_map, report_failures
+
+from .result_set import ResultSet
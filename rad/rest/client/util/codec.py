@@ -0,0 +1,55 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# JSON encoding and decoding for request bodies, responses and the CLI
+# output. orjson is used when it is installed, it is several times faster
+# than the json module on large payloads.
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj):
+    # Compact encoding, returns bytes
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    # non ascii characters are written as utf-8, like orjson does
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def dumps_pretty(obj):
+    # Indented by 4 spaces for humans, returns str
+    if orjson is not None:
+        text = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS |
+                            orjson.OPT_INDENT_2).decode('utf-8')
+        # orjson only indents by 2. Each level of indentation becomes a
+        # control character, which is always escaped inside strings, then
+        # 4 spaces; one replace per level
+        text = text.replace('\n  ', '\n\x01')
+        while '\x01  ' in text:
+            text = text.replace('\x01  ', '\x01\x01')
+        return text.replace('\x01', '    ')
+    return json.dumps(obj, indent=4, ensure_ascii=False)
@@ -0,0 +1,71 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from rad.rest.client import RADException
+
+LOG = logging.getLogger(__name__)
+
+# Shared by the requests run in the background, created on first use
+BACKGROUND_WORKERS = 32
+_background = None
+_background_lock = threading.Lock()
+
+
+def parallel_map(function, items, jobs=1):
+    # Returns (item, result, error) tuples in the same order as items, a
+    # failing item does not abort the others
+    def call(item):
+        try:
+            return item, function(item), None
+        except Exception as e:
+            LOG.debug('Call failed for %s' % str(item), exc_info=True)
+            return item, None, e
+
+    if jobs <= 1:
+        return [call(item) for item in items]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(call, items))
+
+
+def background(function, *args, **kwargs):
+    # Runs function in a shared pool of threads and returns its future, for
+    # a request that can overlap with the one of the caller
+    global _background
+    if _background is None:
+        with _background_lock:
+            if _background is None:
+                _background = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS,
+                                                 thread_name_prefix='rad-background')
+    return _background.submit(function, *args, **kwargs)
+
+
+def error_message(error):
+    if isinstance(error, RADException):
+        return error.message
+    return str(error)
+
+
+def report_failures(results, describe):
+    failures = 0
+    for item, result, error in results:
+        if error is not None:
+            failures += 1
+            print('%s: %s' % (describe(item), error_message(error)),
+                  file=sys.stderr)
+    return failures
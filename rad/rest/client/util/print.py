@@ -18,6 +18,7 @@
 
 
 from rad.rest.client.api.properties import Property
+from rad.rest.client.util.result_set import ResultSet
 
 
 def print_table(data, truncate=True, separation=2, identation=0):
@@ -25,61 +26,52 @@ def print_table(data, truncate=True, separation=2, identation=0):
     if len(data) == 0:
         return
 
+    # the table is built by columns of strings
+    if isinstance(data, ResultSet):
+        table = data.formatted_columns()
+        right_aligned = data.right_aligned()
+    else:
+        table = {key: [str(data_row[key]) for data_row in data] for key in data[0]}
+        right_aligned = {key: isinstance(value, Property) and value.__class__.RIGHT_ALIGNED
+                         for key, value in data[0].items()}
+
     columns = []
-    # initialize columns from first row's keys
-    for key in data[0]:
+    for key, values in table.items():
+        values = [value.replace('\t', ' ') for value in values]
+        if truncate:
+            values = [value if len(value) <= MAX_COLUMN_LENGTH
+                      else value[:MAX_COLUMN_LENGTH-3] + '...' for value in values]
+        # adjust columns lenghts to max record sizes
+        length = max(len(key), max(map(len, values)))
+        if right_aligned[key]:
+            str_format = '{:>%s}' % str(length)
+        else:
+            str_format = '{:%s}' % str(length)
         columns.append({
-            'key': key,
-            'tittle': key.upper(),
-            'length': len(key)
+            'tittle': str_format.format(key.upper()),
+            'values': [str_format.format(value) for value in values]
         })
 
-    table = []
-    # adjust columns lenghts to max record sizes
-    for data_row in data:
-        row = {}
-        for column in columns:
-            value = str(data_row[column['key']]).replace('\t', ' ')
-            row[column['key']] = value
-            column['length'] = max(column['length'], len(value))
-        table.append(row)
-
-    if truncate:
-        for column in columns:
-            column['length'] = min(column['length'], MAX_COLUMN_LENGTH)
-
     separation_string = ' ' * separation
+    prefix = [''] * identation if identation > 0 else []
 
     # print headers
-    strings = [''] * identation if identation > 0 else []
-    for column in columns:
-        data_value = data[0][column['key']]
-        if isinstance(data_value, Property) and data_value.__class__.RIGHT_ALIGNED:
-            str_format = '{:>%s}' % str(column['length'])
-        else:
-            str_format = '{:%s}' % str(column['length'])
-        strings.append(str_format.format(column['tittle']))
-    print(separation_string.join(strings))
+    print(separation_string.join(prefix + [column['tittle'] for column in columns]))
 
-    for i, row in enumerate(table):
-        data_row = data[i]
-        strings = [''] * identation if identation > 0 else []
-        for column in columns:
-            value = row[column['key']]
-            data_value = data_row[column['key']]
-            if truncate and len(value) > MAX_COLUMN_LENGTH:
-                value = value[:MAX_COLUMN_LENGTH-3] + '...'
-            if isinstance(data_value, Property) and data_value.__class__.RIGHT_ALIGNED:
-                str_format = '{:>%s}' % str(column['length'])
-            else:
-                str_format = '{:%s}' % str(column['length'])
-            strings.append(str_format.format(value))
-        print(separation_string.join(strings))
+    for row in zip(*[column['values'] for column in columns]):
+        print(separation_string.join(prefix + list(row)))
 
 def print_parsable(data, delimiter='|'):
     if len(data) == 0:
         return
 
+    if isinstance(data, ResultSet):
+        table = data.formatted_columns()
+        print(delimiter.join([key.upper() for key in table]))
+        for row in zip(*table.values()):
+            print(delimiter.join(row))
+        return
+
     print(delimiter.join([key.upper() for key in data[0]]))
     for item in data:
         print(delimiter.join([str(value) for value in item.values()]))
@@ -0,0 +1,176 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Rows of a listing stored by column. Integer columns are kept in typed
+# arrays and the others in plain lists of decoded values, so sorting,
+# filtering and aggregating a large listing does not go through one
+# Property object per cell.
+
+import heapq
+from array import array
+
+from rad.rest.client.api.properties import IntegerProperty
+
+
+class Column:
+    __slots__ = ('name', 'prototype', 'values')
+
+    def __init__(self, name, prototype=None, numeric=False, values=None):
+        self.name = name
+        # Formats the values like the property they were decoded from
+        self.prototype = prototype
+        if values is None:
+            if numeric or isinstance(prototype, IntegerProperty):
+                values = array('q')
+            else:
+                values = []
+        self.values = values
+
+    def is_numeric(self):
+        return isinstance(self.values, array)
+
+    def append(self, value):
+        try:
+            self.values.append(value)
+        except (TypeError, OverflowError):
+            # Missing or not a 64 bit integer, keep python objects
+            self.values = list(self.values)
+            self.values.append(value)
+
+    def key(self):
+        # The sort key of the column, missing values first
+        values = self.values
+        if self.is_numeric() or None not in values:
+            return values.__getitem__
+        return lambda index: (values[index] is not None, values[index])
+
+    def take(self, indexes):
+        values = self.values
+        if self.is_numeric():
+            taken = array('q', map(values.__getitem__, indexes))
+        else:
+            taken = list(map(values.__getitem__, indexes))
+        return Column(self.name, self.prototype, values=taken)
+
+    def format(self, value):
+        if self.prototype is None or value is None:
+            return '-' if value is None else str(value)
+        self.prototype.value = value
+        return str(self.prototype)
+
+    def right_aligned(self):
+        if self.prototype is None:
+            return self.is_numeric()
+        return self.prototype.__class__.RIGHT_ALIGNED
+
+
+class ResultSet:
+    __slots__ = ('columns', 'length')
+
+    def __init__(self, columns, length=0):
+        self.columns = {column.name: column for column in columns}
+        self.length = length
+
+    @classmethod
+    def from_resources(cls, resource_class, resources, names):
+        # resources are (hostname, resource) pairs, the host is the first
+        # column
+        columns = [Column(name, resource_class.get_property(name))
+                   for name in names]
+        host_column = Column('host')
+        for hostname, resource in resources:
+            host_column.append(hostname)
+            for column in columns:
+                property = resource.get(column.name)
+                column.append(None if property is None else property.value)
+        return cls([host_column] + columns, len(host_column.values))
+
+    @classmethod
+    def from_dicts(cls, rows, names, numeric=()):
+        columns = [Column(name, numeric=name in numeric) for name in names]
+        length = 0
+        for row in rows:
+            for column in columns:
+                column.append(row.get(column.name))
+            length += 1
+        return cls(columns, length)
+
+    def __len__(self):
+        return self.length
+
+    def column_names(self):
+        return list(self.columns)
+
+    def column(self, name):
+        return self.columns[name].values
+
+    def take(self, indexes):
+        indexes = list(indexes)
+        return ResultSet([column.take(indexes) for column in self.columns.values()],
+                         len(indexes))
+
+    def select(self, names):
+        return ResultSet([self.columns[name] for name in names], self.length)
+
+    def sort_indexes(self, keys, reverse=False, top=None):
+        # Row order for the keys, the first one is the most significant.
+        # top keeps only the first rows of the order
+        if top is not None and top < 0:
+            raise ValueError('top must not be negative, got %d' % top)
+        if top is not None and len(keys) == 1:
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            return select(top, range(self.length), key=self.columns[keys[0]].key())
+        indexes = list(range(self.length))
+        # stable sorts from the least significant key
+        for name in reversed(keys):
+            indexes.sort(key=self.columns[name].key(), reverse=reverse)
+        return indexes if top is None else indexes[:top]
+
+    def sort(self, keys, reverse=False, top=None):
+        return self.take(self.sort_indexes(keys, reverse, top))
+
+    def where(self, name, predicate):
+        values = self.columns[name].values
+        return self.take(index for index in range(self.length)
+                         if predicate(values[index]))
+
+    def group_sum(self, key, names=None):
+        # Sums the numeric columns for each value of the key column, in the
+        # order the values first appear
+        if names is None:
+            names = [name for name, column in self.columns.items()
+                     if name != key and column.is_numeric()]
+        key_values = self.columns[key].values
+        groups = {}
+        for index in range(self.length):
+            groups.setdefault(key_values[index], []).append(index)
+        key_column = self.columns[key]
+        columns = [Column(key, key_column.prototype, values=list(groups))]
+        for name in names:
+            column = self.columns[name]
+            values = column.values
+            sums = Column(name, column.prototype, numeric=column.is_numeric())
+            for indexes in groups.values():
+                sums.append(sum(values[index] for index in indexes
+                                if values[index] is not None))
+            columns.append(sums)
+        return ResultSet(columns, len(groups))
+
+    def formatted_columns(self):
+        # The values as they are shown
+        return {name: [column.format(value) for value in column.values]
+                for name, column in self.columns.items()}
+
+    def right_aligned(self):
+        return {name: column.right_aligned() for name, column in self.columns.items()}
@@ -0,0 +1,168 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import re
+import sys
+import threading
+
+from rad.rest.client.util import codec
+
+LOG = logging.getLogger(__name__)
+
+RAD_COLLECTION = re.compile(r'/api/[^/]+/[^/]+/([^/?]+)')
+RAD_METHOD = re.compile(r'/_rad_method/([^/?]+)')
+
+TIMINGS = ('elapsed', 'server', 'transfer', 'decode')
+
+
+def parse_url(url):
+    # Returns (collection, rad method) of a RAD REST url
+    collection = RAD_COLLECTION.search(url)
+    method = RAD_METHOD.search(url)
+    return (collection.group(1) if collection else None,
+            method.group(1) if method else None)
+
+
+class Tracer:
+    # Aggregates every request sent by the sessions of a command, grouped by
+    # host independent keys so that N+1 patterns show up as large counts
+    def __init__(self, command=None):
+        self.command = command
+        self.calls = {}
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, method, url, status_code=None, size=0, retries=0,
+               cached=False, error=None, **timings):
+        collection, rad_method = parse_url(url)
+        if error is not None:
+            status = 'error'
+        elif cached:
+            status = 'cached'
+        else:
+            status = str(status_code)
+        key = (method, collection or url, rad_method or '', status)
+        LOG.debug('%s %s %s %d bytes %s' % (method, url, status, size,
+                                            ' '.join('%s=%.3fs' % (name, timings.get(name, 0.0))
+                                                     for name in TIMINGS)))
+        with self._lock:
+            call = self.calls.get(key)
+            if call is None:
+                call = {'count': 0, 'bytes': 0, 'retries': 0, 'max': 0.0}
+                call.update((name, 0.0) for name in TIMINGS)
+                self.calls[key] = call
+            call['count'] += 1
+            call['bytes'] += size
+            call['retries'] += retries
+            for name in TIMINGS:
+                call[name] += timings.get(name, 0.0)
+            call['max'] = max(call['max'], timings.get('elapsed', 0.0))
+
+    def add_stats(self, stats):
+        with self._lock:
+            for name, value in stats.items():
+                self.stats[name] = self.stats.get(name, 0) + value
+
+    def summary(self):
+        # Slowest calls first
+        with self._lock:
+            rows = []
+            for (method, collection, rad_method, status), call in self.calls.items():
+                row = {
+                    'method': method,
+                    'collection': collection,
+                    'rad_method': rad_method,
+                    'status': status
+                }
+                row.update(call)
+                rows.append(row)
+        rows.sort(key=lambda row: row['elapsed'], reverse=True)
+        return rows
+
+    def to_json(self):
+        return {
+            'command': self.command,
+            'requests': self.summary(),
+            'sessions': dict(self.stats)
+        }
+
+    def to_prometheus(self):
+        lines = []
+
+        def metric(name, kind, text, samples):
+            lines.append('# HELP rad_%s %s' % (name, text))
+            lines.append('# TYPE rad_%s %s' % (name, kind))
+            for labels, value in samples:
+                lines.append('rad_%s{%s} %s' % (name, labels, repr(value)))
+
+        rows = self.summary()
+        labels = [(self.labels(row), row) for row in rows]
+        metric('requests_total', 'counter', 'RAD REST requests',
+               [(label, row['count']) for label, row in labels])
+        for name in TIMINGS:
+            metric('request_%s_seconds_total' % name, 'counter',
+                   'Total %s time of the RAD REST requests' % name,
+                   [(label, row[name]) for label, row in labels])
+        metric('request_max_seconds', 'gauge', 'Slowest RAD REST request',
+               [(label, row['max']) for label, row in labels])
+        metric('response_bytes_total', 'counter', 'Bytes received from RAD REST servers',
+               [(label, row['bytes']) for label, row in labels])
+        metric('request_retries_total', 'counter', 'Retried RAD REST requests',
+               [(label, row['retries']) for label, row in labels])
+        command = 'command="%s"' % self.escape(self.command or '')
+        for name, value in sorted(self.stats.items()):
+            metric('session_%s_total' % name, 'counter', 'Sessions %s' % name.replace('_', ' '),
+                   [(command, value)])
+        return '\n'.join(lines) + '\n'
+
+    def labels(self, row):
+        names = ('command', 'method', 'collection', 'rad_method', 'status')
+        values = dict(row, command=self.command or '')
+        return ','.join('%s="%s"' % (name, self.escape(values[name])) for name in names)
+
+    @staticmethod
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    def print_summary(self, file=sys.stderr):
+        rows = self.summary()
+        total = sum(row['count'] for row in rows)
+        elapsed = sum(row['elapsed'] for row in rows)
+        print('%s: %d requests, %.3fs' % (self.command, total, elapsed), file=file)
+        if rows:
+            print('%6s %9s %9s %9s %9s %10s %7s  %s' % ('COUNT', 'TOTAL', 'MAX', 'SERVER',
+                                                        'DECODE', 'BYTES', 'RETRIES', 'REQUEST'),
+                  file=file)
+        for row in rows:
+            request = '%s %s' % (row['method'], row['collection'])
+            if row['rad_method']:
+                request += '.' + row['rad_method']
+            print('%6d %8.3fs %8.3fs %8.3fs %8.3fs %10d %7d  %s %s' % (
+                row['count'], row['elapsed'], row['max'], row['server'], row['decode'],
+                row['bytes'], row['retries'], request, row['status']), file=file)
+        if self.stats:
+            print('sessions: %s' % ', '.join('%s=%d' % item for item in sorted(self.stats.items())),
+                  file=file)
+
+    def write(self, filename, format='json'):
+        if format == 'prometheus':
+            text = self.to_prometheus()
+        else:
+            text = codec.dumps_pretty(self.to_json()) + '\n'
+        if filename == '-':
+            sys.stdout.write(text)
+            return
+        with open(filename, 'w') as f:
+            f.write(text)
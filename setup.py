@@ -80,6 +80,9 @@ if __name__ == "__main__":
         test_suite="tests",
         #tests_require=TESTS_REQUIRES,
         install_requires=INSTALL_REQUIRES,
+        extras_require={
+            'fast': ['orjson']
+        },
         entry_points={
             'console_scripts': [
                 'rad = rad.rest.client.cli.main:main'
@@ -0,0 +1,508 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A stand-in RAD REST server serving the authentication, zonemgr, zfsmgr and
+# kstat endpoints used by the client, over a synthetic fleet of configurable
+# size, with latency and error injection. Used by the tests and benchmarks:
+#
+#   with FakeRADServer(Fleet(zones=5000, datasets=100000)) as server:
+#       session = Session(url=server.url)
+#
+#   python -m tests.fake_server --zones 5000 --datasets 100000 --port 6788
+
+import argparse
+import http.server
+import logging
+import random
+import socketserver
+import threading
+import time
+import urllib.parse
+import uuid
+
+from rad.rest.client.util import codec
+
+LOG = logging.getLogger(__name__)
+
+AUTHENTICATION = 'com.oracle.solaris.rad.authentication'
+ZONEMGR = 'com.oracle.solaris.rad.zonemgr'
+ZFSMGR = 'com.oracle.solaris.rad.zfsmgr'
+KSTAT = 'com.oracle.solaris.rad.kstat'
+
+COLLECTIONS = {
+    'Session': AUTHENTICATION,
+    'Zone': ZONEMGR,
+    'ZoneManager': ZONEMGR,
+    'ZfsDataset': ZFSMGR,
+    'Zpool': ZFSMGR,
+    'Kstat': KSTAT,
+    'Control': KSTAT
+}
+
+VERSIONS = {
+    AUTHENTICATION: '1.0',
+    ZONEMGR: '1.0',
+    ZFSMGR: '1.0',
+    KSTAT: '2.0'
+}
+
+
+def href(collection, instance=None):
+    namespace = COLLECTIONS[collection]
+    path = 'api/%s/%s/%s' % (namespace, VERSIONS[namespace], collection)
+    if instance is not None:
+        path += '/' + urllib.parse.quote(str(instance), safe=',')
+    return path
+
+
+def properties(values):
+    json = []
+    for name, value in values.items():
+        if isinstance(value, list):
+            json.append({'name': name, 'type': 'LIST', 'listvalue': value})
+        else:
+            json.append({'name': name, 'type': 'PROPERTY', 'value': value})
+    return json
+
+
+class Fleet(object):
+    # Synthetic zones, datasets, pools and kstats, everything is generated
+    # from the index so that big fleets are cheap to build
+    def __init__(self, zones=10, datasets=100, pools=2, kstats=10, kstat_size=100, anets=2):
+        self.zones = {}
+        for i in range(zones):
+            self.add_zone('zone%d' % i, state='running' if i % 4 else 'installed')
+        self.anets = anets
+        self.pools = ['pool%d' % i for i in range(pools)]
+        self.datasets = {}
+        for i in range(datasets):
+            pool = self.pools[i % pools] if pools else 'rpool'
+            self.datasets['%s/export/fs%d' % (pool, i)] = i
+        self.kstats = ['kstat:/system/cpu/%d/sys' % i for i in range(kstats)]
+        self.kstat_size = kstat_size
+        self.lock = threading.Lock()
+
+    def add_zone(self, name, state='configured', brand='solaris'):
+        index = len(self.zones)
+        self.zones[name] = {
+            'id': index + 1 if state == 'running' else -1,
+            'name': name,
+            'brand': brand,
+            'uuid': str(uuid.UUID(int=index + 1)),
+            'auxstate': [],
+            'state': state
+        }
+
+    def zone_resources(self, name, scope=None, type=None):
+        index = list(self.zones).index(name)
+        if scope == 'anet':
+            resources = []
+            for tmp_id in range(self.anets):
+                parent = 'anet,tmp-id=%d' % tmp_id
+                resources.append({'type': 'mac', 'parent': parent,
+                                  'properties': properties({'tmp-id': str(tmp_id)})})
+            return resources
+        resources = [{'type': 'global', 'properties': properties({
+            'zonename': name,
+            'zonepath': '/system/zones/%s' % name,
+            'brand': self.zones[name]['brand'],
+            'autoboot': 'true',
+            'ip-type': 'exclusive',
+            'scheduling-class': 'FSS'
+        })}, {'type': 'capped-memory', 'properties': properties({
+            'physical': str((index % 16 + 1) * 1024 ** 3),
+            'pagesize-policy': 'largest-available'
+        })}, {'type': 'virtual-cpu', 'properties': properties({
+            'ncpus': str(index % 8 + 1)
+        })}]
+        for tmp_id in range(self.anets):
+            resources.append({'type': 'anet', 'properties': properties({
+                'tmp-id': str(tmp_id),
+                'lower-link': 'auto',
+                'mac-address': 'auto',
+                'link-protection': ['mac-nospoof']
+            })})
+        if type is not None:
+            resources = [resource for resource in resources if resource['type'] == type]
+        return resources
+
+    def dataset_props(self, name, names):
+        index = self.datasets[name]
+        values = {
+            'name': name,
+            'used': str(index * 4096 + 1024),
+            'available': str(800 * 1024 ** 3),
+            'referenced': str(index * 1024 + 1024),
+            'mountpoint': '/' + name.split('/', 1)[1]
+        }
+        return [{'name': n, 'value': values[n]} for n in names if n in values]
+
+    def pool_props(self, name, names):
+        values = {
+            'name': name,
+            'allocated': str(100 * 1024 ** 3),
+            'free': str(800 * 1024 ** 3),
+            'size': str(900 * 1024 ** 3),
+            'capacity': '11',
+            'health': 'ONLINE',
+            'autoexpand': 'off',
+            'readonly': 'off',
+            'version': '46'
+        }
+        return [{'name': n, 'value': values[n]} for n in names if n in values]
+
+    def kstat_map(self, uri):
+        base = self.kstats.index(uri) * self.kstat_size
+        return {'stat%d' % i: {'name': 'stat%d' % i, 'type': 'UINT64', 'flags': 0,
+                               'integer': (base + i) * 1000}
+                for i in range(self.kstat_size)}
+
+
+class RADError(Exception):
+    # error_code is the code of the zonemgr ZoneError in the payload
+    def __init__(self, status, code=500, stderr=None, error_code=None):
+        super().__init__(status)
+        self.status = status
+        self.code = code
+        self.stderr = stderr
+        self.error_code = error_code
+
+
+class FakeRADHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately, do not let them wait for an ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        LOG.debug(format % args)
+
+    def do_GET(self):
+        self.handle_request('GET')
+
+    def do_POST(self):
+        self.handle_request('POST')
+
+    def do_PUT(self):
+        self.handle_request('PUT')
+
+    def do_DELETE(self):
+        self.handle_request('DELETE')
+
+    def handle_request(self, method):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        server.count(method, self.path)
+        if server.latency:
+            time.sleep(server.latency)
+        error = server.injected_error()
+        if error == 0:
+            # drop the connection, like a restarting rad:remote
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+        if error is not None:
+            return self.reply(error, {'status': 'service unavailable', 'payload': None})
+        try:
+            cookie = None
+            path, _, query = self.path.partition('?')
+            parts = [urllib.parse.unquote(part) for part in path.strip('/').split('/')]
+            if len(parts) < 4 or parts[0] != 'api' or parts[3] not in COLLECTIONS:
+                raise RADError('object not found', 404)
+            collection = parts[3]
+            rest = parts[4:]
+            arguments = codec.loads(body) if body else {}
+            if collection == 'Session':
+                payload, cookie = server.authenticate(method, rest, arguments, self.token())
+            else:
+                if server.require_auth and self.token() not in server.tokens:
+                    raise RADError('unauthorized', 401)
+                payload = server.dispatch(method, collection, rest, arguments,
+                                          '_rad_detail' in query)
+        except RADError as e:
+            payload = {'code': e.error_code or e.code, 'stderr': e.stderr} if e.stderr else None
+            return self.reply(e.code, {'status': e.status, 'payload': payload})
+        self.reply(200, {'status': 'success', 'payload': payload}, cookie)
+
+    def token(self):
+        for cookie in (self.headers.get('Cookie') or '').split(';'):
+            name, _, value = cookie.strip().partition('=')
+            if name == '_rad_token':
+                return value
+        return None
+
+    def reply(self, code, json, cookie=None):
+        content = codec.dumps(json)
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        if cookie is not None:
+            self.send_header('Set-Cookie', '_rad_token=%s; Path=/' % cookie)
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class FakeRADServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, fleet=None, host='127.0.0.1', port=0, latency=0.0, error_rate=0.0,
+                 error_status=503, credentials=('root', 'root'), require_auth=True):
+        super().__init__((host, port), FakeRADHandler)
+        self.fleet = fleet or Fleet()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.credentials = credentials
+        self.require_auth = require_auth
+        self.tokens = {}
+        self.requests = {}
+        self._errors = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://%s:%d' % self.server_address[:2]
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.stop()
+        return False
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def count(self, method, path):
+        with self._lock:
+            key = '%s %s' % (method, path)
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def request_count(self, method=None, contains=''):
+        with self._lock:
+            return sum(count for key, count in self.requests.items()
+                       if (method is None or key.startswith(method + ' ')) and contains in key)
+
+    def fail_next(self, count=1, status=503):
+        # The next count requests get status, 0 drops the connection
+        with self._lock:
+            self._errors.extend([status] * count)
+
+    def injected_error(self):
+        with self._lock:
+            if self._errors:
+                return self._errors.pop(0)
+        if self.error_rate and random.random() < self.error_rate:
+            return self.error_status
+        return None
+
+    def expire_sessions(self):
+        with self._lock:
+            self.tokens.clear()
+
+    def authenticate(self, method, rest, arguments, token):
+        if method == 'POST' and not rest:
+            if (arguments.get('username'), arguments.get('password')) != self.credentials:
+                raise RADError('login failed', 401)
+            token = uuid.uuid4().hex
+            with self._lock:
+                reference = len(self.tokens) + 1
+                self.tokens[token] = reference
+            return {'href': href('Session', '_rad_reference/%d' % reference)}, token
+        if token not in self.tokens:
+            raise RADError('unauthorized', 401)
+        return {'href': href('Session', '_rad_reference/%d' % self.tokens[token])}, None
+
+    def dispatch(self, method, collection, rest, arguments, detailed):
+        if len(rest) >= 2 and rest[-2] == '_rad_method':
+            if method != 'PUT':
+                raise RADError('bad request', 400)
+            instance = '/'.join(rest[:-2]) or None
+            handler = getattr(self, 'method_%s_%s' % (collection, rest[-1]), None)
+            if handler is None:
+                raise RADError('object not found', 404)
+            return handler(instance, arguments)
+        if method != 'GET':
+            raise RADError('bad request', 400)
+        if '_rad_event' in rest:
+            # no event subscriptions, clients poll
+            raise RADError('object not found', 404)
+        instance = '/'.join(rest) or None
+        if rest[:1] == ['_rad_reference']:
+            instance = None
+        return getattr(self, 'get_%s' % collection)(instance, detailed)
+
+    # GET of collections and instances
+
+    def objects(self, collection, instances, detailed):
+        if detailed:
+            return [{'href': href(collection, name), collection: json} for name, json in instances]
+        return [{'href': href(collection, name)} for name, json in instances]
+
+    def get_instance(self, collection, instances, instance, detailed):
+        if instance is None:
+            return self.objects(collection, instances, detailed)
+        for name, json in instances:
+            if name == instance:
+                return self.objects(collection, [(name, json)], detailed)[0]
+        raise RADError('object not found', 404)
+
+    def get_Zone(self, instance, detailed):
+        with self.fleet.lock:
+            zones = list(self.fleet.zones.items())
+        return self.get_instance('Zone', zones, instance, detailed)
+
+    def get_ZoneManager(self, instance, detailed):
+        return {'href': href('ZoneManager', '_rad_reference/1'),
+                'ZoneManager': {'evacuationState': None}}
+
+    def get_ZfsDataset(self, instance, detailed):
+        datasets = ((name, {}) for name in self.fleet.datasets)
+        if instance is not None and instance not in self.fleet.datasets:
+            raise RADError('object not found', 404)
+        return self.get_instance('ZfsDataset', datasets, instance, detailed)
+
+    def get_Zpool(self, instance, detailed):
+        return self.get_instance('Zpool', ((name, {}) for name in self.fleet.pools),
+                                 instance, detailed)
+
+    def get_Kstat(self, instance, detailed):
+        return self.get_instance('Kstat', ((uri, {'uri': uri}) for uri in self.fleet.kstats),
+                                 instance, detailed)
+
+    def get_Control(self, instance, detailed):
+        return {'href': href('Control', '_rad_reference/1'), 'Control': {}}
+
+    # RAD methods
+
+    def zone(self, instance):
+        if instance not in self.fleet.zones:
+            raise RADError('object not found', 404)
+        return instance
+
+    def method_Zone_getResources(self, instance, arguments):
+        name = self.zone(instance)
+        scope = (arguments.get('scope') or {}).get('type')
+        type = (arguments.get('filter') or {}).get('type')
+        return self.fleet.zone_resources(name, scope, type)
+
+    def method_Zone_getResourceProperties(self, instance, arguments):
+        name = self.zone(instance)
+        type = (arguments.get('filter') or {}).get('type')
+        resources = self.fleet.zone_resources(name, type=type)
+        if not resources:
+            raise RADError('error', 500, 'no resource of type %s' % type, 'RESOURCE_NOT_FOUND')
+        names = arguments.get('properties')
+        return [property for property in resources[0]['properties']
+                if names is None or property['name'] in names]
+
+    def method_ZoneManager_create(self, instance, arguments):
+        name = arguments.get('name')
+        with self.fleet.lock:
+            if name in self.fleet.zones:
+                raise RADError('error', 500, 'zone %s already exists' % name)
+            self.fleet.add_zone(name)
+        return None
+
+    def method_ZoneManager_delete(self, instance, arguments):
+        name = arguments.get('name')
+        with self.fleet.lock:
+            if name not in self.fleet.zones:
+                raise RADError('error', 500, 'zone %s does not exist' % name)
+            del self.fleet.zones[name]
+        return None
+
+    def method_ZoneManager_importConfig(self, instance, arguments):
+        name = arguments.get('name')
+        if not arguments.get('configuration'):
+            raise RADError('error', 500, 'empty configuration for %s' % name)
+        if any('invalid' in line for line in arguments['configuration']):
+            raise RADError('error', 500, 'syntax error in the configuration of %s' % name)
+        lines = '\n'.join(arguments['configuration']).splitlines()
+        if name not in self.fleet.zones and not any(line.startswith('create') for line in lines):
+            raise RADError('error', 500, 'no such zone configured: %s' % name)
+        if not arguments.get('noexecute'):
+            with self.fleet.lock:
+                if name not in self.fleet.zones:
+                    self.fleet.add_zone(name)
+        return None
+
+    def method_ZfsDataset_get_props(self, instance, arguments):
+        if instance not in self.fleet.datasets:
+            raise RADError('object not found', 404)
+        names = [prop['name'] for prop in arguments.get('props', [])]
+        return self.fleet.dataset_props(instance, names)
+
+    def method_ZfsDataset_get_filesystems(self, instance, arguments):
+        prefix = (instance or '') + '/'
+        return [{'name': name} for name in self.fleet.datasets
+                if instance is None or name.startswith(prefix)]
+
+    def method_Zpool_get_props(self, instance, arguments):
+        if instance not in self.fleet.pools:
+            raise RADError('object not found', 404)
+        names = [prop['name'] for prop in arguments.get('props', [])]
+        return self.fleet.pool_props(instance, names)
+
+    def method_Kstat_getMap(self, instance, arguments):
+        if instance not in self.fleet.kstats:
+            raise RADError('object not found', 404)
+        return self.fleet.kstat_map(instance)
+
+    def method_Control_update(self, instance, arguments):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake RAD REST server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6788)
+    parser.add_argument('--zones', type=int, default=10)
+    parser.add_argument('--datasets', type=int, default=100)
+    parser.add_argument('--pools', type=int, default=2)
+    parser.add_argument('--kstats', type=int, default=10)
+    parser.add_argument('--kstat-size', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds to wait before answering each request')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of the requests answered with --error-status')
+    parser.add_argument('--error-status', type=int, default=503)
+    options = parser.parse_args()
+    fleet = Fleet(zones=options.zones, datasets=options.datasets, pools=options.pools,
+                  kstats=options.kstats, kstat_size=options.kstat_size)
+    server = FakeRADServer(fleet, options.host, options.port, options.latency,
+                           options.error_rate, options.error_status)
+    print('Serving a fake RAD REST server on %s (login as %s/%s)' %
+          ((server.url,) + server.credentials))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
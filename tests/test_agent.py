@@ -0,0 +1,94 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from rad.rest.client.api import authentication_1
+from rad.rest.client.api.agent import AgentClient, AgentServer
+from rad.rest.client.api.authentication_1 import Session
+from rad.rest.client.api.authentication_1.session_cache import read_session_cache
+from rad.rest.client.api.zonemgr_1 import Zone
+from tests.fake_server import FakeRADServer, Fleet
+
+
+class TestAgent(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeRADServer(Fleet(zones=3))
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        patcher = mock.patch.object(authentication_1.session, 'CACHE_DIRECTORY',
+                                    self.directory.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def start_agent(self, path):
+        agent = AgentServer(path)
+        thread = threading.Thread(target=agent.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(agent.server_close)
+        self.addCleanup(agent.shutdown)
+        return agent
+
+    def session(self, agent=None):
+        session = Session(url=self.server.url)
+        session.backoff = 0
+        if agent is not None:
+            session.agent = AgentClient(agent.path)
+            self.addCleanup(session.agent.close)
+        session.load_session()
+        return session
+
+    def test_login_through_agent(self):
+        agent = self.start_agent(os.path.join(self.directory.name, 'agent.sock'))
+        session = self.session(agent)
+        session.login('root', 'root')
+        cache = read_session_cache(session.session_filename)
+        self.assertEqual([cookie['name'] for cookie in cache['cookies']], ['_rad_token'])
+        self.assertEqual(len(session.list_objects(Zone())), 3)
+        # later commands, through the agent or not, reuse the session
+        self.assertEqual(len(self.session(agent).list_objects(Zone())), 3)
+        self.assertEqual(len(self.session().list_objects(Zone())), 3)
+        self.assertEqual(self.server.request_count('POST'), 1)
+
+    def test_agent_relogin(self):
+        agent = self.start_agent(os.path.join(self.directory.name, 'agent.sock'))
+        self.session(agent).login('root', 'root')
+        self.server.expire_sessions()
+        session = self.session(agent)
+        session.credentials = ('root', 'root')
+        self.assertEqual(len(session.list_objects(Zone())), 3)
+        self.assertEqual(session.stats['relogins'], 1)
+        self.assertEqual(len(self.session(agent).list_objects(Zone())), 3)
+
+    def test_socket_permissions(self):
+        shared = Path(self.directory.name, 'shared')
+        shared.mkdir()
+        shared.chmod(0o755)
+        agent = self.start_agent(str(shared / 'agent.sock'))
+        self.assertEqual(shared.stat().st_mode & 0o777, 0o755)
+        self.assertEqual(agent.path.stat().st_mode & 0o777, 0o600)
+        # a directory created by the agent is private
+        agent = self.start_agent(os.path.join(self.directory.name, 'new', 'agent.sock'))
+        self.assertEqual(agent.path.parent.stat().st_mode & 0o777, 0o700)
+
+
+if __name__ == '__main__':
+    unittest.main()
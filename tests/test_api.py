@@ -12,24 +12,178 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import tempfile
+import time
 import unittest
-from pathlib import Path
+from unittest import mock
 
-from rad.rest.client.api.manager import Manager
-from rad.rest.client import RADError, RADException
-from rad.rest.client.util.zfs import zfs_exists, zfs_get, zfs_is_filesystem
-
-zfs = 'rpool/my/cool/zfs/directory'
-directory = '/my_cool_zfs_directory'
+from rad.rest.client import NotFoundError, ObjectError
+from rad.rest.client.api import authentication_1
+from rad.rest.client.api.authentication_1 import Session
+from rad.rest.client.api.kstat_2 import Kstat
+from rad.rest.client.api.response_cache import ResponseCache
+from rad.rest.client.api.zfsmgr_1 import ZfsDataset, Zpool
+from rad.rest.client.api.zonemgr_1 import Zone, ZoneManager
+from rad.rest.client.util import parallel_map
+from tests.fake_server import FakeRADServer, Fleet
 
 
 class TestAPI(unittest.TestCase):
     def setUp(self):
-        return super().setUp()
+        self.server = FakeRADServer(Fleet(zones=4, datasets=10, pools=2, kstats=2, kstat_size=50))
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.directory = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(authentication_1.session, 'CACHE_DIRECTORY',
+                                    self.directory.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.directory.cleanup)
+        self.session = self.login()
+
+    def login(self):
+        session = Session(url=self.server.url)
+        session.backoff = 0
+        session.load_session()
+        session.login('root', 'root')
+        return session
+
+    def test_login(self):
+        self.assertTrue(self.session.is_logged_in())
+        self.assertTrue(os.path.exists(self.session.session_filename))
+        with self.assertRaises(Exception):
+            Session(url=self.server.url).login('root', 'wrong')
+
+    def test_cached_session(self):
+        session = Session(url=self.server.url)
+        session.load_session()
+        zones = session.list_objects(Zone())
+        self.assertEqual(len(zones), 4)
+        self.assertEqual(session.stats['validations'], 0)
+
+    def test_relogin(self):
+        self.server.expire_sessions()
+        session = Session(url=self.server.url)
+        session.credentials = ('root', 'root')
+        session.load_session()
+        zones = session.list_objects(Zone())
+        self.assertEqual(len(zones), 4)
+        self.assertEqual(session.stats['relogins'], 1)
+
+    def test_relogin_resend(self):
+        self.server.expire_sessions()
+        session = Session(url=self.server.url)
+        session.credentials = ('root', 'root')
+        session.cache = ResponseCache({'Zone': 60}, 0, self.directory.name)
+        session.load_session()
+        with mock.patch.object(session, 'transport', wraps=session.transport) as transport:
+            response = Zone(_conn=session).request('GET', session.detail_path(True), timeout=None)
+        self.assertEqual(len(response.payload), 4)
+        self.assertEqual(session.stats['relogins'], 1)
+        # the listing sent again keeps its timeout and is cached
+        listings = [call for call in transport.call_args_list if call.args[0] == 'GET' and
+                    '/Zone' in call.args[1]]
+        self.assertEqual([call.kwargs['timeout'] for call in listings], [None, None])
+        count = self.server.request_count('GET', '/Zone?')
+        self.assertEqual(len(session.list_objects(Zone())), 4)
+        self.assertEqual(self.server.request_count('GET', '/Zone?'), count)
+
+    def test_concurrent_relogin(self):
+        self.server.expire_sessions()
+        self.server.latency = 0.05
+        session = Session(url=self.server.url)
+        session.credentials = ('root', 'root')
+        session.load_session()
+        session.resize_pool(8)
+        http_session = session.session
+        results = parallel_map(lambda name: session.get_object(Zone(), {'name': name}).name,
+                               ['zone%d' % (i % 4) for i in range(8)], 8)
+        self.assertEqual([error for name, result, error in results], [None] * 8)
+        self.assertEqual(session.stats['relogins'], 1)
+        # the connection pool is kept
+        self.assertIs(session.session, http_session)
+        self.assertEqual(session.pool_size, 8)
+
+    def test_zones(self):
+        zones = self.session.list_objects(Zone())
+        self.assertEqual([zone.name for zone in zones], ['zone0', 'zone1', 'zone2', 'zone3'])
+        zone = self.session.get_object(Zone(), {'name': 'zone1'})
+        self.assertEqual(zone.state, 'running')
+        properties = zone.get_properties()
+        self.assertEqual(properties.get('zonename').value, 'zone1')
+        anets = [resource for resource in properties.resources if resource.type == 'anet']
+        self.assertEqual(len(anets), 2)
+        self.assertEqual(len(anets[0].resources), 1)
+        with self.assertRaises(NotFoundError):
+            self.session.get_object(Zone(), {'name': 'missing'})
+
+    def test_zone_properties_cache(self):
+        zone = self.session.get_object(Zone(), {'name': 'zone1'})
+        # not kept by default
+        self.assertIsNot(zone.get_properties(), zone.get_properties())
+        self.assertEqual(self.server.request_count('PUT', 'getResources'), 4)
+        self.session.tree_ttl = 60
+        properties = zone.get_properties()
+        self.assertEqual(self.server.request_count('PUT', 'getResources'), 6)
+        same_zone = self.session.get_object(Zone(), {'name': 'zone1'})
+        self.assertIs(same_zone.get_properties(), properties)
+        self.assertIsNot(self.session.get_object(Zone(), {'name': 'zone2'}).get_properties(),
+                         properties)
+        self.assertEqual(self.server.request_count('PUT', 'getResources'), 8)
+        self.assertIsNot(zone.get_properties(refresh=True), properties)
+        properties = zone.get_properties()
+        self.assertEqual(self.server.request_count('PUT', 'getResources'), 10)
+        # a configuration change drops the cached trees
+        zone_manager = self.session.get_object(ZoneManager())
+        zone_manager.importConfig(True, 'zone1', 'set autoboot=false')
+        properties = zone.get_properties()
+        self.assertEqual(self.server.request_count('PUT', 'getResources'), 12)
+        # and they expire
+        self.session.tree_ttl = 0.05
+        properties = zone.get_properties(refresh=True)
+        self.assertIs(zone.get_properties(), properties)
+        time.sleep(0.1)
+        self.assertIsNot(zone.get_properties(), properties)
+        self.assertEqual(self.server.request_count('PUT', 'getResources'), 16)
+
+    def test_zone_manager(self):
+        self.session.cache = ResponseCache({'Zone': 60}, 0, self.directory.name)
+        self.assertEqual(len(self.session.list_objects(Zone())), 4)
+        zone_manager = self.session.get_object(ZoneManager())
+        zone_manager.create('new')
+        self.assertEqual(len(self.session.list_objects(Zone())), 5)
+        zone_manager.delete('new')
+        self.assertEqual(len(self.session.list_objects(Zone())), 4)
+        with self.assertRaises(ObjectError):
+            zone_manager.delete('new')
+
+    def test_datasets(self):
+        datasets = list(self.session.iter_objects(ZfsDataset()))
+        self.assertEqual(len(datasets), 10)
+        resource = datasets[1].get_properties()
+        self.assertEqual(resource.get('name').value, 'pool1/export/fs1')
+        self.assertEqual(resource.get('used').value, 5120)
+
+    def test_pools(self):
+        pools = self.session.list_objects(Zpool())
+        resource = pools[0].get_properties(['name', 'health', 'size'])
+        self.assertEqual(resource.get('health').value, 'ONLINE')
 
-    def tearDown(self):
-        return super().tearDown()
+    def test_kstat(self):
+        kstat = self.session.get_object(Kstat(), {'uri': 'kstat:/system/cpu/1/sys'})
+        map = kstat.getMap()
+        self.assertEqual(len(map), 50)
+        self.assertEqual(map['stat1'].integer, 51000)
 
+    def test_retry(self):
+        self.server.fail_next(1, 503)
+        self.server.fail_next(1, 0)
+        self.assertEqual(len(self.session.list_objects(Zone())), 4)
+        zone_manager = self.session.get_object(ZoneManager())
+        self.server.fail_next(1, 503)
+        with self.assertRaises(ObjectError):
+            zone_manager.create('retried')
 
 
 if __name__ == '__main__':
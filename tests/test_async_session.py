@@ -0,0 +1,101 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from rad.rest.client import NotFoundError, ObjectError
+from rad.rest.client.api import authentication_1
+from rad.rest.client.api.authentication_1 import AsyncSession, Session
+from rad.rest.client.api.zonemgr_1 import Zone, ZoneManager
+from tests.fake_server import FakeRADServer, Fleet
+
+
+class TestAsyncSession(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeRADServer(Fleet(zones=8))
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.directory = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(authentication_1.session, 'CACHE_DIRECTORY',
+                                    self.directory.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.directory.cleanup)
+        session = Session(url=self.server.url)
+        session.load_session()
+        session.login('root', 'root')
+
+    def run_session(self, coroutine_function):
+        async def main():
+            async with AsyncSession(url=self.server.url, max_workers=8) as session:
+                session.backoff = 0
+                return await coroutine_function(session)
+        return asyncio.run(main())
+
+    def test_send(self):
+        async def send(session):
+            return await session.async_send('GET', session.request_url())
+        response = self.run_session(send)
+        self.assertEqual(response.status, 'success')
+
+    def test_list_and_get(self):
+        async def list_and_get(session):
+            zones = await session.async_list_objects(Zone())
+            zone = await session.async_get_object(Zone(), {'name': 'zone1'})
+            return zones, zone
+        zones, zone = self.run_session(list_and_get)
+        self.assertEqual([zone.name for zone in zones], ['zone%d' % i for i in range(8)])
+        self.assertEqual((zone.name, zone.state), ('zone1', 'running'))
+
+    def test_gather(self):
+        self.server.latency = 0.5
+
+        async def gather(session):
+            return await asyncio.gather(*[
+                session.async_get_object(Zone(), {'name': 'zone%d' % i}) for i in range(8)])
+        start = time.monotonic()
+        zones = self.run_session(gather)
+        # 4s one after the other
+        self.assertLess(time.monotonic() - start, 2.5)
+        self.assertEqual([zone.name for zone in zones], ['zone%d' % i for i in range(8)])
+
+    def test_rad_method(self):
+        async def create(session):
+            zone_manager = await session.async_get_object(ZoneManager())
+            await zone_manager.async_rad_method(
+                'create', {'name': 'new', 'path': None, 'template': None})
+            return await session.async_list_objects(Zone())
+        zones = self.run_session(create)
+        self.assertIn('new', [zone.name for zone in zones])
+
+    def test_errors(self):
+        async def failing(session):
+            zone_manager = await session.async_get_object(ZoneManager())
+            with self.assertRaises(ObjectError):
+                await zone_manager.async_rad_method('delete', {'name': 'missing'})
+            return await asyncio.gather(
+                session.async_get_object(Zone(), {'name': 'zone1'}),
+                session.async_get_object(Zone(), {'name': 'missing'}),
+                return_exceptions=True)
+        zone, error = self.run_session(failing)
+        self.assertEqual(zone.name, 'zone1')
+        self.assertIsInstance(error, NotFoundError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,274 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from rad.rest.client.cli.cmd_rad import CmdRAD
+from rad.rest.client.util import codec
+from tests.fake_server import FakeRADServer, Fleet
+
+ZONES = '/api/com.oracle.solaris.rad.zonemgr/1.0/Zone'
+
+
+def parse(arguments):
+    # the two passes of CmdRAD, without running the command
+    rad = CmdRAD.__new__(CmdRAD)
+    options, _ = rad.create_parser().parse_known_args(arguments)
+    lazy_command = rad.get_command(options)
+    return rad.create_parser(lazy_command, lazy_command.load()).parse_args(arguments)
+
+
+class TestParser(unittest.TestCase):
+    def assertRejected(self, arguments):
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            parse(arguments)
+
+    def test_jobs(self):
+        self.assertEqual(parse(['zfs', 'list', '-J', '4']).jobs, 4)
+        for jobs in ('0', '-2', 'many'):
+            self.assertRejected(['zfs', 'list', '-J', jobs])
+            self.assertRejected(['zone', 'get', '-J', jobs, 'zone1'])
+        self.assertRejected(['--parallel', '0', 'zone', 'list'])
+
+    def test_sort_by(self):
+        for command, column in ((['zfs', 'list'], 'used'), (['zpool', 'list'], 'size')):
+            self.assertEqual(parse(command).sort_by, None)
+            self.assertEqual(parse(command + ['-s', column, '-s', 'name']).sort_by,
+                             [column, 'name'])
+            self.assertEqual(parse(command + ['-s', 'host', '-r', '--top', '3']).top, 3)
+            self.assertRejected(command + ['-s', column, 'name'])
+            self.assertRejected(command + ['--top', '0'])
+            self.assertRejected(command + ['--top', '-1'])
+        options = parse(['zone', 'list', '-s', 'state', '-s', 'name', 'zone1', 'zone2'])
+        self.assertEqual((options.sort_by, options.zonename), (['state', 'name'], ['zone1', 'zone2']))
+        self.assertRejected(['zone', 'list', '--top', '-1'])
+
+    def test_property_paths(self):
+        options = parse(['zone', 'get', '-p', 'autoboot,capped-memory.physical', 'zone1'])
+        self.assertEqual(options.properties, [[('global', 'autoboot'), ('capped-memory', 'physical')]])
+        for paths in ('anet.lower-link', 'fs.dir', 'rctl.name', 'global.typo',
+                      'capped-memory.size', 'nothing.autoboot'):
+            self.assertRejected(['zone', 'get', '-p', paths, 'zone1'])
+
+
+class TestCLI(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeRADServer(Fleet(zones=12))
+        cls.server.start()
+        cls.home = tempfile.TemporaryDirectory()
+        cls.rad(['login', '-p', 'root', 'root'])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        cls.home.cleanup()
+
+    @classmethod
+    def rad(cls, arguments, check=True):
+        command = [sys.executable, '-m', 'rad.rest.client.cli.main', '-Z', 'http',
+                   '-H', '127.0.0.1', '-P', str(cls.server.port)] + arguments
+        return subprocess.run(command, env=dict(os.environ, HOME=cls.home.name),
+                              capture_output=True, text=True, check=check)
+
+    def listings(self):
+        return self.server.request_count('GET', ZONES + '?')
+
+    def test_get_properties_by_name(self):
+        listings = self.listings()
+        process = self.rad(['zone', 'get-properties', 'zone1', '-j'])
+        self.assertEqual(codec.loads(process.stdout)['zonename'], 'zone1')
+        process = self.rad(['zone', 'get', 'zone3', 'zone11', 'zone99', '-j'])
+        self.assertEqual([zone['zonename'] for zone in codec.loads(process.stdout)],
+                         ['zone3', 'zone11'])
+        self.assertIn('zone99', process.stderr)
+        # got by name, the zones are never listed
+        self.assertEqual(self.listings(), listings)
+
+    def test_get_properties_by_pattern(self):
+        listings = self.listings()
+        process = self.rad(['zone', 'get', 'zone1*', '-j'])
+        self.assertEqual([zone['zonename'] for zone in codec.loads(process.stdout)],
+                         ['zone1', 'zone10', 'zone11'])
+        self.assertEqual(self.listings(), listings + 1)
+        process = self.rad(['-L', 'error', 'zone', 'get', 'nomatch*', '-j'])
+        self.assertIn('No zone matches nomatch*', process.stderr)
+
+    def test_get_property_values(self):
+        listings = self.listings()
+        resources = self.server.request_count('PUT', 'getResources')
+        values = self.server.request_count('PUT', 'getResourceProperties')
+        gets = self.server.request_count('GET', ZONES + '/')
+        process = self.rad(['zone', 'get', '-p', 'capped-memory.physical,autoboot',
+                            '-p', 'global.brand', 'zone2', 'zone4', '-j'])
+        self.assertEqual(codec.loads(process.stdout), [
+            {'zonename': 'zone2', 'capped-memory.physical': 3 * 1024 ** 3,
+             'global.autoboot': True, 'global.brand': 'solaris'},
+            {'zonename': 'zone4', 'capped-memory.physical': 5 * 1024 ** 3,
+             'global.autoboot': True, 'global.brand': 'solaris'}
+        ])
+        # one request per resource type and zone, and nothing else
+        self.assertEqual(self.server.request_count('PUT', 'getResourceProperties'), values + 4)
+        self.assertEqual(self.server.request_count('PUT', 'getResources'), resources)
+        self.assertEqual(self.server.request_count('GET', ZONES + '/'), gets)
+        self.assertEqual(self.listings(), listings)
+
+    def test_get_missing_resource(self):
+        # zones without a suspend resource get an empty cell, a missing zone
+        # is still an error
+        process = self.rad(['zone', 'get', '-p', 'suspend.path,autoboot', 'zone1', 'zone2'])
+        self.assertEqual(process.stderr, '')
+        self.assertEqual([line.split() for line in process.stdout.splitlines()[1:]],
+                         [['zone1', '-', 'true'], ['zone2', '-', 'true']])
+        process = self.rad(['zone', 'get', '-p', 'suspend.path', 'zone1', 'zone99', '-j'])
+        self.assertEqual(codec.loads(process.stdout), [{'zonename': 'zone1'}])
+        self.assertEqual(process.stderr.strip(),
+                         '127.0.0.1: Could not get suspend properties of zone zone99: '
+                         'object not found')
+
+    def write_manifest(self, directory, config):
+        filename = os.path.join(directory, 'manifest.yaml')
+        with open(filename, 'w') as f:
+            f.write('defaults:\n'
+                    '  template: SYSDefault\n'
+                    'zones:\n'
+                    '  - name: web1\n'
+                    '  - name: web2\n'
+                    '  - name: db1\n'
+                    '    template: null\n'
+                    '    config-file: db.cfg\n')
+        with open(os.path.join(directory, 'db.cfg'), 'w') as f:
+            f.write(config)
+        return filename
+
+    def test_apply(self):
+        fleet = self.server.fleet
+        self.addCleanup(lambda: [fleet.zones.pop(name, None) for name in ('web1', 'web2', 'db1')])
+        with tempfile.TemporaryDirectory() as directory:
+            manifest = self.write_manifest(directory, 'create -b\ninvalid\n')
+            process = self.rad(['zone-manager', 'apply', '-f', manifest], check=False)
+            self.assertNotEqual(process.returncode, 0)
+            self.assertIn('Invalid configuration for zone db1', process.stderr)
+            self.assertNotIn('web1', fleet.zones)
+
+            # web1 can not be created, the others are applied
+            manifest = self.write_manifest(directory, 'create -b\n')
+            fleet.add_zone('web1')
+            process = self.rad(['zone-manager', 'apply', '-f', manifest], check=False)
+            self.assertNotEqual(process.returncode, 0)
+            self.assertIn('Could not apply zone web1', process.stderr)
+            self.assertIn('web2', fleet.zones)
+            self.assertIn('db1', fleet.zones)
+
+            # only web1 is left to apply
+            del fleet.zones['web1']
+            creates = self.server.request_count('PUT', '_rad_method/create')
+            process = self.rad(['zone-manager', 'apply', '-f', manifest, '-J', '2'])
+            self.assertIn('2 of 3 zones already applied', process.stdout)
+            self.assertIn('web1', fleet.zones)
+            self.assertEqual(self.server.request_count('PUT', '_rad_method/create'), creates + 1)
+
+    def test_apply_template_config(self):
+        fleet = self.server.fleet
+        self.addCleanup(lambda: [fleet.zones.pop(name, None) for name in ('app1', 'app2')])
+        with tempfile.TemporaryDirectory() as directory:
+            manifest = os.path.join(directory, 'manifest.yaml')
+            with open(manifest, 'w') as f:
+                f.write('defaults:\n'
+                        '  template: SYSDefault\n'
+                        '  config: set autoboot=true\n'
+                        'zones:\n'
+                        '  - name: app1\n'
+                        '  - name: app2\n'
+                        '    path: /system/zones/app2\n')
+            progress = manifest + '.progress'
+            with open(progress, 'w') as f:
+                f.write('{}')
+
+            # the fragments are checked with the create of the template, and a
+            # dry run keeps the progress of previous runs
+            process = self.rad(['zone-manager', 'apply', '-f', manifest, '-n', '--restart'])
+            self.assertIn('2 configurations are valid', process.stdout)
+            self.assertTrue(os.path.exists(progress))
+            self.assertNotIn('app1', fleet.zones)
+
+            process = self.rad(['zone-manager', 'apply', '-f', manifest, '--restart'])
+            self.assertIn('2 zones applied, 0 failed', process.stdout)
+            self.assertIn('app1', fleet.zones)
+            self.assertIn('app2', fleet.zones)
+
+    def test_cache_invalidation(self):
+        fleet = self.server.fleet
+        self.addCleanup(lambda: fleet.zones.pop('cached1', None))
+        process = self.rad(['--cache-ttl', '300', 'zone', 'list'])
+        self.assertNotIn('cached1', process.stdout)
+        listings = self.listings()
+        self.assertNotIn('cached1', self.rad(['--cache-ttl', '300', 'zone', 'list']).stdout)
+        self.assertEqual(self.listings(), listings)
+        # a command without cache drops the listings cached by the others
+        self.rad(['zone-manager', 'create', 'cached1'])
+        self.assertIn('cached1', self.rad(['--cache-ttl', '300', 'zone', 'list']).stdout)
+        self.assertEqual(self.listings(), listings + 1)
+
+    def test_fleet_failures(self):
+        # 127.0.0.2 refuses connections, the command fails after showing
+        # what 127.0.0.1 returned
+        process = self.rad(['-H', '127.0.0.2', 'zone', 'list'], check=False)
+        self.assertEqual(process.returncode, 1)
+        self.assertIn('127.0.0.1  ', process.stdout)
+        self.assertIn('127.0.0.2: ', process.stderr)
+        process = self.rad(['-H', '127.0.0.2', 'zone-manager', 'delete', 'nothing'], check=False)
+        self.assertEqual(process.returncode, 1)
+        self.assertIn('127.0.0.1: ', process.stderr)
+
+    def test_watch(self):
+        fleet = self.server.fleet
+        self.addCleanup(lambda: [fleet.zones.pop(name, None) for name in ('watch1', 'watch2')])
+        fleet.add_zone('watch1')
+        subscriptions = self.server.request_count('GET', '_rad_event')
+        command = [sys.executable, '-m', 'rad.rest.client.cli.main', '-Z', 'http',
+                   '-H', '127.0.0.1', '-P', str(self.server.port), 'zone', 'watch', 'watch*',
+                   '--initial', '--interval', '0.05', '--max-interval', '0.05', '--count', '40']
+        with subprocess.Popen(command, env=dict(os.environ, HOME=self.home.name),
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True) as process:
+            first = codec.loads(process.stdout.readline())
+            self.assertEqual((first['zone'], first['event'], first['current']['state']),
+                             ('watch1', 'added', 'configured'))
+            with fleet.lock:
+                fleet.zones['watch1']['state'] = 'installed'
+            fleet.add_zone('watch2')
+            time.sleep(0.5)
+            with fleet.lock:
+                del fleet.zones['watch1']
+            stdout, stderr = process.communicate(timeout=60)
+        self.assertEqual(process.returncode, 0, stderr)
+        events = [codec.loads(line) for line in stdout.splitlines()]
+        self.assertEqual(sorted((event['zone'], event['event']) for event in events),
+                         [('watch1', 'changed'), ('watch1', 'removed'), ('watch2', 'added')])
+        changed = [event for event in events if event['event'] == 'changed'][0]
+        self.assertEqual((changed['previous']['state'], changed['current']['state']),
+                         ('configured', 'installed'))
+        # the fake server has no events, the watcher tried once and polled
+        self.assertEqual(self.server.request_count('GET', '_rad_event'), subscriptions + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import unittest
+from unittest import mock
+
+from rad.rest.client.util import codec
+
+PAYLOAD = {
+    'status': 'success',
+    'payload': [
+        {'href': 'api/com.oracle.solaris.rad.zonemgr/1.6/Zone/zone1', 'Zone': {
+            'name': 'zone1', 'id': 3, 'auxstate': [], 'brand': 'solaris'}},
+        {'name': 'zoné', 'comment': 'café ☕'},
+        {'used': 5120, 'ratio': 1.5, 'mounted': True, 'origin': None, 'props': {}},
+        'multi\nline  text'
+    ]
+}
+
+
+class TestCodec(unittest.TestCase):
+    def backends(self):
+        # the orjson backend when it is installed, and the json module
+        yield codec.orjson
+        yield None
+
+    def test_round_trip(self):
+        for backend in self.backends():
+            with mock.patch.object(codec, 'orjson', backend):
+                data = codec.dumps(PAYLOAD)
+                self.assertIsInstance(data, bytes)
+                self.assertEqual(codec.loads(data), PAYLOAD)
+                self.assertEqual(codec.loads(data.decode('utf-8')), PAYLOAD)
+                self.assertEqual(json.loads(codec.dumps_pretty(PAYLOAD)), PAYLOAD)
+
+    def test_same_output(self):
+        outputs = set()
+        for backend in self.backends():
+            with mock.patch.object(codec, 'orjson', backend):
+                outputs.add((codec.dumps(PAYLOAD), codec.dumps_pretty(PAYLOAD)))
+        self.assertEqual(len(outputs), 1)
+        # indented by 4 spaces, like json.dumps(indent=4), with utf-8 text
+        data, text = outputs.pop()
+        self.assertEqual(text, json.dumps(PAYLOAD, indent=4, ensure_ascii=False))
+        self.assertIn('"zoné"', text)
+        self.assertIn('"zoné"'.encode('utf-8'), data)
+
+    def test_non_str_keys(self):
+        for backend in self.backends():
+            with mock.patch.object(codec, 'orjson', backend):
+                self.assertEqual(codec.loads(codec.dumps({1: 'a', 2.5: 'b', None: 'c'})),
+                                 {'1': 'a', '2.5': 'b', 'null': 'c'})
+                self.assertEqual(json.loads(codec.dumps_pretty({1: {2: 'a'}})), {'1': {'2': 'a'}})
+
+
+if __name__ == '__main__':
+    unittest.main()
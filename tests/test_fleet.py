@@ -0,0 +1,114 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import requests
+
+from rad.rest.client import RADError
+from rad.rest.client.api import authentication_1
+from rad.rest.client.api.authentication_1 import Session
+from rad.rest.client.api.zonemgr_1 import Zone
+from rad.rest.client.api.authentication_1.session import DEFAULT_TIMEOUT
+from rad.rest.client.cli.fleet import get_hostnames, open_session, run_on_hosts, with_host
+from tests.fake_server import FakeRADServer, Fleet
+
+
+class TestFleet(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        patcher = mock.patch.object(authentication_1.session, 'CACHE_DIRECTORY',
+                                    self.directory.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def options(self, **kwargs):
+        options = argparse.Namespace(hostname=None, hosts_file=None, protocol='https',
+                                     port=6788, parallel=4, host_timeout=None, agent_client=None,
+                                     response_cache=None, tracer=None, retries=0,
+                                     retry_backoff=0)
+        for name, value in kwargs.items():
+            setattr(options, name, value)
+        return options
+
+    def test_get_hostnames(self):
+        for hostname in ('web1', 'web2', 'db1'):
+            Path(self.directory.name, 'https_%s_6788.json' % hostname).touch()
+        Path(self.directory.name, 'http_web3_6788.json').touch()
+        hosts_file = os.path.join(self.directory.name, 'hosts')
+        with open(hosts_file, 'w') as f:
+            f.write('# hosts\nother1\n\nother2  # second\nb\n')
+        options = self.options(hostname=['a,b', 'web*', 'a, c', 'missing*'],
+                               hosts_file=hosts_file)
+        self.assertEqual(get_hostnames(options),
+                         ['a', 'b', 'web1', 'web2', 'c', 'other1', 'other2'])
+
+    def test_with_host(self):
+        row = {'name': 'zone1'}
+        self.assertIs(with_host(self.options(hostnames=['a']), 'a', row), row)
+        self.assertEqual(list(with_host(self.options(hostnames=['a', 'b']), 'a', row).items()),
+                         [('host', 'a'), ('name', 'zone1')])
+
+    def test_open_session(self):
+        session = open_session(self.options(), 'solaris')
+        self.assertEqual(session.timeout, DEFAULT_TIMEOUT)
+        self.assertIsNone(session.deadline)
+        session = open_session(self.options(host_timeout=5.0), 'solaris')
+        self.assertEqual(session.timeout, 5.0)
+        self.assertLessEqual(session.deadline, time.monotonic() + 5.0)
+
+    def test_run_on_hosts(self):
+        def function(session):
+            if session.hostname == 'broken':
+                raise RADError('broken host')
+            if session.hostname == 'slow':
+                time.sleep(2)
+            return session.hostname
+
+        options = self.options(hostnames=['slow', 'a', 'broken', 'b'], host_timeout=0.5)
+        start = time.monotonic()
+        results = run_on_hosts(options, function)
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertEqual([(hostname, result) for hostname, result, error in results],
+                         [('slow', None), ('a', 'a'), ('broken', None), ('b', 'b')])
+        errors = [error.message if error else None for hostname, result, error in results]
+        self.assertEqual(errors, ['Timed out after 0.5s', None, 'broken host', None])
+        # a single host raises
+        with self.assertRaises(RADError):
+            run_on_hosts(self.options(hostnames=['broken']), function)
+
+    def test_host_deadline(self):
+        with FakeRADServer(Fleet(zones=2), latency=0.2) as server:
+            session = Session(url=server.url)
+            session.load_session()
+            session.login('root', 'root')
+            options = self.options(hostnames=['127.0.0.1'], protocol='http',
+                                   port=server.port, host_timeout=0.5)
+            start = time.monotonic()
+            with self.assertRaises((RADError, requests.exceptions.Timeout)):
+                run_on_hosts(options, lambda session: [
+                    session.list_objects(Zone()) for _ in range(10)])
+            # the requests stop at the deadline, not after the 10 of them
+            self.assertLess(time.monotonic() - start, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
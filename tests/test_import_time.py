@@ -0,0 +1,62 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Cumulative import time allowed for the rad entry point, in milliseconds,
+# generous enough for slow CI machines but far below loading every command
+IMPORT_BUDGET = float(os.environ.get('RAD_IMPORT_BUDGET', 150))
+
+HEAVY_MODULES = ['requests', 'urllib3', 'yaml']
+
+
+def import_times(*args):
+    process = subprocess.run([sys.executable, '-X', 'importtime'] + list(args),
+                             cwd=ROOT, capture_output=True, text=True)
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative) / 1000
+    return process, times
+
+
+class TestImportTime(unittest.TestCase):
+    def test_entry_point_budget(self):
+        process, times = import_times('-c', 'import rad.rest.client.cli.cmd_rad')
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertLess(times['rad.rest.client.cli.cmd_rad'], IMPORT_BUDGET)
+
+    def test_entry_point_is_light(self):
+        process, times = import_times('-c', 'import rad.rest.client.cli.cmd_rad')
+        self.assertEqual(process.returncode, 0, process.stderr)
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, times)
+
+    def test_version_does_not_load_commands(self):
+        process, times = import_times('-m', 'rad.rest.client.cli.main', '-V')
+        self.assertEqual(process.returncode, 0, process.stderr)
+        for module in HEAVY_MODULES + ['rad.rest.client.cli.zfs']:
+            self.assertNotIn(module, times)
+
+
+if __name__ == '__main__':
+    unittest.main()
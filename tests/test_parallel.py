@@ -0,0 +1,69 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+import io
+import threading
+import time
+import unittest
+
+from rad.rest.client import RADException
+from rad.rest.client.util import parallel_map, report_failures
+
+
+def slow_square(number):
+    # the first items take the longest, they finish last
+    time.sleep(0.01 * (5 - number))
+    if number == 3:
+        raise RADException('no square for 3')
+    return number * number
+
+
+class TestParallel(unittest.TestCase):
+    def test_order(self):
+        for jobs in (1, 4):
+            results = parallel_map(slow_square, range(5), jobs)
+            self.assertEqual([item for item, result, error in results], [0, 1, 2, 3, 4])
+            self.assertEqual([result for item, result, error in results], [0, 1, 4, None, 16])
+
+    def test_errors(self):
+        results = parallel_map(slow_square, range(5), 4)
+        errors = [(item, error) for item, result, error in results if error is not None]
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0][0], 3)
+        self.assertIsInstance(errors[0][1], RADException)
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(report_failures(results, lambda item: 'item %d' % item), 1)
+        self.assertEqual(stderr.getvalue(), 'item 3: no square for 3\n')
+
+    def test_concurrency(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def call(item):
+            with lock:
+                running.append(item)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(item)
+
+        parallel_map(call, range(12), 3)
+        self.assertEqual(max(peak), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
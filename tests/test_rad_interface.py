@@ -0,0 +1,60 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from rad.rest.client.api.authentication_1 import Session
+from rad.rest.client.api.zfsmgr_1 import ZfsDataset
+from rad.rest.client.api.zonemgr_1 import Zone
+
+ZONE_HREF = 'api/com.oracle.solaris.rad.zonemgr/1.0/Zone/zone1'
+
+
+class TestHref(unittest.TestCase):
+    def test_cached_href(self):
+        zone = Zone(href='/' + ZONE_HREF)
+        self.assertEqual(zone.href, ZONE_HREF)
+        self.assertIs(zone.href, zone.href)
+        zone.rad_instance_id = 'zone/2'
+        self.assertEqual(zone.href, 'api/com.oracle.solaris.rad.zonemgr/1.0/Zone/zone%2F2')
+        zone.rad_instance_id = None
+        zone.rad_reference_id = 7
+        self.assertEqual(zone.href, 'api/com.oracle.solaris.rad.zonemgr/1.0/Zone/_rad_reference/7')
+        zone.href = ZONE_HREF
+        self.assertEqual((zone.rad_instance_id, zone.rad_reference_id), ('zone1', None))
+
+    def test_shared_prefix(self):
+        first = ZfsDataset(href='api/com.oracle.solaris.rad.zfsmgr/1.0/ZfsDataset')
+        second = ZfsDataset()
+        self.assertIs(first.href, second.href)
+        self.assertIs(first.rad_collection, second.rad_collection)
+
+    def test_cached_url(self):
+        first = Session(hostname='host1', protocol='http', port=6788)
+        second = Session(url='http://host2:6789')
+        zone = Zone(href=ZONE_HREF, _conn=first)
+        self.assertEqual(zone.request_url(), 'http://host1:6788/' + ZONE_HREF)
+        self.assertIs(zone.request_url(), zone.request_url())
+        self.assertEqual(zone.request_url('/_rad_method/boot'),
+                         'http://host1:6788/' + ZONE_HREF + '/_rad_method/boot')
+        first.port = 6787
+        self.assertEqual(zone.request_url(), 'http://host1:6787/' + ZONE_HREF)
+        zone._conn = second
+        self.assertEqual(zone.request_url(), 'http://host2:6789/' + ZONE_HREF)
+        zone.rad_instance_id = 'zone2'
+        self.assertEqual(zone.request_url(), 'http://host2:6789/' + ZONE_HREF[:-1] + '2')
+
+
+if __name__ == '__main__':
+    unittest.main()
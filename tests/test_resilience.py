@@ -0,0 +1,129 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import unittest
+
+import requests
+
+from rad.rest.client import CircuitOpenError
+from rad.rest.client.api.authentication_1 import Session
+from rad.rest.client.api.authentication_1.session import DEFAULT_TIMEOUT
+from rad.rest.client.api.rad_response import RawResponse
+from rad.rest.client.api.resilience import CircuitBreaker, RateLimiter, backoff_delay
+
+SUCCESS = b'{"status": "success", "payload": []}'
+
+
+class FlakyTransport:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+        self.timeouts = []
+
+    def __call__(self, method, url, stream, **kwargs):
+        self.calls += 1
+        self.timeouts.append(kwargs.get('timeout'))
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return RawResponse(result, SUCCESS)
+
+
+class TestResilience(unittest.TestCase):
+    def session(self, *results):
+        session = Session(hostname='resilience-%d' % id(results))
+        session.backoff = 0
+        session.transport = FlakyTransport(*results)
+        return session
+
+    def test_backoff_delay(self):
+        for attempt in range(10):
+            self.assertLessEqual(backoff_delay(attempt, 0.2, 5.0), min(5.0, 0.2 * 2 ** attempt))
+
+    def test_retry_get(self):
+        session = self.session(requests.exceptions.ConnectionError(), 503, 200)
+        response = session.send('GET', session.request_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(session.transport.calls, 3)
+
+    def test_retry_exhausted(self):
+        session = self.session(503, 503, 503)
+        response = session.send('GET', session.request_url())
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(session.transport.calls, 3)
+
+    def test_no_retry_mutating(self):
+        session = self.session(requests.exceptions.ConnectionError(), 200)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            session.send('PUT', session.request_url('/_rad_method/delete'))
+        response = session.send('PUT', session.request_url('/_rad_method/get_props'),
+                                idempotent=True)
+        self.assertEqual(response.status_code, 200)
+
+    def test_circuit_breaker(self):
+        breaker = CircuitBreaker('host', threshold=2, reset_timeout=0)
+        breaker.failure()
+        breaker.check()
+        breaker.failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        # the reset timeout has passed, a single probe goes through
+        breaker.check()
+        with self.assertRaises(CircuitOpenError):
+            breaker.check()
+        breaker.success()
+        breaker.check()
+
+    def test_session_fails_fast(self):
+        session = self.session(*[requests.exceptions.ConnectionError()] * 5)
+        session.retries = 0
+        for _ in range(session.breaker.threshold):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                session.send('GET', session.request_url())
+        with self.assertRaises(CircuitOpenError):
+            session.send('GET', session.request_url())
+        self.assertEqual(session.transport.calls, session.breaker.threshold)
+
+    def test_probe_error(self):
+        session = self.session(requests.exceptions.ChunkedEncodingError(), 200)
+        session.retries = 0
+        session.breaker = CircuitBreaker('probe', threshold=1, reset_timeout=0)
+        session.breaker.failure()
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            session.send('GET', session.request_url())
+        # the failed probe opens the circuit again, the next one goes through
+        self.assertEqual(session.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(session.send('GET', session.request_url()).status_code, 200)
+        self.assertEqual(session.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_timeout(self):
+        session = self.session(200)
+        self.assertEqual(session.timeout, DEFAULT_TIMEOUT)
+        session.send('GET', session.request_url())
+        self.assertEqual(session.transport.timeouts, [DEFAULT_TIMEOUT])
+        session.deadline = time.monotonic() + 5
+        self.assertTrue(all(4 < value <= 5 for value in session.deadline_timeout((10.0, 60.0))))
+        self.assertEqual(session.deadline_timeout(1.0), 1.0)
+
+    def test_rate_limiter(self):
+        limiter = RateLimiter(rate=50, burst=5)
+        start = time.monotonic()
+        for _ in range(10):
+            limiter.acquire()
+        # the burst is free, the other 5 wait 20 ms each
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+if __name__ == '__main__':
+    unittest.main()
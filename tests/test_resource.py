@@ -0,0 +1,135 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from rad.rest.client import RADException
+from rad.rest.client.api.properties import BooleanProperty, OnOffProperty, Property
+from rad.rest.client.api.resource import Resource
+from rad.rest.client.api.zfsmgr_1.zfs_resource import ZfsResource
+from rad.rest.client.api.zfsmgr_1.zpool_resource import ZpoolResource
+from rad.rest.client.api.zonemgr_1.zone_resources import AnetResource, FsResource, \
+    GlobalResource, ZoneResourceFactory
+
+POOL = [
+    {'name': 'name', 'value': 'rpool'},
+    {'name': 'size', 'value': '1024'},
+    {'name': 'readonly', 'value': 'off'}
+]
+
+
+class TestResource(unittest.TestCase):
+    def test_get_property(self):
+        first = ZpoolResource.get_property('readonly')
+        second = ZpoolResource.get_property('readonly')
+        self.assertIsNot(first, second)
+        self.assertIsNot(first, ZpoolResource.PROPERTY_INDEX['readonly'])
+        self.assertEqual(first.trueValue, 'on')
+        first.load({'name': 'readonly', 'value': 'on'})
+        self.assertIsNone(second.value)
+        self.assertIsNone(ZpoolResource.PROPERTY_INDEX['readonly'].value)
+
+    def test_property_index(self):
+        self.assertIn('readonly', ZpoolResource.PROPERTY_INDEX)
+        self.assertNotIn('readonly', ZfsResource.PROPERTY_INDEX)
+        with self.assertLogs('rad.rest.client.api.resource', 'WARNING'):
+            self.assertIs(type(ZfsResource.get_property('unknown')), Property)
+
+    def test_get(self):
+        resource = ZpoolResource()
+        resource.load(POOL)
+        self.assertEqual(resource.get('name').value, 'rpool')
+        self.assertEqual(resource.get('size').value, 1024)
+        self.assertFalse(resource.get('readonly').value)
+        self.assertIsNone(resource.get('health'))
+        self.assertEqual([property.name for property in resource.properties],
+                         ['name', 'size', 'readonly'])
+
+    def test_slots(self):
+        resource = ZpoolResource()
+        resource.load(POOL)
+        self.assertFalse(hasattr(resource, '__dict__'))
+        for property in resource.properties:
+            self.assertFalse(hasattr(property, '__dict__'))
+
+    def test_boolean_values(self):
+        self.assertIs(type(BooleanProperty('autoboot')), BooleanProperty)
+        iov = OnOffProperty('iov')
+        self.assertTrue(iov.decode('on'))
+        self.assertFalse(iov.decode('off'))
+        with self.assertRaises(RADException):
+            iov.decode('true')
+        self.assertEqual(str(iov.clone()), 'off')
+        self.assertEqual((iov.trueValue, iov.falseValue), ('on', 'off'))
+
+    def test_keep_json(self):
+        resource = ZpoolResource()
+        resource.load(POOL, keep_json=False)
+        self.assertIsNone(resource.json)
+        self.assertIsNone(resource.get('name').json)
+        self.assertEqual(resource.get('name').value, 'rpool')
+        # only for that resource
+        resource = ZpoolResource()
+        resource.load(POOL)
+        self.assertEqual(resource.json, POOL)
+        self.assertEqual(resource.get('name').json, POOL[0])
+
+    def test_lazy_decode(self):
+        resource = ZpoolResource()
+        resource.load(POOL + [{'name': 'autoexpand', 'value': 'maybe'}])
+        # only the accessed properties are built and decoded
+        self.assertEqual(resource.get('size').value, 1024)
+        self.assertEqual(list(resource.property_map), ['size'])
+        with self.assertRaises(RADException):
+            resource.get('autoexpand').value
+        self.assertEqual(len(resource.properties), 4)
+
+    def test_to_json(self):
+        resource = ZpoolResource()
+        resource.load(POOL + [{'name': 'health', 'value': 'ONLINE'}])
+        resource.get('name')
+        self.assertEqual(resource.to_json(), {'name': 'rpool', 'size': 1024, 'health': 'ONLINE'})
+        self.assertEqual(list(resource.property_map), ['name'])
+        resource.properties
+        self.assertEqual(resource.to_json(), {'name': 'rpool', 'size': 1024, 'health': 'ONLINE'})
+
+    def test_registry(self):
+        self.assertIs(Resource.get_class('anet'), AnetResource)
+        self.assertIs(type(GlobalResource('anet')), AnetResource)
+        fs = ZoneResourceFactory.from_json({'type': 'fs', 'properties': [
+            {'name': 'dir', 'value': '/data'},
+            {'name': 'options', 'listvalue': ['ro', 'nodevices']}
+        ]})
+        self.assertIsInstance(fs, FsResource)
+        self.assertEqual(fs.get('options').value, ['ro', 'nodevices'])
+        with self.assertRaises(RADException):
+            ZoneResourceFactory.from_json({'type': 'unknown', 'properties': []})
+
+        class AdminResource(Resource):
+            __slots__ = ()
+            TYPE = 'admin'
+            PROPERTIES = [Property('user'), Property('auths')]
+
+            def __init__(self):
+                super().__init__(AdminResource.TYPE)
+
+        self.addCleanup(Resource.REGISTRY.pop, 'admin')
+        admin = ZoneResourceFactory.from_json({'type': 'admin', 'properties': [
+            {'name': 'user', 'value': 'operator'}
+        ]})
+        self.assertEqual(admin.get('user').value, 'operator')
+
+
+if __name__ == '__main__':
+    unittest.main()
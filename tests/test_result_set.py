@@ -0,0 +1,97 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+import io
+import unittest
+from array import array
+
+from rad.rest.client.api.zfsmgr_1.zfs_resource import ZfsResource
+from rad.rest.client.util import ResultSet, print_parsable, print_table
+
+
+def dataset(name, used, mountpoint=None):
+    resource = ZfsResource()
+    json = [{'name': 'name', 'value': name},
+            {'name': 'used', 'value': str(used)}]
+    if mountpoint is not None:
+        json.append({'name': 'mountpoint', 'value': mountpoint})
+    resource.load(json)
+    return resource
+
+
+RESOURCES = [
+    ('host1', dataset('rpool/a', 2048, '/a')),
+    ('host2', dataset('rpool/b', 1024, '/b')),
+    ('host1', dataset('rpool/c', 4096)),
+    ('host2', dataset('rpool/d', 1024, '/d'))
+]
+
+
+class TestResultSet(unittest.TestCase):
+    def setUp(self):
+        self.result_set = ResultSet.from_resources(ZfsResource, RESOURCES,
+                                                   ['name', 'used', 'mountpoint'])
+
+    def test_columns(self):
+        self.assertEqual(len(self.result_set), 4)
+        self.assertEqual(self.result_set.column_names(),
+                         ['host', 'name', 'used', 'mountpoint'])
+        self.assertIsInstance(self.result_set.column('used'), array)
+        self.assertEqual(list(self.result_set.column('used')), [2048, 1024, 4096, 1024])
+        self.assertEqual(self.result_set.column('mountpoint'), ['/a', '/b', None, '/d'])
+
+    def test_sort(self):
+        self.assertEqual(self.result_set.sort_indexes(['used', 'name']), [1, 3, 0, 2])
+        self.assertEqual(self.result_set.sort_indexes(['used', 'name'], reverse=True),
+                         [2, 0, 3, 1])
+        self.assertEqual(self.result_set.sort_indexes(['host', 'used']), [0, 2, 1, 3])
+        # missing values first
+        self.assertEqual(self.result_set.sort_indexes(['mountpoint']), [2, 0, 1, 3])
+        self.assertEqual(self.result_set.sort(['used'], reverse=True, top=2).column('name'),
+                         ['rpool/c', 'rpool/a'])
+        self.assertEqual(self.result_set.sort_indexes(['host', 'name'], top=3), [0, 2, 1])
+
+    def test_negative_top(self):
+        result_set = ResultSet.from_dicts([{'a': 2}, {'a': 1}], ['a'], numeric=['a'])
+        with self.assertRaises(ValueError):
+            result_set.sort_indexes(['a'], top=-1)
+        self.assertEqual(result_set.sort_indexes(['a'], top=0), [])
+
+    def test_where_and_group_sum(self):
+        filtered = self.result_set.where('used', lambda used: used > 1024)
+        self.assertEqual(filtered.column('name'), ['rpool/a', 'rpool/c'])
+        totals = self.result_set.group_sum('host')
+        self.assertEqual(totals.column_names(), ['host', 'used'])
+        self.assertEqual(totals.column('host'), ['host1', 'host2'])
+        self.assertEqual(list(totals.column('used')), [6144, 2048])
+
+    def test_print(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            print_parsable(self.result_set.select(['name', 'used', 'mountpoint']))
+            print_table(self.result_set.take([2]).select(['name', 'used']))
+        self.assertEqual(output.getvalue().splitlines(), [
+            'NAME|USED|MOUNTPOINT',
+            'rpool/a|2.00 KB|/a',
+            'rpool/b|1024.00 B|/b',
+            'rpool/c|4.00 KB|-',
+            'rpool/d|1024.00 B|/d',
+            'NAME        USED',
+            'rpool/c  4.00 KB'
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from rad.rest.client.api import authentication_1
+from rad.rest.client.api.authentication_1 import Session
+from rad.rest.client.api.authentication_1.session_cache import CACHE_FILE_VERSION, locked, \
+    read_session_cache, write_session_cache
+
+
+class TestSessionCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.filename = Path(self.directory.name, 'cache', 'https_solaris_6788.json')
+
+    def test_write_and_read(self):
+        self.assertIsNone(read_session_cache(self.filename))
+        write_session_cache(self.filename, {'reference_id': 1, 'cookies': []})
+        self.assertEqual(read_session_cache(self.filename),
+                         {'reference_id': 1, 'cookies': [], 'version': CACHE_FILE_VERSION})
+        self.assertEqual(self.filename.stat().st_mode & 0o777, 0o600)
+        self.assertEqual(self.filename.parent.stat().st_mode & 0o777, 0o700)
+
+    def test_atomic_replace(self):
+        write_session_cache(self.filename, {'reference_id': 1})
+        inode = self.filename.stat().st_ino
+        with open(str(self.filename)) as f:
+            write_session_cache(self.filename, {'reference_id': 2})
+            # an open reader keeps the file it started with
+            self.assertEqual(json.load(f)['reference_id'], 1)
+        self.assertNotEqual(self.filename.stat().st_ino, inode)
+        self.assertEqual(read_session_cache(self.filename)['reference_id'], 2)
+        # no temporary file is left behind
+        self.assertEqual(sorted(path.name for path in self.filename.parent.iterdir()),
+                         [self.filename.name, self.filename.name + '.lock'])
+
+    def test_invalid(self):
+        self.filename.parent.mkdir()
+        self.filename.write_text(json.dumps({'version': '1.0.0', 'reference_id': 1}))
+        self.assertIsNone(read_session_cache(self.filename))
+        self.filename.write_text('{"version": ')
+        self.assertIsNone(read_session_cache(self.filename))
+        self.filename.write_text('[]')
+        self.assertIsNone(read_session_cache(self.filename))
+
+    def test_locked(self):
+        self.filename.parent.mkdir()
+        events = []
+
+        def writer():
+            with locked(self.filename):
+                events.append('second')
+
+        with locked(self.filename):
+            thread = threading.Thread(target=writer)
+            thread.start()
+            time.sleep(0.1)
+            events.append('first')
+        thread.join()
+        self.assertEqual(events, ['first', 'second'])
+
+    def test_concurrent_writers(self):
+        # like cron jobs logging in at the same time, the directory does
+        # not exist yet
+        errors = []
+
+        def writer(number):
+            try:
+                for attempt in range(20):
+                    write_session_cache(self.filename, {'reference_id': number,
+                                                        'cookies': [{'value': 'x' * 1000}]})
+                    read = read_session_cache(self.filename)
+                    if read is None:
+                        errors.append('unreadable cache')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(number,)) for number in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertIn(read_session_cache(self.filename)['reference_id'], range(8))
+        self.assertEqual(len(list(self.filename.parent.iterdir())), 2)
+
+    def test_expired(self):
+        with mock.patch.object(authentication_1.session, 'CACHE_DIRECTORY',
+                               self.directory.name):
+            session = Session(hostname='solaris')
+            write_session_cache(session.session_filename, {
+                'reference_id': 1, 'cookies': [], 'saved': time.time() - 20,
+                'expires': time.time() - 10})
+            session.load_session()
+            self.assertIsNone(session.rad_reference_id)
+            self.assertTrue(session._closed)
+            write_session_cache(session.session_filename, {
+                'reference_id': 1, 'cookies': [], 'saved': time.time(),
+                'expires': time.time() + 10})
+            session.load_session()
+            self.assertEqual(session.rad_reference_id, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+# Copyright 2021, Guillermo Adrián Molina
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from rad.rest.client.util.tracing import Tracer, parse_url
+
+ZONE = 'https://solaris:6788/api/com.oracle.solaris.rad.zonemgr/1.6/Zone'
+
+
+class TestTracing(unittest.TestCase):
+    def test_parse_url(self):
+        self.assertEqual(parse_url(ZONE), ('Zone', None))
+        self.assertEqual(parse_url(ZONE + '/z1/_rad_method/getResources'),
+                         ('Zone', 'getResources'))
+        self.assertEqual(parse_url('https://solaris:6788/other'), (None, None))
+
+    def test_aggregate(self):
+        tracer = Tracer('zone list')
+        for zone in ['z1', 'z2', 'z3']:
+            tracer.record('PUT', ZONE + '/%s/_rad_method/getResources' % zone,
+                          200, 10, elapsed=0.5, server=0.4, decode=0.1)
+        tracer.record('GET', ZONE, 200, 100, cached=True)
+        tracer.add_stats({'relogins': 1})
+        tracer.add_stats({'relogins': 2})
+
+        rows = tracer.summary()
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['rad_method'], 'getResources')
+        self.assertEqual(rows[0]['count'], 3)
+        self.assertEqual(rows[0]['bytes'], 30)
+        self.assertAlmostEqual(rows[0]['elapsed'], 1.5)
+        self.assertEqual(rows[1]['status'], 'cached')
+        self.assertEqual(tracer.to_json()['sessions'], {'relogins': 3})
+
+    def test_prometheus(self):
+        tracer = Tracer('zone list')
+        tracer.record('GET', ZONE, 200, 100, elapsed=0.25)
+        text = tracer.to_prometheus()
+        self.assertIn('# TYPE rad_requests_total counter', text)
+        self.assertIn('rad_requests_total{command="zone list",method="GET",'
+                      'collection="Zone",rad_method="",status="200"} 1', text)
+
+
+if __name__ == '__main__':
+    unittest.main()